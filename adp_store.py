@@ -0,0 +1,248 @@
+"""ADP Dataset Store
+
+Loads the exported ADP CSV once per file version and keeps it in memory
+together with precomputed per-column sort orders and a normalized-name
+search index, so /api/adp can sort, filter and paginate on the server.
+"""
+
+import csv
+import os
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_ADP_CSV_PATH = 'eleveners_2025_mock_adp.csv'
+
+MISSING_VALUES = ['', 'N/A', 'NA', 'null', 'None']
+FLOAT_FIELDS = ['average_pick', 'median_pick', 'std_dev', 'earliest_pick', 'latest_pick']
+INT_FIELDS = ['rank', 'times_drafted']
+SORTABLE_FIELDS = [
+    'rank', 'player_name', 'position', 'times_drafted', 'draft_percentage',
+    'average_pick', 'median_pick', 'earliest_pick', 'latest_pick', 'std_dev'
+]
+
+# Opt-in response shape for /api/adp: one array per field instead of one dict per row
+COLUMNAR_MEDIA_TYPE = 'application/vnd.sleeper-tools.columnar+json'
+COLUMN_ORDER = [
+    'rank', 'player_name', 'position', 'times_drafted', 'draft_percentage',
+    'average_pick', 'median_pick', 'earliest_pick', 'latest_pick', 'std_dev', 'player_id'
+]
+
+_NON_ALNUM = re.compile(r'[^a-z0-9 ]+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a player name for case/accent/punctuation-insensitive matching."""
+    if not name:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', name)
+    ascii_name = decomposed.encode('ascii', 'ignore').decode('ascii').lower()
+    # Drop punctuation outright so "Ja'Marr" and "jamarr" match
+    ascii_name = _NON_ALNUM.sub('', ascii_name.replace('-', ' '))
+    return _WHITESPACE.sub(' ', ascii_name).strip()
+
+
+def parse_adp_row(row: dict) -> dict:
+    """Convert numerical CSV fields to numbers, defaulting missing values to 0."""
+    for key in FLOAT_FIELDS:
+        if row.get(key) and row[key] not in MISSING_VALUES:
+            try:
+                row[key] = float(row[key])
+            except (ValueError, TypeError):
+                row[key] = 0.0
+        else:
+            row[key] = 0.0
+
+    for key in INT_FIELDS:
+        if row.get(key) and row[key] not in MISSING_VALUES:
+            try:
+                row[key] = int(row[key])
+            except (ValueError, TypeError):
+                row[key] = 0
+        else:
+            row[key] = 0
+
+    # Strip percentage sign from draft_percentage if it exists and convert to float
+    if 'draft_percentage' in row:
+        dp = row['draft_percentage']
+        if dp and dp not in MISSING_VALUES:
+            try:
+                if isinstance(dp, str) and '%' in dp:
+                    dp = dp.replace('%', '')
+                row['draft_percentage'] = float(dp)
+            except (ValueError, TypeError):
+                row['draft_percentage'] = 0.0
+        else:
+            row['draft_percentage'] = 0.0
+
+    row['player_name'] = row.get('player_name') or 'Unknown Player'
+    row['position'] = (row.get('position') or '').upper()
+    # Exports written before ADP was keyed by player id have no player_id column
+    row['player_id'] = row.get('player_id') or ''
+    return row
+
+
+class ADPDataset:
+    """An immutable, indexed snapshot of the ADP table."""
+
+    def __init__(self, rows: List[dict], version: str):
+        self.rows = rows
+        self.version = version
+        self.search_keys = [normalize_name(row['player_name']) for row in rows]
+        self.positions = sorted({row['position'] for row in rows if row['position']})
+        self.sort_orders = {field: self._build_sort_order(field) for field in SORTABLE_FIELDS}
+        self._search_cache: Dict[str, frozenset] = {}
+        self._lock = threading.Lock()
+
+    def _build_sort_order(self, field: str) -> List[int]:
+        """Row indices ordered ascending by field (ties broken by name)."""
+        if field in ('player_name', 'position'):
+            def key(i):
+                return (self.rows[i].get(field) or '').lower(), self.search_keys[i]
+        else:
+            def key(i):
+                return self.rows[i].get(field, 0), self.search_keys[i]
+        return sorted(range(len(self.rows)), key=key)
+
+    def _matching_indices(self, search: str) -> Optional[frozenset]:
+        """Indices whose normalized name contains the search term (None = no filter)."""
+        term = normalize_name(search)
+        if not term:
+            return None
+        with self._lock:
+            cached = self._search_cache.get(term)
+        if cached is not None:
+            return cached
+
+        # Narrow from the longest cached prefix, since typing only ever adds characters
+        candidates = range(len(self.rows))
+        with self._lock:
+            for end in range(len(term) - 1, 0, -1):
+                prefix_hits = self._search_cache.get(term[:end])
+                if prefix_hits is not None:
+                    candidates = prefix_hits
+                    break
+
+        matches = frozenset(i for i in candidates if term in self.search_keys[i])
+        with self._lock:
+            if len(self._search_cache) >= 1024:
+                self._search_cache.clear()
+            self._search_cache[term] = matches
+        return matches
+
+    def query(self, sort_key: str = 'average_pick', direction: str = 'ascending',
+              search: str = '', position: str = '', offset: int = 0,
+              limit: Optional[int] = None) -> Tuple[int, List[dict]]:
+        """Return (total matching rows, requested page of rows)."""
+        if sort_key not in self.sort_orders:
+            raise ValueError(f"Cannot sort by '{sort_key}'. Valid keys: {', '.join(SORTABLE_FIELDS)}")
+
+        order = self.sort_orders[sort_key]
+        if direction == 'descending':
+            order = reversed(order)
+
+        matches = self._matching_indices(search)
+        position = (position or '').upper()
+
+        if matches is None and not position:
+            total = len(self.rows)
+            selected = order
+        else:
+            def keep(i):
+                if matches is not None and i not in matches:
+                    return False
+                return not position or self.rows[i]['position'] == position
+            selected = (i for i in order if keep(i))
+            if position:
+                total = None  # counted while paging
+            else:
+                total = len(matches)
+
+        page = []
+        seen = 0
+        end = None if limit is None else offset + limit
+        for i in selected:
+            if seen >= offset and (end is None or seen < end):
+                page.append(self.rows[i])
+            seen += 1
+            if end is not None and seen >= end and total is not None:
+                break
+
+        return (seen if total is None else total), page
+
+
+def to_columnar(rows: List[dict]) -> dict:
+    """Encode rows as parallel column arrays, dictionary-encoding string columns.
+
+    String columns become {"dictionary": [distinct values], "codes": [index per row]};
+    numeric columns are plain arrays. Fields outside COLUMN_ORDER are appended.
+    """
+    fields = list(COLUMN_ORDER)
+    for row in rows[:1]:
+        fields.extend(key for key in row if key not in fields)
+
+    columns = {}
+    for field in fields:
+        values = [row.get(field) for row in rows]
+        if any(isinstance(value, str) for value in values):
+            dictionary: Dict[str, int] = {}
+            codes = [dictionary.setdefault(value or '', len(dictionary)) for value in values]
+            columns[field] = {'dictionary': list(dictionary), 'codes': codes}
+        else:
+            columns[field] = values
+    return {'format': 'columnar', 'length': len(rows), 'columns': columns}
+
+
+_dataset: Optional[ADPDataset] = None
+_dataset_lock = threading.Lock()
+
+
+def file_version(path: str) -> Optional[str]:
+    """Identifies one version of a file by mtime and size (None if it doesn't exist)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def is_adp_dataset_loaded() -> bool:
+    """True once a dataset has been built (even an empty one for a missing file)."""
+    return _dataset is not None
+
+
+def adp_csv_path() -> str:
+    """Location of the ADP export, overridable with ADP_CSV_PATH."""
+    return os.getenv('ADP_CSV_PATH', DEFAULT_ADP_CSV_PATH)
+
+
+def load_adp_rows(path: str) -> List[dict]:
+    """Parse the ADP CSV into a list of typed rows."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return [parse_adp_row(row) for row in csv.DictReader(f)]
+
+
+def get_adp_dataset(path: Optional[str] = None) -> ADPDataset:
+    """Return the indexed ADP dataset, rebuilding it only when the CSV changes."""
+    global _dataset
+    path = path or adp_csv_path()
+    version = file_version(path)
+    current = _dataset
+    if current is not None and current.version == (version or 'missing'):
+        return current
+
+    with _dataset_lock:
+        if _dataset is not None and _dataset.version == (version or 'missing'):
+            return _dataset
+        if version is None:
+            print("ADP data file not found.")
+            _dataset = ADPDataset([], 'missing')
+        else:
+            try:
+                _dataset = ADPDataset(load_adp_rows(path), version)
+            except FileNotFoundError:
+                print("ADP data file not found.")
+                _dataset = ADPDataset([], 'missing')
+        return _dataset
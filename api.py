@@ -1,79 +1,257 @@
-import csv
-from flask import Flask, jsonify
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
-import pandas as pd
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from adp_store import (
+    COLUMNAR_MEDIA_TYPE, SORTABLE_FIELDS, get_adp_dataset, is_adp_dataset_loaded, to_columnar
+)
+from http_cache import cached_json_response
+import metrics
 from keeper_tool import get_keeper_data
+from player_store import get_player_store, install_player_store
+from shared_snapshot import (
+    ADP_FILENAME, PLAYERS_FILENAME, SharedADPSource, SharedPlayerStore, shared_snapshot_dir
+)
+from swr_cache import StaleWhileRevalidateCache
 
 app = Flask(__name__)
 load_dotenv()
-CORS(app)  # This will allow the frontend to make requests to this server
+# This will allow the frontend to make requests to this server
+CORS(app, expose_headers=['ETag', 'Age', 'X-Cache-Status', 'X-Refresh-Status'])
 
-def load_adp_data():
-    """Loads ADP data from the CSV file."""
-    data = []
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_PLAYER_IDS = 1000
+
+# Keeper payloads older than this many seconds are refreshed in the background
+KEEPER_CACHE_MAX_AGE = float(os.getenv('KEEPER_CACHE_MAX_AGE', '300'))
+keeper_cache = StaleWhileRevalidateCache(get_keeper_data, KEEPER_CACHE_MAX_AGE, name='keeper-data')
+
+# Worker processes of a multi-worker deployment map one shared copy of the player and ADP data
+SHARED_SNAPSHOT_DIR = shared_snapshot_dir()
+if SHARED_SNAPSHOT_DIR:
+    install_player_store(SharedPlayerStore(os.path.join(SHARED_SNAPSHOT_DIR, PLAYERS_FILENAME)))
+    shared_adp = SharedADPSource(os.path.join(SHARED_SNAPSHOT_DIR, ADP_FILENAME))
+    get_adp_dataset, is_adp_dataset_loaded = shared_adp.get, shared_adp.is_loaded
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    metrics.HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    metrics.HTTP_LATENCY.observe(elapsed, route=route)
+    if response.content_length is not None:
+        metrics.HTTP_RESPONSE_SIZE.observe(response.content_length, route=route)
+    return response
+
+# Outcome of the startup warm-up for each cache: duration or error
+warmup_status = {}
+
+def _warm(name, load):
+    start = time.time()
     try:
-        with open('eleveners_2025_mock_adp.csv', 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Convert numerical fields to appropriate types and handle missing values
-                for key in ['average_pick', 'std_dev', 'earliest_pick', 'latest_pick']:
-                    if row.get(key) and row[key] not in ['', 'N/A', 'NA', 'null', 'None']:
-                        try:
-                            row[key] = float(row[key])
-                        except (ValueError, TypeError):
-                            # Default to 0.0 for invalid values
-                            row[key] = 0.0
-                    else:
-                        # Explicitly set missing values to 0.0 instead of keeping as N/A
-                        row[key] = 0.0
-                        
-                for key in ['times_drafted']:
-                    if row.get(key) and row[key] not in ['', 'N/A', 'NA', 'null', 'None']:
-                        try:
-                            row[key] = int(row[key])
-                        except (ValueError, TypeError):
-                            row[key] = 0
-                    else:
-                        row[key] = 0
-                        
-                # Strip percentage sign from draft_percentage if it exists and convert to float
-                if 'draft_percentage' in row:
-                    if row['draft_percentage'] and row['draft_percentage'] not in ['', 'N/A', 'NA', 'null', 'None']:
-                        try:
-                            # Remove % sign if present
-                            dp = row['draft_percentage']
-                            if isinstance(dp, str) and '%' in dp:
-                                dp = dp.replace('%', '')
-                            row['draft_percentage'] = float(dp)
-                        except (ValueError, TypeError):
-                            row['draft_percentage'] = 0.0
-                    else:
-                        row['draft_percentage'] = 0.0
-                        
-                data.append(row)
-    except FileNotFoundError:
-        print("ADP data file not found.")
-        return []
-    return data
+        load()
+        warmup_status[name] = {'duration_ms': round((time.time() - start) * 1000, 1)}
+    except Exception as e:
+        warmup_status[name] = {'error': str(e)}
+        print(f"Warm-up of {name} failed: {e}")
+
+def warm_caches():
+    """Load the ADP dataset, player store and keeper payload before traffic arrives."""
+    _warm('adp', get_adp_dataset)
+    _warm('players', get_player_store().get_players)
+    user_name = os.getenv('SLEEPER_USERNAME')
+    if user_name:
+        _warm('keeper_data', lambda: keeper_cache.refresh(user_name, wait=True))
+    print(f"Cache warm-up finished: {warmup_status}")
+
+def start_warmup():
+    """Run warm_caches on a background thread so the server can start listening."""
+    thread = threading.Thread(target=warm_caches, name='cache-warmup', daemon=True)
+    thread.start()
+    return thread
+
+def cache_readiness():
+    """Which caches currently hold data."""
+    caches = {
+        'adp': is_adp_dataset_loaded(),
+        'players': get_player_store().is_loaded
+    }
+    user_name = os.getenv('SLEEPER_USERNAME')
+    if user_name:
+        caches['keeper_data'] = keeper_cache.peek(user_name) is not None
+    return caches
+
+def _parse_int_arg(name, default, minimum=0, maximum=None, source=None):
+    """Read a non-negative integer query parameter, clamped to an optional maximum.
+
+    source is where to read it from instead of the query string (e.g. a JSON body).
+    """
+    raw = (request.args if source is None else source).get(name)
+    if raw in (None, ''):
+        return default
+    value = int(raw)
+    if value < minimum:
+        raise ValueError(f"'{name}' must be >= {minimum}")
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
 
 @app.route('/api/adp', methods=['GET'])
 def get_adp():
-    """API endpoint to get the ADP data."""
-    adp_data = load_adp_data()
-    return jsonify(adp_data)
+    """API endpoint to get the ADP data.
+
+    Without query parameters the full table is returned as a list. Any of
+    sort, direction, q, position, offset or limit switches to a paged
+    response sorted and filtered on the server. format=columnar (or an
+    Accept header naming the columnar media type) returns column arrays
+    instead of one object per row.
+    """
+    dataset = get_adp_dataset()
+    columnar = (request.args.get('format') == 'columnar'
+                or COLUMNAR_MEDIA_TYPE in request.headers.get('Accept', ''))
+    response_format = 'columnar' if columnar else 'rows'
+    mimetype = COLUMNAR_MEDIA_TYPE if columnar else 'application/json'
+    vary = 'Accept-Encoding, Accept'
+
+    if not any(key != 'format' for key in request.args):
+        build = (lambda: to_columnar(list(dataset.rows))) if columnar else (lambda: list(dataset.rows))
+        return cached_json_response(build, ('adp', dataset.version, response_format),
+                                    mimetype=mimetype, vary=vary)
+
+    try:
+        sort_key = request.args.get('sort', 'average_pick')
+        if sort_key not in SORTABLE_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort_key}'. Valid keys: {', '.join(SORTABLE_FIELDS)}")
+        direction = request.args.get('direction', 'ascending').lower()
+        direction = {'asc': 'ascending', 'desc': 'descending'}.get(direction, direction)
+        if direction not in ('ascending', 'descending'):
+            raise ValueError("'direction' must be 'ascending' or 'descending'")
+        offset = _parse_int_arg('offset', 0)
+        limit = _parse_int_arg('limit', DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    search = request.args.get('q', '')
+    position = request.args.get('position', '')
+
+    def build_page():
+        total, rows = dataset.query(
+            sort_key=sort_key,
+            direction=direction,
+            search=search,
+            position=position,
+            offset=offset,
+            limit=limit
+        )
+        page = {
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'sort': sort_key,
+            'direction': direction,
+            'positions': dataset.positions
+        }
+        if columnar:
+            page.update(to_columnar(rows))
+        else:
+            page['rows'] = rows
+        return page
+
+    cache_key = ('adp', dataset.version, response_format, sort_key, direction, search, position, offset, limit)
+    return cached_json_response(build_page, cache_key, mimetype=mimetype, vary=vary)
 
 @app.route('/api/keeper-data', methods=['GET'])
 def keeper_data():
+    """API endpoint to get keeper data, served stale-while-revalidate from memory."""
     try:
         user_name = os.getenv('SLEEPER_USERNAME')
         if not user_name:
             return jsonify({'error': 'SLEEPER_USERNAME not set'}), 400
-        data = get_keeper_data(user_name)
-        return jsonify(data)
+        entry, cache_status = keeper_cache.get(user_name)
+        response = cached_json_response(lambda: entry.value, ('keeper-data', user_name, entry.version))
+        response.headers['Age'] = str(keeper_cache.age(entry))
+        response.headers['X-Cache-Status'] = cache_status
+        response.headers['X-Refresh-Status'] = keeper_cache.refresh_status(user_name)
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/players', methods=['GET', 'POST'])
+def players():
+    """Resolve player ids or a name prefix against the in-memory player index.
+
+    GET ?ids=4046,6794 (or POST {"ids": [...]}) returns summaries keyed by id
+    plus any ids not found; GET ?prefix=jam&limit=20 (or POST {"prefix": ...,
+    "limit": ...}) returns matching players.
+    """
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if body is None:
+            body = {}
+        if not isinstance(body, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        ids = body.get('ids') or []
+        prefix = body.get('prefix') or ''
+        if not isinstance(ids, list) or not all(isinstance(pid, (str, int)) and not isinstance(pid, bool)
+                                                for pid in ids):
+            return jsonify({'error': "'ids' must be a list of player ids"}), 400
+        if not isinstance(prefix, str):
+            return jsonify({'error': "'prefix' must be a string"}), 400
+        params = body
+    else:
+        ids = [pid for pid in request.args.get('ids', '').split(',') if pid]
+        prefix = request.args.get('prefix', '')
+        params = request.args
+
+    if not ids and not prefix:
+        return jsonify({'error': "Provide 'ids' or 'prefix'"}), 400
+    if len(ids) > MAX_PLAYER_IDS:
+        return jsonify({'error': f"At most {MAX_PLAYER_IDS} ids per request"}), 400
+
+    try:
+        index = get_player_store().get_index()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 503
+
+    if ids:
+        found = index.lookup(str(pid) for pid in ids)
+        return jsonify({
+            'players': found,
+            'missing': [str(pid) for pid in ids if str(pid) not in found]
+        })
+
+    try:
+        limit = _parse_int_arg('limit', 20, minimum=1, maximum=MAX_PAGE_SIZE, source=params)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'players': index.search_prefix(prefix, limit)})
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 once every cache is warm, 503 while warming."""
+    caches = cache_readiness()
+    is_ready = all(caches.values())
+    return jsonify({
+        'ready': is_ready,
+        'caches': caches,
+        'warmup': warmup_status
+    }), 200 if is_ready else 503
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request, upstream and cache metrics in Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
+    debug = os.getenv('API_DEBUG', '1') != '0'
+    # The debug reloader imports this module twice; only warm the serving process
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warmup()
+    app.run(debug=debug, port=int(os.getenv('API_PORT', '5001')), threaded=True)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Batch Draft Analysis
+
+Runs the GrundleDraftAnalyzer roster/draft-position analysis for every
+league of one or more users across a range of seasons. Leagues are analyzed
+in a process pool and each league's result is appended to the output files
+as soon as it finishes.
+
+Upstream work is shared between the workers: the player database is
+downloaded once by the parent and handed to the workers as a file, and
+completed drafts are ingested once into the draft warehouse
+(draft_warehouse.py), which every worker reads.
+
+Usage:
+    python batch_draft_analysis.py [usernames ...] [--seasons 2024 2025]
+        [--workers N] [--output batch_analysis] [--format csv jsonl parquet] [--compress gz]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from draft_warehouse import get_draft_warehouse, reset_draft_warehouse
+from exporters import COMPRESSORS, open_writer
+from grundle_draft_positions import PLAYER_ROW_FIELDS, PLAYER_ROW_KINDS, GrundleDraftAnalyzer, iter_player_rows
+from player_store import PlayerStore, get_player_store, install_player_store
+from sleeper_api import SleeperAPI
+
+load_dotenv()
+
+CSV_FIELDS = ['league_id', 'league_name', 'season', 'draft_season'] + PLAYER_ROW_FIELDS
+
+# Upstream calls issued at once while listing leagues and ingesting drafts
+LISTING_WORKERS = 8
+
+# Per-process state for pool workers
+_worker_apis = {}
+
+
+def _init_worker(players_path):
+    """Pool initializer: read the player database from the parent's file, not Sleeper."""
+    def load_players():
+        with open(players_path, encoding='utf-8') as f:
+            return json.load(f)
+    install_player_store(PlayerStore(fetch=load_players))
+    reset_draft_warehouse()
+
+
+def _worker_api(username):
+    api = _worker_apis.get(username)
+    if api is None:
+        api = _worker_apis[username] = SleeperAPI(username)
+    return api
+
+
+def analyze_task(username, league, season, draft_season):
+    """Analyze one league/season in a worker process."""
+    analyzer = GrundleDraftAnalyzer(username, season=season, draft_season=draft_season,
+                                    api=_worker_api(username))
+    return analyzer.analyze_league(league)
+
+
+def discover_tasks(usernames, seasons, draft_lag):
+    """(username, league, season, draft_season) for every distinct league/season of the users."""
+    apis = {}
+    for username in usernames:
+        try:
+            apis[username] = SleeperAPI(username)
+        except ValueError as e:
+            print(f"Skipping {username}: {e}")
+
+    with ThreadPoolExecutor(max_workers=LISTING_WORKERS) as pool:
+        listings = {(username, season): pool.submit(api.get_leagues, season)
+                    for username, api in apis.items() for season in seasons}
+
+        tasks = []
+        seen = set()
+        for (username, season), future in listings.items():
+            for league in future.result() or []:
+                key = (league['league_id'], season)
+                # Leagues shared by several of the users are analyzed once
+                if key in seen:
+                    continue
+                seen.add(key)
+                tasks.append((username, league, season, str(int(season) - draft_lag)))
+
+        # Ingest every league's draft history once, up front, so workers only read it
+        warehouse = get_draft_warehouse()
+        synced = {}
+        for username, league, _, _ in tasks:
+            if league['league_id'] not in synced:
+                synced[league['league_id']] = pool.submit(warehouse.sync_league_history,
+                                                          apis[username], league)
+        for future in synced.values():
+            future.result()
+    return tasks
+
+
+class ResultWriter:
+    """Appends each finished league to the output files.
+
+    CSV and Parquet get one row per rostered player; JSON Lines gets one
+    full league result per line.
+    """
+
+    def __init__(self, prefix, formats, compression=None):
+        self._row_writers = []
+        self._jsonl = None
+        suffix = f".{compression}" if compression else ''
+        for fmt in formats:
+            if fmt == 'jsonl':
+                self._jsonl = open_writer(f"{prefix}.jsonl{suffix}", CSV_FIELDS)
+            elif fmt == 'parquet':
+                # Parquet compresses its column chunks itself
+                self._row_writers.append(open_writer(f"{prefix}.parquet", CSV_FIELDS, PLAYER_ROW_KINDS))
+            else:
+                self._row_writers.append(open_writer(f"{prefix}.csv{suffix}", CSV_FIELDS))
+        self.paths = [w.path for w in self._row_writers] + ([self._jsonl.path] if self._jsonl else [])
+
+    def write(self, result):
+        league_fields = {key: result[key] for key in ('league_id', 'league_name', 'season', 'draft_season')}
+        for writer in self._row_writers:
+            for row in iter_player_rows(result):
+                row.update(league_fields)
+                writer.write(row)
+            writer.flush()
+        if self._jsonl:
+            self._jsonl.write(result)
+            self._jsonl.flush()
+
+    def close(self):
+        for writer in self._row_writers + ([self._jsonl] if self._jsonl else []):
+            writer.close()
+
+
+def run_batch(usernames, seasons, draft_lag=1, workers=None, output='batch_analysis',
+              formats=('csv', 'jsonl'), compression=None):
+    """Analyze every league of the users in the given seasons; returns (analyzed, failed)."""
+    start = time.time()
+    print(f"Loading player database and listing leagues for {', '.join(usernames)}...")
+    players = get_player_store().get_players()
+    tasks = discover_tasks(usernames, seasons, draft_lag)
+    if not tasks:
+        print("No leagues found.")
+        return 0, 0
+    print(f"Analyzing {len(tasks)} league seasons with {workers or os.cpu_count()} workers")
+
+    analyzed = failed = 0
+    with tempfile.TemporaryDirectory() as tmpdir:
+        players_path = os.path.join(tmpdir, 'players.json')
+        with open(players_path, 'w', encoding='utf-8') as f:
+            json.dump(players, f)
+
+        writer = ResultWriter(output, formats, compression)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(players_path,)) as pool:
+                futures = {pool.submit(analyze_task, *task): task for task in tasks}
+                for future in as_completed(futures):
+                    _, league, season, _ = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = None
+                        print(f"  {league['name']} ({season}): failed - {e}")
+                    if not result:
+                        failed += 1
+                        continue
+                    writer.write(result)
+                    analyzed += 1
+                    print(f"  [{analyzed + failed}/{len(tasks)}] {league['name']} ({season}): "
+                          f"{len(result['teams'])} teams")
+        finally:
+            writer.close()
+
+    print(f"Analyzed {analyzed} league seasons ({failed} failed) in {time.time() - start:.1f}s")
+    for path in writer.paths:
+        print(f"Results written to {path}")
+    return analyzed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('usernames', nargs='*', help='Sleeper usernames (default: SLEEPER_USERNAME)')
+    parser.add_argument('--seasons', nargs='+', default=['2025'],
+                        help='roster seasons to analyze (default: 2025)')
+    parser.add_argument('--draft-lag', type=int, default=1,
+                        help='draft season = roster season minus this (default: 1)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--output', default='batch_analysis', help='output file prefix')
+    parser.add_argument('--format', nargs='+', choices=['csv', 'jsonl', 'parquet'], default=['csv', 'jsonl'],
+                        help='output formats (default: csv jsonl; parquet needs pyarrow)')
+    parser.add_argument('--compress', choices=[ext.lstrip('.') for ext in COMPRESSORS],
+                        help='compress CSV and JSON Lines output')
+    args = parser.parse_args()
+
+    usernames = args.usernames or [u for u in [os.getenv('SLEEPER_USERNAME')] if u]
+    if not usernames:
+        print("Error: pass usernames or set SLEEPER_USERNAME.")
+        return
+    run_batch(usernames, args.seasons, args.draft_lag, args.workers, args.output, args.format, args.compress)
+
+
+if __name__ == '__main__':
+    main()
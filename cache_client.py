@@ -0,0 +1,105 @@
+"""Cache Daemon Client
+
+Talks to the optional local cache daemon (cache_daemon.py) over its Unix
+socket. Every call falls back cleanly: if the daemon isn't running, is
+disabled or fails, the caller gets MISSING and fetches the data itself.
+
+Protocol: the client sends one JSON request line ({"op": ..., ...}); the
+daemon answers with one JSON header line ({"ok": true, "length": N}) followed
+by an N-byte JSON body. Sleeper responses are relayed as the raw bytes the
+daemon cached, so they are never re-encoded. When Sleeper itself fails a
+"get", the header carries "upstream_status" and the client raises the error
+rather than returning MISSING, so the caller doesn't repeat the failing
+request.
+"""
+
+import json
+import os
+import socket
+import tempfile
+from typing import List, Optional
+
+import requests
+
+import tracing
+
+# Returned when the daemon can't answer; the caller should fetch the data itself
+MISSING = object()
+
+CONNECT_TIMEOUT = 0.5
+# A cache miss makes the daemon fetch upstream (the player database takes a few seconds)
+RESPONSE_TIMEOUT = 60.0
+
+_disabled = False
+
+
+def socket_path() -> str:
+    """Socket the daemon listens on (SLEEPER_CACHE_SOCKET, else one per user in the temp dir)."""
+    default = os.path.join(tempfile.gettempdir(), f"sleeper-tools-{os.getuid()}.sock")
+    return os.getenv('SLEEPER_CACHE_SOCKET', default)
+
+
+def disable() -> None:
+    """Stop this process from using the daemon (the daemon itself calls this)."""
+    global _disabled
+    _disabled = True
+
+
+def is_enabled() -> bool:
+    return not _disabled and os.getenv('SLEEPER_CACHE_DAEMON', 'on').lower() not in ('0', 'off', 'false', 'no')
+
+
+def _read_response(sock: socket.socket):
+    reader = sock.makefile('rb')
+    try:
+        header = json.loads(reader.readline())
+        body = reader.read(header.get('length', 0))
+    finally:
+        reader.close()
+    if not header.get('ok'):
+        return header, MISSING
+    return header, (json.loads(body) if body else None)
+
+
+def _upstream_error(header: dict) -> requests.exceptions.RequestException:
+    """The Sleeper error the daemon ran into, as requests would have raised it."""
+    status = header.get('upstream_status')
+    if status is None:
+        return requests.exceptions.ConnectionError(header.get('error'))
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(header.get('error'), response=response)
+
+
+def request(op: str, path: Optional[str] = None, **args):
+    """Send one request to the daemon; returns its decoded answer or MISSING.
+
+    Raises the upstream error when the daemon's own Sleeper request failed.
+    """
+    path = path or socket_path()
+    if not is_enabled() or not os.path.exists(path):
+        return MISSING
+    try:
+        with tracing.span(f"cache daemon {op}", 'network'):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(CONNECT_TIMEOUT)
+                sock.connect(path)
+                sock.settimeout(RESPONSE_TIMEOUT)
+                sock.sendall(json.dumps({'op': op, **args}).encode('utf-8') + b'\n')
+                header, result = _read_response(sock)
+    except (OSError, ValueError):
+        # Not running, stale socket, timeout or a garbled reply: fetch it locally instead
+        return MISSING
+    if 'upstream_status' in header:
+        raise _upstream_error(header)
+    return result
+
+
+def get_json(url: str):
+    """Decoded body of a Sleeper GET served from the daemon's cache, or MISSING."""
+    return request('get', url=url)
+
+
+def resolve_names(names: List[str], position: Optional[str] = None):
+    """Best NameIndex match (as a dict, or None) per name from the daemon, or MISSING."""
+    return request('players.resolve', names=list(names), position=position)
@@ -0,0 +1,275 @@
+"""Local Cache Daemon
+
+Keeps Sleeper data hot in memory for every CLI tool on the machine. Each
+tool is a separate process that would otherwise download and parse the
+player database (and re-list leagues, rosters and draft picks) on every
+run; with the daemon running, sleeper_api asks it first over a Unix socket
+(see cache_client.py) and only goes upstream itself when the daemon isn't
+there.
+
+The daemon caches raw Sleeper responses by URL with per-endpoint lifetimes
+(the player database for a day, listings for a minute) and fetches each URL
+at most once at a time. Expired responses are dropped, and past
+CACHE_DAEMON_MAX_ENTRIES the least recently used ones are evicted. It also
+answers fuzzy name resolution from its own player store, so tools that only
+need a few players don't have to load the database at all.
+
+Usage:
+    python cache_daemon.py            # run in the foreground (Ctrl+C to stop)
+    python cache_daemon.py --status   # show what the running daemon holds
+    python cache_daemon.py --clear | --stop
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Dict, Tuple
+
+import requests
+from dotenv import load_dotenv
+
+import cache_client
+from player_store import DEFAULT_PLAYER_DB_MAX_AGE, PlayerStore
+from sleeper_api import BASE_URL, endpoint_label, timed_get
+
+UPSTREAM_TIMEOUT = 30
+# Cached responses kept before the least recently used are evicted
+MAX_ENTRIES = int(os.getenv('CACHE_DAEMON_MAX_ENTRIES', '512'))
+# Seconds between sweeps that drop expired responses
+PRUNE_INTERVAL = 60
+
+# Seconds a cached response stays valid, by endpoint; anything else uses the listing age
+ENDPOINT_MAX_AGES = {
+    '/user/:user': 24 * 60 * 60,
+    '/draft/:id/picks': 5 * 60,
+    '/league/:id': 5 * 60,
+    '/league/:id/drafts': 5 * 60,
+}
+
+
+def max_age_for(url: str) -> float:
+    endpoint = endpoint_label(url)
+    if endpoint == '/players/nfl':
+        return float(os.getenv('PLAYER_DB_MAX_AGE', DEFAULT_PLAYER_DB_MAX_AGE))
+    if endpoint in ENDPOINT_MAX_AGES:
+        return ENDPOINT_MAX_AGES[endpoint]
+    # Rosters, league users and user listings change as often as league snapshots expire
+    return float(os.getenv('LEAGUE_SNAPSHOT_MAX_AGE', '60'))
+
+
+class CacheDaemon:
+    """Response cache and player store behind the daemon's socket."""
+
+    def __init__(self, path: str = None):
+        self.path = path or cache_client.socket_path()
+        self.started_at = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # url -> (fetched_at, body), least recently used first
+        self._entries: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._pruned_at = time.time()
+        self.players = PlayerStore(fetch=lambda: json.loads(self.fetch(f"{BASE_URL}/players/nfl")))
+        self._server = None
+
+    def _fresh(self, url: str):
+        cached = self._entries.get(url)
+        if cached is None:
+            return None
+        if time.time() - cached[0] > max_age_for(url):
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        self.hits += 1
+        return cached[1]
+
+    def _store(self, url: str, body: bytes) -> None:
+        # Called with self._lock held
+        now = time.time()
+        self._entries[url] = (now, body)
+        self._entries.move_to_end(url)
+        if now - self._pruned_at > PRUNE_INTERVAL:
+            self._pruned_at = now
+            for cached_url in [u for u, (fetched_at, _) in self._entries.items()
+                               if now - fetched_at > max_age_for(u)]:
+                del self._entries[cached_url]
+        while len(self._entries) > MAX_ENTRIES:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        # Locks of idle URLs that are no longer cached; at worst a caller holding
+        # a dropped lock fetches alongside one using its replacement
+        if len(self._url_locks) > MAX_ENTRIES:
+            self._url_locks = {u: lock for u, lock in self._url_locks.items()
+                               if u in self._entries or lock.locked()}
+
+    def fetch(self, url: str) -> bytes:
+        """Raw body of a Sleeper GET, from memory if still fresh; raises on upstream errors."""
+        with self._lock:
+            body = self._fresh(url)
+            if body is not None:
+                return body
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+
+        # One upstream fetch per URL; concurrent callers wait for it
+        with url_lock:
+            with self._lock:
+                body = self._fresh(url)
+            if body is not None:
+                return body
+            response = timed_get(url, timeout=UPSTREAM_TIMEOUT)
+            response.raise_for_status()
+            body = response.content
+            with self._lock:
+                self._store(url, body)
+                self.misses += 1
+            return body
+
+    def status(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+            size = sum(len(body) for _, body in self._entries.values())
+        return {
+            'pid': os.getpid(),
+            'uptime': round(time.time() - self.started_at, 1),
+            'entries': entries,
+            'bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'players_loaded': self.players.is_loaded,
+            'base_url': BASE_URL,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._url_locks.clear()
+        self.players = PlayerStore(fetch=self.players.fetch)
+
+    def answer(self, request: dict) -> bytes:
+        """JSON body answering one client request."""
+        op = request.get('op')
+        if op == 'get':
+            url = request.get('url') or ''
+            # Only relay the Sleeper API this daemon is configured for
+            if not url.startswith(f"{BASE_URL}/"):
+                raise ValueError(f"Not a {BASE_URL} URL: {url}")
+            return self.fetch(url)
+        if op == 'players.resolve':
+            index = self.players.get_name_index()
+            position = request.get('position')
+            result = [asdict(match) if match else None
+                      for match in (index.resolve(name, position) for name in request.get('names') or [])]
+        elif op == 'status':
+            result = self.status()
+        elif op == 'clear':
+            self.clear()
+            result = self.status()
+        elif op == 'stop':
+            threading.Thread(target=self.stop, daemon=True).start()
+            result = {'stopping': True}
+        else:
+            raise ValueError(f"Unknown op: {op}")
+        return json.dumps(result).encode('utf-8')
+
+    def serve(self, warm: bool = True) -> None:
+        """Listen on the socket until stopped."""
+        # The daemon's own fetches must go upstream, not back to itself
+        cache_client.disable()
+        if os.path.exists(self.path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.path)
+                    raise RuntimeError(f"A cache daemon is already listening on {self.path}")
+                except (ConnectionRefusedError, FileNotFoundError):
+                    os.unlink(self.path)  # left behind by a daemon that didn't shut down cleanly
+
+        # Create the socket owner-only from the start, not chmod'ed after bind()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon_threads = True
+        self._server.cache_daemon = self
+        print(f"Cache daemon listening on {self.path} (upstream {BASE_URL})")
+        if warm:
+            threading.Thread(target=self.players.get_players, daemon=True).start()
+        # Shut down cleanly (removing the socket) when terminated, not only on Ctrl+C
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=self.stop).start())
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            print("Cache daemon stopped")
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server.cache_daemon
+        for line in self.rfile:
+            request = None
+            try:
+                request = json.loads(line)
+                body = daemon.answer(request)
+                header = {'ok': True, 'length': len(body)}
+            except requests.exceptions.RequestException as e:
+                body = b''
+                header = {'ok': False, 'error': str(e)}
+                if request.get('op') == 'get':
+                    # Sleeper itself failed: the client raises this instead of fetching the URL again
+                    response = e.response
+                    header['upstream_status'] = response.status_code if response is not None else None
+            except Exception as e:
+                # The client falls back to fetching the data itself
+                body = b''
+                header = {'ok': False, 'error': str(e)}
+            self.wfile.write(json.dumps(header).encode('utf-8') + b'\n' + body)
+            self.wfile.flush()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', default=None, help='socket path (default: SLEEPER_CACHE_SOCKET or a per-user temp file)')
+    parser.add_argument('--no-warm', action='store_true', help="don't load the player database at startup")
+    parser.add_argument('--status', action='store_true', help='show the running daemon\'s cache contents')
+    parser.add_argument('--clear', action='store_true', help='drop everything the running daemon has cached')
+    parser.add_argument('--stop', action='store_true', help='stop the running daemon')
+    args = parser.parse_args()
+    path = args.socket or cache_client.socket_path()
+
+    for flag, op in ((args.status, 'status'), (args.clear, 'clear'), (args.stop, 'stop')):
+        if flag:
+            result = cache_client.request(op, path=path)
+            if result is cache_client.MISSING:
+                print(f"No cache daemon is running on {path}")
+            else:
+                print(json.dumps(result, indent=2))
+            return
+
+    try:
+        CacheDaemon(path).serve(warm=not args.no_warm)
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(e)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""Draft Warehouse
+
+Local SQLite store of every completed league draft reachable from a user's
+leagues. Each league is followed back through its previous_league_id link,
+so one ingest covers all past seasons of a dynasty/keeper league.
+
+Picks are indexed by (player_id, season, league_id), so a player's full
+draft history is a single index lookup instead of one upstream fetch per
+season. Completed drafts never change: they are fetched once and never
+requested again, and leagues whose drafts are all complete are not even
+re-listed.
+
+Usage:
+    python draft_warehouse.py [username] [--seasons 2025 2024] [--player PLAYER_ID]
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+# Upstream calls issued at once while ingesting a league's history
+INGEST_WORKERS = 8
+# How long a league's draft listing is trusted before it is checked again
+# (only matters while the league still has an unfinished draft)
+LISTING_MAX_AGE = 5 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leagues (
+    league_id TEXT PRIMARY KEY,
+    name TEXT,
+    season TEXT,
+    previous_league_id TEXT,
+    drafts_complete INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS drafts (
+    draft_id TEXT PRIMARY KEY,
+    league_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    status TEXT,
+    type TEXT,
+    name TEXT,
+    last_picked INTEGER
+);
+CREATE TABLE IF NOT EXISTS picks (
+    draft_id TEXT NOT NULL,
+    pick_no INTEGER NOT NULL,
+    player_id TEXT,
+    league_id TEXT NOT NULL,
+    season TEXT NOT NULL,
+    round INTEGER,
+    draft_slot INTEGER,
+    roster_id INTEGER,
+    picked_by TEXT,
+    is_keeper INTEGER,
+    PRIMARY KEY (draft_id, pick_no)
+);
+CREATE INDEX IF NOT EXISTS picks_by_player ON picks (player_id, season, league_id);
+CREATE INDEX IF NOT EXISTS picks_by_league ON picks (league_id, season);
+CREATE INDEX IF NOT EXISTS drafts_by_league ON drafts (league_id, season);
+"""
+
+PICK_COLUMNS = ('draft_id', 'pick_no', 'player_id', 'league_id', 'season', 'round',
+                'draft_slot', 'roster_id', 'picked_by', 'is_keeper')
+
+
+def warehouse_path() -> str:
+    """Location of the warehouse database (read lazily so .env is honoured)."""
+    return os.getenv('DRAFT_WAREHOUSE_PATH', 'draft_warehouse.db')
+
+
+def _previous_league_id(league: dict) -> Optional[str]:
+    # Sleeper reports "0" or null for leagues that weren't renewed from another
+    previous = league.get('previous_league_id')
+    return previous if previous and previous != '0' else None
+
+
+def _pick_row(draft: dict, league_id: str, season: str, pick: dict) -> tuple:
+    return (draft['draft_id'], pick.get('pick_no'), pick.get('player_id'), league_id, season,
+            pick.get('round'), pick.get('draft_slot'), pick.get('roster_id'),
+            pick.get('picked_by'), 1 if pick.get('is_keeper') else 0)
+
+
+class DraftWarehouse:
+    """Indexed on-disk table of completed league draft picks."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or warehouse_path()
+        # Batch workers in other processes may be writing the same file
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._synced_at: Dict[str, float] = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # Ingest
+
+    def _known_league(self, league_id: str) -> Optional[sqlite3.Row]:
+        rows = self._query('SELECT * FROM leagues WHERE league_id = ?', (league_id,))
+        return rows[0] if rows else None
+
+    def _store_league(self, league: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO leagues (league_id, name, season, previous_league_id) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(league_id) DO UPDATE SET name = excluded.name, season = excluded.season, '
+                'previous_league_id = excluded.previous_league_id',
+                (league['league_id'], league.get('name'), str(league.get('season', '')),
+                 _previous_league_id(league)))
+
+    def _store_draft(self, draft: dict, league_id: str, season: str, picks: List[dict]):
+        """Store a completed draft and its picks in one transaction."""
+        rows = [_pick_row(draft, league_id, season, pick) for pick in picks if pick.get('pick_no')]
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO drafts (draft_id, league_id, season, status, type, name, last_picked) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (draft['draft_id'], league_id, season, draft.get('status'), draft.get('type'),
+                 (draft.get('metadata') or {}).get('name'), draft.get('last_picked')))
+            self._conn.execute('DELETE FROM picks WHERE draft_id = ?', (draft['draft_id'],))
+            self._conn.executemany(
+                f"INSERT INTO picks ({', '.join(PICK_COLUMNS)}) VALUES ({', '.join('?' * len(PICK_COLUMNS))})",
+                rows)
+
+    def _league_chain(self, api, league: dict) -> List[dict]:
+        """The league followed by its previous seasons, newest first."""
+        chain = []
+        seen = set()
+        current = league
+        while current and current['league_id'] not in seen:
+            seen.add(current['league_id'])
+            known = self._known_league(current['league_id'])
+            if not known or known['season'] != str(current.get('season', '')):
+                self._store_league(current)
+            chain.append(current)
+
+            previous_id = _previous_league_id(current)
+            if not previous_id:
+                break
+            known = self._known_league(previous_id)
+            if known:
+                current = {'league_id': known['league_id'], 'name': known['name'],
+                           'season': known['season'], 'previous_league_id': known['previous_league_id']}
+            else:
+                current = api.get_league(previous_id)
+        return chain
+
+    def _ingest_league_drafts(self, api, league: dict, pool: ThreadPoolExecutor) -> int:
+        """Fetch and store this league's completed drafts that aren't stored yet."""
+        league_id = league['league_id']
+        known = self._known_league(league_id)
+        if known and known['drafts_complete']:
+            return 0
+
+        drafts = api.get_league_drafts(league_id)
+        if drafts is None:
+            return 0
+        stored = {row['draft_id'] for row in
+                  self._query('SELECT draft_id FROM drafts WHERE league_id = ?', (league_id,))}
+        completed = [d for d in drafts if d.get('status') == 'complete' and d['draft_id'] not in stored]
+
+        season = str(league.get('season', ''))
+        pick_futures = [(d, pool.submit(api.get_draft_picks, d['draft_id'])) for d in completed]
+        ingested = 0
+        for draft, future in pick_futures:
+            picks = future.result()
+            if picks is None:
+                continue
+            self._store_draft(draft, league_id, str(draft.get('season') or season), picks)
+            ingested += 1
+
+        if drafts and all(d.get('status') == 'complete' for d in drafts) and ingested == len(completed):
+            with self._lock, self._conn:
+                self._conn.execute('UPDATE leagues SET drafts_complete = 1 WHERE league_id = ?', (league_id,))
+        return ingested
+
+    def sync_league_history(self, api, league: dict, max_age: float = LISTING_MAX_AGE) -> List[dict]:
+        """Ingest every completed draft of league and its previous seasons.
+
+        Returns the league chain, newest season first. Repeated calls within
+        max_age are no-ops.
+        """
+        league_id = league['league_id']
+        chain = self._league_chain(api, league)
+        if time.time() - self._synced_at.get(league_id, 0) <= max_age:
+            return chain
+
+        with ThreadPoolExecutor(max_workers=INGEST_WORKERS) as pool:
+            listing_pool = ThreadPoolExecutor(max_workers=INGEST_WORKERS)
+            try:
+                futures = [listing_pool.submit(self._ingest_league_drafts, api, l, pool) for l in chain]
+                ingested = sum(f.result() for f in futures)
+            finally:
+                listing_pool.shutdown()
+        if ingested:
+            print(f"Draft warehouse: ingested {ingested} drafts for {league.get('name', league_id)}")
+        self._synced_at[league_id] = time.time()
+        return chain
+
+    def ingest_user(self, api, seasons: Iterable) -> int:
+        """Ingest the history of every league the user is in for the given seasons."""
+        count = 0
+        for season in seasons:
+            for league in api.get_leagues(season) or []:
+                self.sync_league_history(api, league, max_age=0)
+                count += 1
+        return count
+
+    # Lookups
+
+    def player_history(self, player_id: str, league_ids: Optional[Iterable[str]] = None) -> List[dict]:
+        """Every stored pick of player_id, newest season first, optionally limited to some leagues."""
+        sql = 'SELECT * FROM picks WHERE player_id = ?'
+        params: list = [player_id]
+        if league_ids is not None:
+            league_ids = list(league_ids)
+            sql += f" AND league_id IN ({', '.join('?' * len(league_ids))})"
+            params.extend(league_ids)
+        sql += ' ORDER BY season DESC, pick_no'
+        return [dict(row) for row in self._query(sql, params)]
+
+    def league_draft(self, league_id: str, season) -> Tuple[Optional[dict], List[dict]]:
+        """(draft, picks) for the league's latest completed draft in season, or (None, [])."""
+        drafts = self._query('SELECT * FROM drafts WHERE league_id = ? AND season = ? '
+                             'ORDER BY last_picked DESC LIMIT 1', (league_id, str(season)))
+        if not drafts:
+            return None, []
+        row = drafts[0]
+        draft = {'draft_id': row['draft_id'], 'league_id': row['league_id'], 'season': row['season'],
+                 'status': row['status'], 'type': row['type'], 'last_picked': row['last_picked'],
+                 'metadata': {'name': row['name']}}
+        picks = [dict(p) for p in self._query('SELECT * FROM picks WHERE draft_id = ? ORDER BY pick_no',
+                                              (row['draft_id'],))]
+        return draft, picks
+
+    def league_ids_by_season(self, api, league: dict) -> Dict[str, str]:
+        """Season -> league id for this league and its predecessors, syncing them first."""
+        return {str(entry.get('season', '')): entry['league_id']
+                for entry in self.sync_league_history(api, league)}
+
+    def counts(self) -> Dict[str, int]:
+        return {table: self._query(f'SELECT COUNT(*) FROM {table}')[0][0]
+                for table in ('leagues', 'drafts', 'picks')}
+
+
+_warehouse: Optional[DraftWarehouse] = None
+_warehouse_lock = threading.Lock()
+
+
+def get_draft_warehouse() -> DraftWarehouse:
+    """Return the process-wide draft warehouse."""
+    global _warehouse
+    if _warehouse is None:
+        with _warehouse_lock:
+            if _warehouse is None:
+                _warehouse = DraftWarehouse()
+    return _warehouse
+
+
+def reset_draft_warehouse() -> None:
+    """Forget the process-wide warehouse without closing it.
+
+    For forked worker processes: a SQLite connection must not be used (or
+    closed) across a fork, so each child opens its own.
+    """
+    global _warehouse
+    with _warehouse_lock:
+        _warehouse = None
+
+
+def main():
+    from sleeper_api import SleeperAPI
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('username', nargs='?', default=os.getenv('SLEEPER_USERNAME'))
+    parser.add_argument('--seasons', nargs='+', default=['2025', '2024'],
+                        help='seasons whose leagues are ingested (default: 2025 2024)')
+    parser.add_argument('--player', help='print the stored draft history of this player id')
+    args = parser.parse_args()
+
+    warehouse = get_draft_warehouse()
+    if args.player:
+        for pick in warehouse.player_history(args.player):
+            print(f"  {pick['season']}  league {pick['league_id']}  "
+                  f"round {pick['round']}, pick {pick['pick_no']}")
+        return
+
+    if not args.username:
+        print("Error: pass a username or set SLEEPER_USERNAME.")
+        return
+    try:
+        api = SleeperAPI(args.username)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    leagues = warehouse.ingest_user(api, args.seasons)
+    counts = warehouse.counts()
+    print(f"Synced {leagues} leagues: {counts['leagues']} leagues, {counts['drafts']} drafts, "
+          f"{counts['picks']} picks stored in {warehouse.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""Streaming Exporters
+
+Row writers for analysis and ADP exports that write each row as it is
+produced instead of building the whole result in memory first.
+
+The format comes from the file extension: .csv, .jsonl or .ndjson (JSON
+Lines) or .parquet. A plain .json path is refused rather than quietly
+written as JSON Lines; whole documents go through write_json_document. A
+trailing .gz, .bz2 or .xz compresses CSV and JSON Lines output, e.g.
+results.jsonl.gz. Parquet output needs the optional pyarrow package
+and is written in row groups of batch_size rows, so memory stays bounded
+by one batch.
+"""
+
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import os
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only Parquet output needs it
+    pa = pq = None
+
+COMPRESSORS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+# Output format by extension; anything else is written as CSV
+EXTENSION_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet', '.json': 'json'}
+PARQUET_BATCH_SIZE = 10000
+
+
+def split_format(path: str):
+    """(format, compression suffix or None) for an output path."""
+    root, ext = os.path.splitext(path)
+    compression = None
+    if ext.lower() in COMPRESSORS:
+        compression = ext.lower()
+        root, ext = os.path.splitext(root)
+    return EXTENSION_FORMATS.get(ext.lower(), 'csv'), compression
+
+
+def open_text(path: str, compression: Optional[str] = None):
+    """Open path for writing text, compressing on the fly if requested."""
+    if compression:
+        return COMPRESSORS[compression](path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+class RowWriter:
+    """Base class: write(row) one dict at a time, then close()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows_written = 0
+
+    def write(self, row: Dict):
+        raise NotImplementedError
+
+    def write_many(self, rows: Iterable[Dict]) -> int:
+        for row in rows:
+            self.write(row)
+        return self.rows_written
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class CSVRowWriter(RowWriter):
+    def __init__(self, path: str, fieldnames: List[str], compression: Optional[str] = None):
+        super().__init__(path)
+        self._file = open_text(path, compression)
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, row: Dict):
+        self._writer.writerow(row)
+        self.rows_written += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JSONLinesWriter(RowWriter):
+    def __init__(self, path: str, compression: Optional[str] = None):
+        super().__init__(path)
+        self._file = open_text(path, compression)
+
+    def write(self, row: Dict):
+        self._file.write(json.dumps(row, ensure_ascii=False, default=str))
+        self._file.write('\n')
+        self.rows_written += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _infer_kind(values) -> str:
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+        return 'bool'
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return 'int'
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return 'float'
+    return 'string'
+
+
+def _coerce(value, kind: str):
+    """Fit value to a column kind; values that don't fit (e.g. 'N/A' picks) become null."""
+    if value is None:
+        return None
+    try:
+        if kind == 'string':
+            return str(value)
+        if kind == 'bool':
+            return value if isinstance(value, bool) else None
+        if kind == 'int':
+            return int(value)
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ParquetRowWriter(RowWriter):
+    """Buffers up to batch_size rows and writes each batch as a row group.
+
+    Column types come from kinds (column -> 'int' | 'float' | 'bool' |
+    'string') or are inferred from the first batch; mixed columns are
+    stored as strings.
+    """
+
+    ARROW_TYPES = {'int': 'int64', 'float': 'float64', 'bool': 'bool_', 'string': 'string'}
+
+    def __init__(self, path: str, fieldnames: List[str], kinds: Optional[Dict[str, str]] = None,
+                 batch_size: int = PARQUET_BATCH_SIZE, compression: str = 'snappy'):
+        if pa is None:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+        super().__init__(path)
+        self.fieldnames = fieldnames
+        self.kinds = dict(kinds or {})
+        self.batch_size = batch_size
+        self.compression = compression
+        self._batch: List[Dict] = []
+        self._writer = None
+
+    def write(self, row: Dict):
+        self._batch.append(row)
+        self.rows_written += 1
+        if len(self._batch) >= self.batch_size:
+            self._write_batch()
+
+    def _write_batch(self):
+        if not self._batch:
+            return
+        if self._writer is None:
+            for name in self.fieldnames:
+                if name not in self.kinds:
+                    self.kinds[name] = _infer_kind(row.get(name) for row in self._batch)
+            schema = pa.schema([(name, getattr(pa, self.ARROW_TYPES[self.kinds[name]])())
+                                for name in self.fieldnames])
+            self._writer = pq.ParquetWriter(self.path, schema, compression=self.compression)
+        columns = {name: [_coerce(row.get(name), self.kinds[name]) for row in self._batch]
+                   for name in self.fieldnames}
+        self._writer.write_table(pa.table(columns, schema=self._writer.schema))
+        self._batch = []
+
+    def flush(self):
+        # Rows go out in whole row groups of batch_size; close() writes the remainder
+        pass
+
+    def close(self):
+        self._write_batch()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path: str, fieldnames: List[str], kinds: Optional[Dict[str, str]] = None) -> RowWriter:
+    """Row writer for path, picking the format and compression from its extension."""
+    fmt, compression = split_format(path)
+    if fmt == 'json':
+        raise ValueError(f"{path}: row exports are JSON Lines; use a .jsonl or .ndjson filename")
+    if fmt == 'parquet':
+        return ParquetRowWriter(path, fieldnames, kinds)
+    if fmt == 'jsonl':
+        return JSONLinesWriter(path, compression)
+    return CSVRowWriter(path, fieldnames, compression)
+
+
+def export_rows(rows: Iterable[Dict], path: str, fieldnames: List[str],
+                kinds: Optional[Dict[str, str]] = None) -> int:
+    """Stream rows to path; returns the number of rows written."""
+    with open_writer(path, fieldnames, kinds) as writer:
+        return writer.write_many(rows)
+
+
+def write_json_document(path: str, header: Dict, list_key: str, items: Iterable) -> int:
+    """Write {**header, list_key: [items...]} as JSON, serializing one item at a time.
+
+    Compression follows the path suffix like the row writers. Returns the
+    number of items written.
+    """
+    _, compression = split_format(path)
+    count = 0
+    with open_text(path, compression) as f:
+        f.write('{')
+        for key, value in header.items():
+            f.write(f"{json.dumps(key)}: {json.dumps(value, ensure_ascii=False, default=str)},\n")
+        f.write(f"{json.dumps(list_key)}: [\n")
+        for item in items:
+            if count:
+                f.write(',\n')
+            f.write(json.dumps(item, ensure_ascii=False, default=str))
+            count += 1
+        f.write('\n]}\n')
+    return count
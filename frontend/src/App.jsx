@@ -1,63 +1,72 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect } from 'react';
 import KeeperTool from './KeeperTool';
+import { decodeColumnar } from './columnar';
 import './App.css';
 
+const PAGE_SIZE = 50;
+
 function App() {
     const [view, setView] = useState('adp'); // 'adp' or 'keeper'
     const [adpData, setAdpData] = useState([]);
+    const [total, setTotal] = useState(0);
+    const [positions, setPositions] = useState([]);
     const [searchTerm, setSearchTerm] = useState('');
+    const [debouncedSearch, setDebouncedSearch] = useState('');
+    const [position, setPosition] = useState('');
+    const [offset, setOffset] = useState(0);
     const [sortConfig, setSortConfig] = useState({ key: 'average_pick', direction: 'ascending' });
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
 
+    // Wait for typing to pause before asking the server to filter
+    useEffect(() => {
+        const timer = setTimeout(() => setDebouncedSearch(searchTerm), 200);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    // Any change to the query goes back to the first page
+    useEffect(() => {
+        setOffset(0);
+    }, [debouncedSearch, position, sortConfig]);
+
     useEffect(() => {
         // Only fetch ADP data if the view is 'adp'
-        if (view === 'adp') {
-            setLoading(true);
-            fetch('http://localhost:5001/api/adp')
-                .then(response => {
-                    if (!response.ok) {
-                        throw new Error('Network response was not ok');
-                    }
-                    return response.json();
-                })
-                .then(data => {
-                    setAdpData(data);
-                    setLoading(false);
-                })
-                .catch(error => {
-                    console.error('Error fetching ADP data:', error);
-                    setError(error.message);
-                    setLoading(false);
-                });
-        }
-    }, [view]);
+        if (view !== 'adp') return;
 
-    const sortedData = useMemo(() => {
-        if (!adpData) return [];
-        let sortableData = [...adpData];
-        if (sortConfig.key) {
-            sortableData.sort((a, b) => {
-                const aValue = a[sortConfig.key] ?? Infinity;
-                const bValue = b[sortConfig.key] ?? Infinity;
+        const controller = new AbortController();
+        const params = new URLSearchParams({
+            sort: sortConfig.key,
+            direction: sortConfig.direction,
+            offset: String(offset),
+            limit: String(PAGE_SIZE),
+            format: 'columnar',
+        });
+        if (debouncedSearch) params.set('q', debouncedSearch);
+        if (position) params.set('position', position);
 
-                if (aValue < bValue) {
-                    return sortConfig.direction === 'ascending' ? -1 : 1;
+        fetch(`http://localhost:5001/api/adp?${params}`, { signal: controller.signal })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
                 }
-                if (aValue > bValue) {
-                    return sortConfig.direction === 'ascending' ? 1 : -1;
-                }
-                return 0;
+                return response.json();
+            })
+            .then(data => {
+                setAdpData(data.format === 'columnar' ? decodeColumnar(data) : data.rows);
+                setTotal(data.total);
+                setPositions(data.positions || []);
+                setError(null);
+                setLoading(false);
+            })
+            .catch(error => {
+                if (error.name === 'AbortError') return;
+                console.error('Error fetching ADP data:', error);
+                setError(error.message);
+                setLoading(false);
             });
-        }
-        return sortableData;
-    }, [adpData, sortConfig]);
 
-    const filteredData = useMemo(() => {
-        return sortedData.filter(player =>
-            player.player_name.toLowerCase().includes(searchTerm.toLowerCase())
-        );
-    }, [sortedData, searchTerm]);
+        return () => controller.abort();
+    }, [view, sortConfig, debouncedSearch, position, offset]);
 
     const requestSort = (key) => {
         let direction = 'ascending';
@@ -72,6 +81,8 @@ function App() {
         return sortConfig.direction === 'ascending' ? ' ▲' : ' ▼';
     };
 
+    const pageEnd = Math.min(offset + adpData.length, total);
+
     return (
         <div className="App">
             <div className="view-toggle">
@@ -85,47 +96,78 @@ function App() {
             {view === 'adp' ? (
                 <div className="container">
                     <h1>Keeper League Custom ADP</h1>
-                    <input
-                        type="text"
-                        placeholder="Search for a player..."
-                        className="search-bar"
-                        value={searchTerm}
-                        onChange={(e) => setSearchTerm(e.target.value)}
-                        disabled={loading || error}
-                    />
+                    <div className="adp-filters">
+                        <input
+                            type="text"
+                            placeholder="Search for a player..."
+                            className="search-bar"
+                            value={searchTerm}
+                            onChange={(e) => setSearchTerm(e.target.value)}
+                            disabled={loading || error}
+                        />
+                        {positions.length > 0 && (
+                            <select
+                                className="position-filter"
+                                value={position}
+                                onChange={(e) => setPosition(e.target.value)}
+                            >
+                                <option value="">All positions</option>
+                                {positions.map(pos => (
+                                    <option key={pos} value={pos}>{pos}</option>
+                                ))}
+                            </select>
+                        )}
+                    </div>
                     {loading && <p>Loading ADP data...</p>}
                     {error && <p>Error: {error}</p>}
                     {!loading && !error && (
-                        <table className="adp-table" data-testid="adp-table">
-                            <thead>
-                                <tr>
-                                    <th onClick={() => requestSort('player_name')}>Player{getSortIndicator('player_name')}</th>
-                                    <th onClick={() => requestSort('average_pick')}>ADP{getSortIndicator('average_pick')}</th>
-                                    <th onClick={() => requestSort('std_dev')}>Std Dev{getSortIndicator('std_dev')}</th>
-                                    <th onClick={() => requestSort('times_drafted')}># Drafts{getSortIndicator('times_drafted')}</th>
-                                    <th onClick={() => requestSort('earliest_pick')}>Min Pick{getSortIndicator('earliest_pick')}</th>
-                                    <th onClick={() => requestSort('latest_pick')}>Max Pick{getSortIndicator('latest_pick')}</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {filteredData.length > 0 ? (
-                                    filteredData.map((player, index) => (
-                                        <tr key={player.player_name || index}>
-                                            <td>{player.player_name}</td>
-                                            <td>{player.average_pick}</td>
-                                            <td>{player.std_dev}</td>
-                                            <td>{player.times_drafted}</td>
-                                            <td>{player.earliest_pick}</td>
-                                            <td>{player.latest_pick}</td>
-                                        </tr>
-                                    ))
-                                ) : (
+                        <>
+                            <table className="adp-table" data-testid="adp-table">
+                                <thead>
                                     <tr>
-                                        <td colSpan="6">No players found.</td>
+                                        <th onClick={() => requestSort('player_name')}>Player{getSortIndicator('player_name')}</th>
+                                        <th onClick={() => requestSort('average_pick')}>ADP{getSortIndicator('average_pick')}</th>
+                                        <th onClick={() => requestSort('std_dev')}>Std Dev{getSortIndicator('std_dev')}</th>
+                                        <th onClick={() => requestSort('times_drafted')}># Drafts{getSortIndicator('times_drafted')}</th>
+                                        <th onClick={() => requestSort('earliest_pick')}>Min Pick{getSortIndicator('earliest_pick')}</th>
+                                        <th onClick={() => requestSort('latest_pick')}>Max Pick{getSortIndicator('latest_pick')}</th>
                                     </tr>
-                                )}
-                            </tbody>
-                        </table>
+                                </thead>
+                                <tbody>
+                                    {adpData.length > 0 ? (
+                                        adpData.map((player, index) => (
+                                            <tr key={player.player_id || player.player_name || index}>
+                                                <td>{player.player_name}</td>
+                                                <td>{player.average_pick}</td>
+                                                <td>{player.std_dev}</td>
+                                                <td>{player.times_drafted}</td>
+                                                <td>{player.earliest_pick}</td>
+                                                <td>{player.latest_pick}</td>
+                                            </tr>
+                                        ))
+                                    ) : (
+                                        <tr>
+                                            <td colSpan="6">No players found.</td>
+                                        </tr>
+                                    )}
+                                </tbody>
+                            </table>
+                            <div className="pagination">
+                                <button
+                                    onClick={() => setOffset(Math.max(offset - PAGE_SIZE, 0))}
+                                    disabled={offset === 0}
+                                >
+                                    ← Previous
+                                </button>
+                                <span>{total > 0 ? `${offset + 1}–${pageEnd} of ${total}` : '0 players'}</span>
+                                <button
+                                    onClick={() => setOffset(offset + PAGE_SIZE)}
+                                    disabled={pageEnd >= total}
+                                >
+                                    Next →
+                                </button>
+                            </div>
+                        </>
                     )}
                 </div>
             ) : (
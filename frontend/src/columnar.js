@@ -0,0 +1,20 @@
+// Decoder for the columnar /api/adp response shape (format=columnar).
+// String columns arrive dictionary-encoded as { dictionary, codes };
+// numeric columns are plain arrays. Rows are rebuilt lazily per page.
+
+const decodeColumn = (column) =>
+    Array.isArray(column) ? column : column.codes.map(code => column.dictionary[code]);
+
+export const decodeColumnar = ({ length, columns }) => {
+    const fields = Object.keys(columns);
+    const decoded = fields.map(field => decodeColumn(columns[field]));
+    const rows = new Array(length);
+    for (let i = 0; i < length; i++) {
+        const row = {};
+        for (let f = 0; f < fields.length; f++) {
+            row[fields[f]] = decoded[f][i];
+        }
+        rows[i] = row;
+    }
+    return rows;
+};
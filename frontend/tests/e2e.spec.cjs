@@ -4,7 +4,7 @@ const { test, expect } = require('@playwright/test');
 test.beforeEach(async ({ page }) => {
   // Navigate to the app and wait for the data to load
   await page.goto('/');
-  await page.waitForResponse('**/api/adp');
+  await page.waitForResponse(response => response.url().includes('/api/adp'));
 });
 
 test('homepage has correct title and loads data table', async ({ page }) => {
@@ -54,17 +54,18 @@ test('sort functionality works correctly', async ({ page }) => {
     })
   );
 
-  const initialAdp = await getAdpValues();
+  // Rows come back sorted from the server one page at a time, so check the
+  // visible page is ordered rather than comparing against the first page.
+  const isSorted = (values, compare) =>
+    values.every((value, i) => i === 0 || compare(values[i - 1], value) <= 0);
 
   // Click to sort descending
   await adpHeader.click();
-  const descendingAdp = await getAdpValues();
-  const sortedDescending = [...initialAdp].sort((a, b) => b - a);
-  expect(descendingAdp).toEqual(sortedDescending);
+  await expect(adpHeader).toContainText('▼');
+  await expect.poll(async () => isSorted(await getAdpValues(), (a, b) => b - a)).toBe(true);
 
   // Click again to sort ascending
   await adpHeader.click();
-  const ascendingAdp = await getAdpValues();
-  const sortedAscending = [...initialAdp].sort((a, b) => a - b);
-  expect(ascendingAdp).toEqual(sortedAscending);
+  await expect(adpHeader).toContainText('▲');
+  await expect.poll(async () => isSorted(await getAdpValues(), (a, b) => a - b)).toBe(true);
 });
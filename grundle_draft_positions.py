@@ -9,236 +9,260 @@ in the Grundle league, providing detailed analysis of draft value and roster com
 import os
 import sys
 import json
-import csv
+import hashlib
 from datetime import datetime
 from dotenv import load_dotenv
 from sleeper_api import SleeperAPI
+from league_snapshot import find_league, get_user_leagues, load_league_snapshot
+from exporters import export_rows, write_json_document
+import tracing
 
 load_dotenv()
 
+# Bump when the per-team result format changes so old state files are ignored
+STATE_VERSION = 1
+
 class GrundleDraftAnalyzer:
-    def __init__(self, username):
-        """Initialize the analyzer with a Sleeper username."""
-        self.api = SleeperAPI(username)
+    def __init__(self, username, season='2025', draft_season='2024', league_name='grundle', api=None,
+                 incremental=True, state_dir=None):
+        """Initialize the analyzer with a Sleeper username.
+
+        season is the season whose rosters are analyzed, draft_season the
+        season whose draft positions are looked up and league_name the
+        substring used to find the league. With incremental set, per-team
+        results are saved under state_dir and reused while a team's roster
+        and draft data are unchanged.
+        """
+        self.api = api or SleeperAPI(username)
         self.username = username
-        self.season = '2025'  # Current season for roster data
-        self.draft_season = '2024'  # Season we want draft data from
+        self.season = str(season)  # Current season for roster data
+        self.draft_season = str(draft_season)  # Season we want draft data from
+        self.league_name = league_name
         self.league_data = None
         self.roster_data = None
         self.draft_data = None
         self.players_data = None
+        self.incremental = incremental
+        self.state_dir = state_dir or os.getenv('ANALYSIS_STATE_DIR', '.analysis_state')
+        self.last_reuse = None
         
+    @tracing.traced('grundle.find_league')
     def find_grundle_league(self):
         """Find the Grundle league for the current season."""
-        print(f"Looking for Grundle league in {self.season}...")
-        leagues = self.api.get_leagues(self.season)
+        print(f"Looking for {self.league_name.title()} league in {self.season}...")
+        leagues = get_user_leagues(self.api, self.season)
         
         if not leagues:
             print(f"No leagues found for {self.username} in {self.season}")
             return None
             
         # Look for Grundle league
-        grundle_league = None
-        for league in leagues:
-            if 'grundle' in league['name'].lower():
-                grundle_league = league
-                break
+        grundle_league = find_league(leagues, self.league_name, fallback_to_first=False)
                 
         if grundle_league:
-            print(f"Found Grundle league: {grundle_league['name']}")
+            print(f"Found {self.league_name.title()} league: {grundle_league['name']}")
             return grundle_league
         else:
-            print("Grundle league not found. Available leagues:")
+            print(f"{self.league_name.title()} league not found. Available leagues:")
             for i, league in enumerate(leagues, 1):
                 print(f"  {i}. {league['name']}")
             return None
     
-    def get_league_rosters(self, league_id):
-        """Get all rosters for the league."""
-        print("Fetching current rosters...")
-        rosters = self.api.get_rosters(league_id)
-        users = self.api.get_league_users(league_id)
-        
-        if not rosters or not users:
-            print("Failed to retrieve roster or user data")
-            return None
-            
-        # Create user mapping
-        user_map = {user['user_id']: user for user in users}
-        
-        return {'rosters': rosters, 'users': user_map}
-    
-    def get_2024_draft_data(self):
-        """Get draft data specifically from 2024."""
-        print(f"Looking for {self.draft_season} draft data...")
-        
-        # Get all drafts from 2024
-        drafts = self.api.get_all_drafts(self.draft_season)
-        
-        if not drafts:
-            print(f"No drafts found for {self.draft_season}")
-            return None
-            
-        print(f"Found {len(drafts)} draft(s) from {self.draft_season}")
-        
-        # Find drafts that are completed
-        completed_drafts = [d for d in drafts if d.get('status') == 'complete']
-        
-        if not completed_drafts:
-            print("No completed drafts found")
-            return None
-            
-        # Use the most recent completed draft
-        latest_draft = max(completed_drafts, key=lambda x: x.get('last_picked', 0))
-        draft_id = latest_draft['draft_id']
-        
-        print(f"Using draft: {latest_draft.get('metadata', {}).get('name', 'Unknown')} (ID: {draft_id})")
-        
-        # Get all draft picks
-        picks = self.api.get_draft_picks(draft_id)
-        
-        if picks:
-            print(f"Retrieved {len(picks)} draft picks")
-            return picks
-        else:
-            print("No draft picks found")
-            return None
-    
-    def get_all_players(self):
-        """Get all player data for lookups."""
-        print("Loading player database...")
-        players = self.api.get_players()
-        
-        if players:
-            print(f"Loaded {len(players)} players")
-            return players
-        else:
-            print("Failed to load player data")
-            return None
-    
     def analyze_rosters_with_draft_data(self):
         """Main analysis function that combines current rosters with 2024 draft data."""
         # Find Grundle league
         league = self.find_grundle_league()
         if not league:
             return None
-            
+        return self.analyze_league(league)
+
+    @tracing.traced('grundle.analyze_league')
+    def analyze_league(self, league):
+        """Combine one league's rosters in self.season with its self.draft_season draft data."""
         self.league_data = league
-        league_id = league['league_id']
         
-        # Get current roster data
-        self.roster_data = self.get_league_rosters(league_id)
-        if not self.roster_data:
+        # Rosters, users, players and the draft come from one shared snapshot
+        print(f"Fetching current rosters, player database and {self.draft_season} draft data...")
+        try:
+            with tracing.span('grundle.load_snapshot', league_id=league['league_id']):
+                snapshot = load_league_snapshot(self.api, league, self.season,
+                                                draft_seasons=[self.draft_season])
+        except ValueError as e:
+            print(e)
             return None
-            
-        # Get 2024 draft data
-        self.draft_data = self.get_2024_draft_data()
-        if not self.draft_data:
+
+        self.roster_data = {'rosters': snapshot.rosters, 'users': snapshot.user_map}
+        self.players_data = snapshot.players
+        self.draft_data = snapshot.draft_picks
+        if snapshot.draft:
+            print(f"Using draft: {snapshot.draft.name or 'Unknown'} "
+                  f"(ID: {snapshot.draft.draft_id}) with {len(snapshot.draft_picks)} picks")
+        else:
             print("Warning: No draft data available. Players will show as 'Undrafted'")
-            self.draft_data = []
-            
-        # Get player data
-        self.players_data = self.get_all_players()
-        if not self.players_data:
-            return None
-            
+
         # Create draft pick mapping
         draft_pick_map = {}
-        for pick in self.draft_data:
-            if pick.get('player_id'):
-                draft_pick_map[pick['player_id']] = {
-                    'round': pick.get('round', 'N/A'),
-                    'pick': pick.get('pick_no', 'N/A'),
-                    'overall': pick.get('pick_no', 'N/A')
-                }
+        for player_id, pick in snapshot.pick_by_player.items():
+            draft_pick_map[player_id] = {
+                'round': pick.round,
+                'pick': pick.pick_no,
+                'overall': pick.pick_no
+            }
         
-        # Analyze each roster
+        # Only teams whose roster, names, players or draft picks changed since
+        # the last run are recomputed; the rest come from the saved state
+        state = self.load_state(league) if self.incremental else {}
+        new_state = {}
+        reused, recomputed = [], []
         analysis_results = []
         
-        for roster in self.roster_data['rosters']:
-            owner_id = roster.get('owner_id')
-            if not owner_id:
-                continue
-                
-            owner_info = self.roster_data['users'].get(owner_id, {})
-            owner_name = owner_info.get('display_name', 'Unknown Owner')
-            team_name = owner_info.get('metadata', {}).get('team_name', owner_name)
+        with tracing.span('grundle.rosters', teams=len(self.roster_data['rosters'])):
+            for roster in self.roster_data['rosters']:
+                owner_id = roster.owner_id
+                if not owner_id:
+                    continue
             
-            players_on_roster = roster.get('players', [])
-            
-            roster_analysis = {
-                'owner_id': owner_id,
-                'owner_name': owner_name,
-                'team_name': team_name,
-                'players': [],
-                'stats': {
-                    'total_players': len(players_on_roster),
-                    'drafted_players': 0,
-                    'undrafted_players': 0,
-                    'earliest_pick': float('inf'),
-                    'latest_pick': 0,
-                    'total_draft_picks': 0
-                }
-            }
-            
-            for player_id in players_on_roster:
-                player_info = self.players_data.get(player_id, {})
-                draft_info = draft_pick_map.get(player_id, {'round': 'N/A', 'pick': 'N/A', 'overall': 'N/A'})
-                
-                # Get position info
-                position = player_info.get('position', 'N/A')
-                if position in ['DL', 'LB', 'DB'] and 'fantasy_positions' in player_info:
-                    fantasy_pos = player_info.get('fantasy_positions', [])
-                    if fantasy_pos:
-                        position = fantasy_pos[0]
-                
-                player_data = {
-                    'id': player_id,
-                    'name': player_info.get('full_name', 'Unknown Player'),
-                    'position': position,
-                    'nfl_team': player_info.get('team', 'FA'),
-                    'draft_round': draft_info['round'],
-                    'draft_pick': draft_info['pick'],
-                    'overall_pick': draft_info['overall'],
-                    'drafted': draft_info['round'] != 'N/A'
-                }
-                
-                roster_analysis['players'].append(player_data)
-                
-                # Update stats
-                if player_data['drafted']:
-                    roster_analysis['stats']['drafted_players'] += 1
-                    pick_num = int(draft_info['overall']) if draft_info['overall'] != 'N/A' else float('inf')
-                    roster_analysis['stats']['earliest_pick'] = min(roster_analysis['stats']['earliest_pick'], pick_num)
-                    roster_analysis['stats']['latest_pick'] = max(roster_analysis['stats']['latest_pick'], pick_num)
-                    roster_analysis['stats']['total_draft_picks'] += 1
+                roster_hash = self._roster_hash(roster, snapshot, draft_pick_map)
+                previous = state.get(owner_id)
+                if previous and previous['hash'] == roster_hash:
+                    roster_analysis = previous['result']
+                    reused.append(roster_analysis['team_name'])
                 else:
-                    roster_analysis['stats']['undrafted_players'] += 1
-            
-            # Clean up stats
-            if roster_analysis['stats']['earliest_pick'] == float('inf'):
-                roster_analysis['stats']['earliest_pick'] = 'N/A'
-                
-            # Sort players by draft position (drafted first, then by pick number)
-            roster_analysis['players'].sort(key=lambda x: (
-                not x['drafted'],  # False (drafted) sorts before True (undrafted)
-                float('inf') if x['overall_pick'] == 'N/A' else int(x['overall_pick']),
-                x['name']
-            ))
-            
-            analysis_results.append(roster_analysis)
+                    roster_analysis = self._analyze_roster(roster, snapshot, draft_pick_map)
+                    recomputed.append(roster_analysis['team_name'])
+                new_state[owner_id] = {'hash': roster_hash, 'result': roster_analysis}
+                analysis_results.append(roster_analysis)
+        
+        self.last_reuse = {'reused': reused, 'recomputed': recomputed}
+        if self.incremental:
+            self.save_state(league, new_state)
+            if reused:
+                print(f"Reused {len(reused)} unchanged teams; recomputed {len(recomputed)}"
+                      + (f": {', '.join(recomputed)}" if recomputed else ""))
         
         # Sort teams by owner name
         analysis_results.sort(key=lambda x: x['owner_name'])
         
         return {
             'league_name': league['name'],
+            'league_id': league['league_id'],
             'season': self.season,
             'draft_season': self.draft_season,
             'analysis_date': datetime.now().isoformat(),
             'teams': analysis_results
         }
 
+    @tracing.traced('grundle.analyze_team')
+    def _analyze_roster(self, roster, snapshot, draft_pick_map):
+        """Analysis (players with draft positions, plus stats) for one team."""
+        owner_id = roster.owner_id
+        owner_name = snapshot.owner_name(owner_id)
+        team_name = snapshot.team_name(owner_id)
+        
+        players_on_roster = roster.players
+        
+        roster_analysis = {
+            'owner_id': owner_id,
+            'owner_name': owner_name,
+            'team_name': team_name,
+            'players': [],
+            'stats': {
+                'total_players': len(players_on_roster),
+                'drafted_players': 0,
+                'undrafted_players': 0,
+                'earliest_pick': float('inf'),
+                'latest_pick': 0,
+                'total_draft_picks': 0
+            }
+        }
+        
+        for player_id in players_on_roster:
+            player = snapshot.player(player_id)
+            draft_info = draft_pick_map.get(player_id, {'round': 'N/A', 'pick': 'N/A', 'overall': 'N/A'})
+            
+            player_data = {
+                'id': player_id,
+                'name': player.full_name,
+                'position': player.display_position,
+                'nfl_team': player.team,
+                'draft_round': draft_info['round'],
+                'draft_pick': draft_info['pick'],
+                'overall_pick': draft_info['overall'],
+                'drafted': draft_info['round'] != 'N/A'
+            }
+            
+            roster_analysis['players'].append(player_data)
+            
+            # Update stats
+            if player_data['drafted']:
+                roster_analysis['stats']['drafted_players'] += 1
+                pick_num = int(draft_info['overall']) if draft_info['overall'] != 'N/A' else float('inf')
+                roster_analysis['stats']['earliest_pick'] = min(roster_analysis['stats']['earliest_pick'], pick_num)
+                roster_analysis['stats']['latest_pick'] = max(roster_analysis['stats']['latest_pick'], pick_num)
+                roster_analysis['stats']['total_draft_picks'] += 1
+            else:
+                roster_analysis['stats']['undrafted_players'] += 1
+        
+        # Clean up stats
+        if roster_analysis['stats']['earliest_pick'] == float('inf'):
+            roster_analysis['stats']['earliest_pick'] = 'N/A'
+            
+        # Sort players by draft position (drafted first, then by pick number)
+        roster_analysis['players'].sort(key=lambda x: (
+            not x['drafted'],  # False (drafted) sorts before True (undrafted)
+            float('inf') if x['overall_pick'] == 'N/A' else int(x['overall_pick']),
+            x['name']
+        ))
+        return roster_analysis
+
+    def _roster_hash(self, roster, snapshot, draft_pick_map):
+        """Hash of what this roster's analysis shows: names, players and their picks.
+
+        Player records are already decoded in the snapshot, so reading their
+        fields here is cheap; including them means an NFL trade or position
+        change invalidates the saved result.
+        """
+        owner_id = roster.owner_id
+        players = []
+        for player_id in sorted(roster.players):
+            player = snapshot.player(player_id)
+            pick = draft_pick_map.get(player_id)
+            players.append((player_id, player.full_name, player.team, player.position,
+                            player.display_position, pick['round'] if pick else None,
+                            pick['pick'] if pick else None))
+        content = [snapshot.owner_name(owner_id), snapshot.team_name(owner_id), players]
+        return hashlib.sha256(json.dumps(content, default=str).encode('utf-8')).hexdigest()
+
+    def state_path(self, league):
+        """File holding the per-team hashes and results of the last run for this league."""
+        return os.path.join(self.state_dir,
+                            f"{league['league_id']}_{self.season}_{self.draft_season}.json")
+
+    @tracing.traced('grundle.load_state')
+    def load_state(self, league):
+        """owner_id -> {'hash', 'result'} from the last run, or {} if there is none."""
+        try:
+            with open(self.state_path(league), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if state.get('version') != STATE_VERSION:
+            return {}
+        return state.get('teams', {})
+
+    @tracing.traced('grundle.save_state')
+    def save_state(self, league, teams):
+        """Write the state atomically so an interrupted run can't leave a torn file."""
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            path = self.state_path(league)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': STATE_VERSION, 'teams': teams}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not save analysis state: {e}")
+
 def display_summary_table(data):
     """Display a summary table of draft analysis."""
     if not data:
@@ -297,33 +321,40 @@ def display_detailed_rosters(data):
             print(f"{player['name'][:29]:<30} {player['position']:<4} {nfl_team:<4} "
                   f"{round_str:<6} {pick_str:<6} {overall_str:<8}")
 
+PLAYER_ROW_FIELDS = ['team_name', 'owner_name', 'player_name', 'position', 'nfl_team',
+                     'draft_round', 'draft_pick', 'overall_pick', 'drafted']
+# Parquet column types; 'N/A' picks are stored as nulls
+PLAYER_ROW_KINDS = {'draft_round': 'int', 'draft_pick': 'int', 'overall_pick': 'int', 'drafted': 'bool'}
+
+def iter_player_rows(data):
+    """One flat row per rostered player, generated lazily."""
+    for team in data['teams']:
+        for player in team['players']:
+            yield {
+                'team_name': team['team_name'],
+                'owner_name': team['owner_name'],
+                'player_name': player['name'],
+                'position': player['position'],
+                'nfl_team': player['nfl_team'],
+                'draft_round': player['draft_round'],
+                'draft_pick': player['draft_pick'],
+                'overall_pick': player['overall_pick'],
+                'drafted': player['drafted']
+            }
+
 def save_to_csv(data, filename):
-    """Save analysis data to CSV file."""
+    """Save analysis data to a CSV file, streaming one row per player.
+
+    A .jsonl (or .ndjson) or .parquet filename writes that format instead
+    (use save_to_json for a .json document), and a .gz, .bz2 or .xz suffix
+    compresses the output.
+    """
     if not data:
         print("No data to save")
         return False
         
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['team_name', 'owner_name', 'player_name', 'position', 'nfl_team', 
-                         'draft_round', 'draft_pick', 'overall_pick', 'drafted']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for team in data['teams']:
-                for player in team['players']:
-                    writer.writerow({
-                        'team_name': team['team_name'],
-                        'owner_name': team['owner_name'],
-                        'player_name': player['name'],
-                        'position': player['position'],
-                        'nfl_team': player['nfl_team'],
-                        'draft_round': player['draft_round'],
-                        'draft_pick': player['draft_pick'],
-                        'overall_pick': player['overall_pick'],
-                        'drafted': player['drafted']
-                    })
-        
+        export_rows(iter_player_rows(data), filename, PLAYER_ROW_FIELDS, PLAYER_ROW_KINDS)
         print(f"Data saved to {filename}")
         return True
         
@@ -332,14 +363,14 @@ def save_to_csv(data, filename):
         return False
 
 def save_to_json(data, filename):
-    """Save analysis data to JSON file."""
+    """Save analysis data to a JSON file, serializing one team at a time."""
     if not data:
         print("No data to save")
         return False
         
     try:
-        with open(filename, 'w', encoding='utf-8') as jsonfile:
-            json.dump(data, jsonfile, indent=2, ensure_ascii=False)
+        header = {key: value for key, value in data.items() if key != 'teams'}
+        write_json_document(filename, header, 'teams', data['teams'])
         
         print(f"Data saved to {filename}")
         return True
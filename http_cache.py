@@ -0,0 +1,144 @@
+"""HTTP Response Caching
+
+Serializes API payloads once per dataset version, tags them with a strong
+content-hash ETag, answers If-None-Match revalidations with 304 and
+negotiates gzip/brotli encodings from bodies compressed once and cached.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+from flask import Response, request
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this go out uncompressed; the headers would outweigh the savings
+MIN_COMPRESS_SIZE = 1024
+MAX_CACHED_BODIES = 64
+
+
+class EncodedBody:
+    """A serialized JSON body plus its lazily compressed variants."""
+
+    def __init__(self, body: bytes):
+        self.identity = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def tag_for(self, encoding: str) -> str:
+        """Strong ETag for one encoding; each representation gets its own tag."""
+        return self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+
+    def all_tags(self):
+        return [self.tag_for(encoding) for encoding in ('identity', 'gzip', 'br')]
+
+    def encoded(self, encoding: str) -> bytes:
+        if encoding == 'identity':
+            return self.identity
+        with self._lock:
+            body = self._encoded.get(encoding)
+            if body is None:
+                if encoding == 'br':
+                    body = brotli.compress(self.identity, quality=5)
+                else:
+                    body = gzip.compress(self.identity, compresslevel=6, mtime=0)
+                self._encoded[encoding] = body
+            return body
+
+
+class BodyCache:
+    """Small LRU of encoded bodies keyed by (resource, dataset version, query)."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_BODIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, EncodedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[EncodedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: EncodedBody) -> EncodedBody:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+
+body_cache = BodyCache()
+
+
+def serialize_json(payload) -> bytes:
+    """Compact, deterministic JSON so equal payloads hash to equal ETags."""
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def choose_encoding(body: EncodedBody) -> str:
+    """Pick the best encoding the client accepts for this body."""
+    if len(body.identity) < MIN_COMPRESS_SIZE:
+        return 'identity'
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return 'identity'
+
+
+def get_encoded_body(cache_key: Optional[Hashable], build_payload: Callable[[], object]) -> EncodedBody:
+    """Return the cached body for cache_key, building and serializing it on a miss."""
+    if cache_key is not None:
+        cached = body_cache.get(cache_key)
+        if cached is not None:
+            metrics.record_cache('http_body', 'hit')
+            return cached
+
+    body = EncodedBody(serialize_json(build_payload()))
+    if cache_key is None:
+        # No version to key on: the content hash is the version
+        cache_key = ('etag', body.etag)
+        cached = body_cache.get(cache_key)
+        if cached is not None:
+            metrics.record_cache('http_body', 'hit')
+            return cached
+    metrics.record_cache('http_body', 'miss')
+    return body_cache.put(cache_key, body)
+
+
+def cached_json_response(build_payload: Callable[[], object], cache_key: Optional[Hashable] = None,
+                         status: int = 200, mimetype: str = 'application/json',
+                         vary: str = 'Accept-Encoding') -> Response:
+    """Build a JSON response with a strong ETag, 304 handling and compression."""
+    body = get_encoded_body(cache_key, build_payload)
+
+    if any(request.if_none_match.contains_weak(tag) for tag in body.all_tags()):
+        metrics.record_cache('http_etag', 'not_modified')
+        response = Response(status=304)
+        response.set_etag(body.tag_for(choose_encoding(body)))
+    else:
+        metrics.record_cache('http_etag', 'full')
+        encoding = choose_encoding(body)
+        response = Response(body.encoded(encoding), status=status, mimetype=mimetype)
+        response.set_etag(body.tag_for(encoding))
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.headers['Vary'] = vary
+    # Let clients keep the body but always revalidate it with If-None-Match
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -1,107 +1,60 @@
 import os
 from dotenv import load_dotenv
 from sleeper_api import SleeperAPI
+from league_snapshot import load_user_league_snapshot
+import tracing
 
 load_dotenv()
 
+@tracing.traced('keeper.get_keeper_data')
 def get_keeper_data(user_name, season='2024'):
-    api = SleeperAPI(user_name)
-    user = api.get_user(user_name)
-    if not user:
-        raise ValueError(f"User '{user_name}' not found.")
+    # Resolves the user id, raising ValueError if the user doesn't exist
+    with tracing.span('keeper.resolve_user', user=user_name):
+        api = SleeperAPI(user_name)
 
-    user_id = user['user_id']
-    leagues = api.get_leagues(season)
-    if not leagues:
+    # Find the Grundle league specifically, falling back to the first league.
+    # Draft picks come from the current season's draft, then previous seasons.
+    with tracing.span('keeper.load_snapshot', season=season):
+        snapshot = load_user_league_snapshot(api, season, name_match='grundle')
+    if not snapshot:
         raise ValueError(f"No leagues found for user '{user_name}' in the {season} season.")
 
-    # Find the Grundle league specifically
-    league = None
-    for l in leagues:
-        if 'grundle' in l['name'].lower():
-            league = l
-            break
-    
-    if not league:
-        # Fallback to first league if Grundle not found
-        league = leagues[0]
-    league_id = league['league_id']
-
-    rosters = api.get_rosters(league_id)
-    users_in_league = api.get_league_users(league_id)
-    all_players = api.get_players()
-
-    # Try to find draft data from current season first, then previous seasons
-    draft_picks = []
-    seasons_to_try = [season, str(int(season) - 1), str(int(season) - 2)]
-    
-    for try_season in seasons_to_try:
-        drafts = api.get_all_drafts(try_season)
-        
-        if drafts:
-            # Use the most recent draft from this season
-            draft = drafts[0]  # Drafts are usually sorted by recency
-            draft_id = draft['draft_id']
-            draft_picks = api.get_draft_picks(draft_id)
-            if draft_picks:
-                break
-
-    # Create a map for user_id to display_name
-    user_map = {u['user_id']: u['display_name'] for u in users_in_league}
-
-    # Create a map for player_id to player details
-    player_map = {p_id: p_info for p_id, p_info in all_players.items()}
-
-    # Create a map for player_id to draft pick info
-    draft_pick_map = {}
-    for pick in draft_picks:
-        if pick.get('player_id'):
-            draft_pick_map[pick['player_id']] = {
-                'round': pick.get('round', 'N/A'), 
-                'pick': pick.get('pick_no', pick.get('draft_slot', 'N/A'))
-            }
-
     teams_data = []
-    for roster in rosters:
-        owner_id = roster.get('owner_id')
-        if not owner_id:
-            continue
+    with tracing.span('keeper.rosters', teams=len(snapshot.rosters)):
+        for roster in snapshot.rosters:
+            owner_id = roster.owner_id
+            if not owner_id or not roster.players:
+                continue
 
-        players_in_roster = roster.get('players', [])
-        if not players_in_roster:
-            continue
+            player_details_list = []
+            for player_id in roster.players:
+                player = snapshot.players.get(player_id)
+                if player:
+                    pick = snapshot.pick_by_player.get(player_id)
+                    if pick:
+                        draft_round = pick.round
+                        draft_pick = pick.pick_no if pick.pick_no is not None else pick.draft_slot
+                    else:
+                        draft_round = draft_pick = 'N/A'
 
-        player_details_list = []
-        for player_id in players_in_roster:
-            player_info = player_map.get(player_id)
-            if player_info:
-                draft_info = draft_pick_map.get(player_id, {'round': 'N/A', 'pick': 'N/A'})
-                # Get better position data for IDP players
-                position = player_info.get('position', 'N/A')
-                # For IDP players, try to get more specific position from fantasy_positions if available
-                if position in ['DL', 'LB', 'DB'] and 'fantasy_positions' in player_info:
-                    # Use the first fantasy position if available as it's often more specific
-                    fantasy_pos = player_info.get('fantasy_positions', [])
-                    if fantasy_pos and len(fantasy_pos) > 0:
-                        position = fantasy_pos[0]
-                
-                player_details_list.append({
-                    'id': player_id,
-                    'name': player_info.get('full_name', 'Unknown Player'),
-                    'position': position,
-                    'draft_round': draft_info['round'],
-                    'draft_pick': draft_info['pick'],
-                    'team': player_info.get('team', 'FA')  # Add team info to help identify players
-                })
+                    player_details_list.append({
+                        'id': player_id,
+                        'name': player.full_name,
+                        # Uses the more specific fantasy position for IDP players
+                        'position': player.display_position,
+                        'draft_round': draft_round,
+                        'draft_pick': draft_pick,
+                        'team': player.team  # Add team info to help identify players
+                    })
 
-        teams_data.append({
-            'owner_id': owner_id,
-            'owner_name': user_map.get(owner_id, 'Unknown Owner'),
-            'players': player_details_list
-        })
+            teams_data.append({
+                'owner_id': owner_id,
+                'owner_name': snapshot.owner_name(owner_id),
+                'players': player_details_list
+            })
 
     return {
-        'league_name': league['name'],
+        'league_name': snapshot.league_name,
         'teams': teams_data
     }
 
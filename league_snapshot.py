@@ -0,0 +1,289 @@
+"""League Snapshot
+
+Assembles everything the roster tools need about one league - the league
+itself, rosters, users, the player database and the reference draft's
+picks - in a single pass with concurrent upstream fetches, decodes it into
+the slotted records of records.py and indexes it (player -> pick, owner ->
+roster, owner -> user). Completed drafts are read from the local draft
+warehouse (draft_warehouse.py).
+
+Snapshots, league listings, draft listings and draft picks are memoized
+per process, so keeper_tool, GrundleDraftAnalyzer and roster_viewer (or
+repeated API refreshes) share one set of upstream calls.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+import tracing
+from draft_warehouse import get_draft_warehouse
+from player_store import get_player_store
+from records import Draft, League, Pick, Player, Roster, User, decode_players
+from sleeper_api import get_all_drafts
+
+# Upstream calls issued at once while assembling a snapshot
+UPSTREAM_WORKERS = 8
+# Completed drafts never change, so their picks can be kept for a long time
+DRAFT_PICKS_MAX_AGE = 24 * 60 * 60
+
+
+def _snapshot_max_age() -> float:
+    """Seconds a league snapshot is reused before rosters are fetched again."""
+    return float(os.getenv('LEAGUE_SNAPSHOT_MAX_AGE', '60'))
+
+
+class _MemoCache:
+    """Expiring memo table that lets only one caller load a given key at a time."""
+
+    def __init__(self):
+        self._values: Dict[Hashable, tuple] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], object], max_age: float):
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and time.time() - cached[0] <= max_age:
+                return cached[1]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                cached = self._values.get(key)
+            if cached is not None and time.time() - cached[0] <= max_age:
+                return cached[1]
+            value = loader()
+            # Don't memoize failed (None) upstream responses
+            if value is not None:
+                with self._lock:
+                    self._values[key] = (time.time(), value)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+_leagues_cache = _MemoCache()
+_drafts_cache = _MemoCache()
+_picks_cache = _MemoCache()
+_snapshot_cache = _MemoCache()
+
+
+def clear_caches() -> None:
+    """Forget every memoized listing and snapshot."""
+    for cache in (_leagues_cache, _drafts_cache, _picks_cache, _snapshot_cache):
+        cache.clear()
+
+
+def get_user_leagues(api, season) -> Optional[List[dict]]:
+    """Memoized SleeperAPI.get_leagues."""
+    return _leagues_cache.get_or_load((api.user_id, str(season)),
+                                      lambda: api.get_leagues(season), _snapshot_max_age())
+
+
+def get_user_drafts(api, season) -> Optional[List[dict]]:
+    """Memoized SleeperAPI.get_all_drafts."""
+    return _drafts_cache.get_or_load((api.user_id, str(season)),
+                                     lambda: api.get_all_drafts(season), _snapshot_max_age())
+
+
+def get_drafts_for_user(user_id, season, max_age: Optional[float] = None) -> Optional[List[dict]]:
+    """Memoized sleeper_api.get_all_drafts, sharing get_user_drafts' cache.
+
+    max_age (default the snapshot age) lets a poller keep the listing no
+    longer than its polling interval.
+    """
+    return _drafts_cache.get_or_load((user_id, str(season)), lambda: get_all_drafts(user_id, season),
+                                     _snapshot_max_age() if max_age is None else max_age)
+
+
+def get_draft_picks(api, draft_id) -> Optional[List[dict]]:
+    """Memoized SleeperAPI.get_draft_picks."""
+    return _picks_cache.get_or_load(draft_id, lambda: api.get_draft_picks(draft_id),
+                                    DRAFT_PICKS_MAX_AGE)
+
+
+def find_league(leagues: Optional[List[dict]], name_match: str = 'grundle',
+                fallback_to_first: bool = True) -> Optional[dict]:
+    """The first league whose name contains name_match, else optionally the first league."""
+    if not leagues:
+        return None
+    for league in leagues:
+        if name_match.lower() in league.get('name', '').lower():
+            return league
+    return leagues[0] if fallback_to_first else None
+
+
+def select_draft(drafts: Optional[List[dict]], league: dict) -> Optional[dict]:
+    """Pick the draft that belongs to this league (or its previous season).
+
+    Prefers the most recent completed one. Returns None when no listed draft
+    belongs to the league: the rest are other leagues' drafts or mocks, and
+    their picks would be reported as this league's keeper rounds.
+    """
+    if not drafts:
+        return None
+    league_ids = {league.get('league_id'), league.get('previous_league_id')} - {None}
+    candidates = [d for d in drafts if d.get('league_id') in league_ids]
+    if not candidates:
+        return None
+    completed = [d for d in candidates if d.get('status') == 'complete']
+    if completed:
+        return max(completed, key=lambda d: d.get('last_picked') or 0)
+    return candidates[0]
+
+
+@dataclass
+class LeagueSnapshot:
+    """League, rosters, users, players and draft picks with lookup indexes.
+
+    players holds records for the rostered and drafted players only.
+    """
+    league: League
+    season: str
+    rosters: List[Roster]
+    users: List[User]
+    players: Dict[str, Player]
+    draft_picks: List[Pick]
+    draft: Optional[Draft] = None
+    draft_season: Optional[str] = None
+    user_map: Dict[str, User] = field(init=False, repr=False)
+    roster_by_owner: Dict[str, Roster] = field(init=False, repr=False)
+    pick_by_player: Dict[str, Pick] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.user_map = {u.user_id: u for u in self.users}
+        self.roster_by_owner = {r.owner_id: r for r in self.rosters if r.owner_id}
+        self.pick_by_player = {p.player_id: p for p in self.draft_picks if p.player_id}
+
+    @property
+    def league_id(self) -> str:
+        return self.league.league_id
+
+    @property
+    def league_name(self) -> str:
+        return self.league.name
+
+    def owner_name(self, owner_id: str) -> str:
+        user = self.user_map.get(owner_id)
+        return user.display_name if user else 'Unknown Owner'
+
+    def team_name(self, owner_id: str) -> str:
+        user = self.user_map.get(owner_id)
+        return (user and user.team_name) or self.owner_name(owner_id)
+
+    def player(self, player_id: str) -> Player:
+        """The player's record, or an 'Unknown Player' placeholder if the database lacks it."""
+        return self.players.get(player_id) or Player.from_json(player_id, {})
+
+    def player_position(self, player_id: str) -> str:
+        return self.player(player_id).display_position
+
+
+def _fetch_season_draft(api, league, season):
+    """(draft, picks) for the league's draft in one season, or (None, [])."""
+    draft = select_draft(get_user_drafts(api, season), league)
+    if not draft:
+        return None, []
+    return draft, get_draft_picks(api, draft['draft_id']) or []
+
+
+def _fetch_reference_draft(api, league, draft_seasons):
+    """(season, draft, picks) for the first season in draft_seasons that has picks.
+
+    Completed drafts of the league and its predecessors come from the draft
+    warehouse; the user's draft listing is only consulted for seasons the
+    warehouse has nothing for (e.g. a draft still in progress).
+    """
+    warehouse = get_draft_warehouse()
+    league_ids = warehouse.league_ids_by_season(api, league)
+
+    def season_draft(season):
+        draft, picks = None, []
+        if season in league_ids:
+            draft, picks = warehouse.league_draft(league_ids[season], season)
+        if not picks:
+            draft, picks = _fetch_season_draft(api, league, season)
+        return draft, picks
+
+    # Every candidate season is fetched at once; the first one in priority order with picks wins
+    pool = ThreadPoolExecutor(max_workers=max(1, len(draft_seasons)))
+    try:
+        futures = [(season, pool.submit(season_draft, season)) for season in draft_seasons]
+        for season, future in futures:
+            draft, picks = future.result()
+            if picks:
+                return season, draft, picks
+    finally:
+        # Don't wait on fallback seasons that are no longer needed
+        pool.shutdown(wait=False)
+    return None, None, []
+
+
+def _assemble(api, league: dict, season: str, draft_seasons: Sequence[str]) -> LeagueSnapshot:
+    league_id = league['league_id']
+    with tracing.span('snapshot.fetch', league_id=league_id):
+        with ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS) as pool:
+            rosters_future = pool.submit(api.get_rosters, league_id)
+            users_future = pool.submit(api.get_league_users, league_id)
+            players_future = pool.submit(get_player_store().get_players)
+            draft_future = pool.submit(_fetch_reference_draft, api, league, draft_seasons)
+
+            draft_season, draft, draft_picks = draft_future.result()
+            rosters = rosters_future.result()
+            users = users_future.result()
+            players = players_future.result()
+
+    if rosters is None or users is None:
+        raise ValueError(f"Failed to retrieve roster or user data for league {league_id}")
+
+    with tracing.span('snapshot.decode', rosters=len(rosters), picks=len(draft_picks)):
+        rosters = [Roster.from_json(roster) for roster in rosters]
+        draft_picks = [Pick.from_json(pick) for pick in draft_picks]
+        player_ids = [pid for roster in rosters for pid in roster.players]
+        player_ids += [pick.player_id for pick in draft_picks if pick.player_id]
+        return LeagueSnapshot(league=League.from_json(league), season=str(season), rosters=rosters,
+                              users=[User.from_json(user) for user in users],
+                              players=decode_players(players, player_ids), draft_picks=draft_picks,
+                              draft=Draft.from_json(draft) if draft and draft_picks else None,
+                              draft_season=draft_season)
+
+
+def load_league_snapshot(api, league: dict, season, draft_seasons: Optional[Sequence] = None) -> LeagueSnapshot:
+    """Assemble (or reuse) the snapshot for league in season.
+
+    draft_seasons lists the seasons whose draft is used for pick lookups, in
+    priority order; it defaults to the season itself and the two before it.
+    """
+    season = str(season)
+    if draft_seasons is None:
+        draft_seasons = [season, str(int(season) - 1), str(int(season) - 2)]
+    draft_seasons = tuple(str(s) for s in draft_seasons)
+    key = (league['league_id'], season, draft_seasons)
+    return _snapshot_cache.get_or_load(key, lambda: _assemble(api, league, season, draft_seasons),
+                                       _snapshot_max_age())
+
+
+def load_user_league_snapshot(api, season, name_match: str = 'grundle',
+                              draft_seasons: Optional[Sequence] = None,
+                              fallback_to_first: bool = True) -> Optional[LeagueSnapshot]:
+    """Find the user's league by name and load its snapshot.
+
+    Returns None when no league matches.
+    """
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        # The player database doesn't depend on the league, so it loads while the leagues
+        # are listed; the snapshot then finds it in the store (or waits for it there)
+        pool.submit(get_player_store().get_players)
+        league = find_league(get_user_leagues(api, season), name_match, fallback_to_first)
+        if not league:
+            return None
+        return load_league_snapshot(api, league, season, draft_seasons)
+    finally:
+        pool.shutdown(wait=False)
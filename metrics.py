@@ -0,0 +1,199 @@
+"""Metrics
+
+Minimal in-process counters and histograms rendered in the Prometheus
+text exposition format, used by api.py's /metrics endpoint. Kept free of
+Flask imports so the Sleeper client and caches can record into it too.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def snapshot(self) -> Dict[Tuple, float]:
+        """A copy of every count, keyed by label values in labelnames order."""
+        with self._lock:
+            return dict(self._values)
+
+    def _samples(self):
+        items = sorted(self.snapshot().items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+                for key, value in items]
+
+
+class Gauge(_Metric):
+    """A value computed at scrape time by a callback returning {label tuple: value}."""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames, collect):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+                for key, value in sorted(self.collect().items())]
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed observations per label set."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [bucket counts..., sum, count]
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_number(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            plain = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{plain} {_format_number(series[-2])}")
+            lines.append(f"{self.name}_count{plain} {series[-1]}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render() -> str:
+    """Render every registered metric in Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# --- Metrics shared across modules ---
+
+HTTP_REQUESTS = Counter(
+    'api_http_requests_total', 'API requests by route, method and status.',
+    ('route', 'method', 'status'))
+HTTP_LATENCY = Histogram(
+    'api_http_request_duration_seconds', 'API request latency by route.', ('route',))
+HTTP_RESPONSE_SIZE = Histogram(
+    'api_http_response_size_bytes', 'API response body size by route.', ('route',),
+    buckets=SIZE_BUCKETS)
+
+UPSTREAM_REQUESTS = Counter(
+    'sleeper_upstream_requests_total', 'Sleeper API calls by endpoint and status.',
+    ('endpoint', 'status'))
+UPSTREAM_LATENCY = Histogram(
+    'sleeper_upstream_request_duration_seconds', 'Sleeper API call latency by endpoint.',
+    ('endpoint',))
+
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by cache and result.', ('cache', 'result'))
+
+# Results that count as served from cache when computing hit ratios
+CACHE_HIT_RESULTS = ('hit', 'stale', 'not_modified')
+
+
+def record_cache(cache: str, result: str) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result=result)
+
+
+def _cache_hit_ratios():
+    totals: Dict[Tuple, float] = {}
+    hits: Dict[Tuple, float] = {}
+    for (cache, result), count in CACHE_REQUESTS.snapshot().items():
+        totals[(cache,)] = totals.get((cache,), 0) + count
+        if result in CACHE_HIT_RESULTS:
+            hits[(cache,)] = hits.get((cache,), 0) + count
+    return {key: hits.get(key, 0) / total for key, total in totals.items() if total}
+
+
+CACHE_HIT_RATIO = Gauge(
+    'cache_hit_ratio', 'Fraction of cache lookups served from cache.', ('cache',), _cache_hit_ratios)
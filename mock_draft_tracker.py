@@ -5,13 +5,27 @@ to calculate custom Average Draft Position (ADP) for keeper leagues.
 """
 
 import json
-import csv
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
-from collections import defaultdict
-import statistics
+import math
+import textwrap
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, asdict, field
+from collections import Counter
+from fractions import Fraction
+
+import requests
+
+import cache_client
+import tracing
+from exporters import export_rows, split_format
+from name_index import NameIndex, NameMatch, name_key
+from player_store import get_player_store
+
+DEFAULT_DATA_FILE = "mock_drafts.json"
+
+# ADP keys of picks that have no player id
+NAME_KEY_PREFIX = 'name:'
 
 @dataclass
 class DraftPick:
@@ -35,23 +49,285 @@ class MockDraft:
     keepers: List[str]  # List of keeper player names
     picks: List[DraftPick]
     notes: Optional[str] = None
+    # Player ids of the keepers, in the same order (None where a name didn't match a player)
+    keeper_ids: List[Optional[str]] = field(default_factory=list)
+
+def player_key(player_id: Optional[str], player_name: str) -> str:
+    """ADP key for a pick: its player id, or "name:<match key>" for picks never linked to one."""
+    if player_id:
+        return str(player_id)
+    key = name_key(player_name)
+    return f"{NAME_KEY_PREFIX}{key}" if key else ''
+
+
+class ADPAggregator:
+    """Running per-player pick statistics for ADP.
+
+    Picks are added one at a time, straight from imported records if need be,
+    and each player keeps a histogram of the overall picks they went at
+    rather than the picks themselves. Memory is bounded by players times
+    distinct pick numbers, however many drafts are added.
+
+    Players are keyed by player id (see player_key) and numbered with
+    integer codes as they are first seen; per-player state lives in lists
+    indexed by code. Names are only attached to the results, using the
+    name most recently seen for each player.
+    """
+
+    def __init__(self):
+        self.draft_count = 0
+        self._codes: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._names: List[str] = []
+        self._histograms: List[Counter] = []
+        self._positions: List[Counter] = []
+
+    def _code(self, key: str) -> int:
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self._keys)
+            self._keys.append(key)
+            self._names.append('')
+            self._histograms.append(Counter())
+            self._positions.append(Counter())
+        return code
+
+    def add_pick(self, player_id: Optional[str], player_name: str, position: str, overall_pick: int) -> bool:
+        """Count one pick; returns False for picks with invalid data."""
+        # Skip any picks with invalid data
+        if not overall_pick or overall_pick <= 0:
+            return False
+        key = player_key(player_id, player_name)
+        if not key:
+            return False
+        code = self._code(key)
+        self._histograms[code][overall_pick] += 1
+        if player_name:
+            self._names[code] = player_name
+        if position:
+            self._positions[code][position] += 1
+        return True
+
+    def add_draft(self, picks: Iterable[Tuple[Optional[str], str, str, int]]) -> int:
+        """Count one draft given (player_id, player_name, position, overall_pick) tuples; returns the picks counted."""
+        self.draft_count += 1
+        return sum(1 for pick in picks if self.add_pick(*pick))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _player_stats(self, histogram: Counter) -> Dict:
+        picks = sorted(histogram)
+        count = sum(histogram.values())
+        total = sum(pick * n for pick, n in histogram.items())
+
+        # Median from the histogram: walk to the middle pick (or the two middle picks)
+        low_index, high_index = (count - 1) // 2, count // 2
+        low = high = None
+        seen = 0
+        for pick in picks:
+            seen += histogram[pick]
+            if low is None and seen > low_index:
+                low = pick
+            if seen > high_index:
+                high = pick
+                break
+        median_pick = low if count % 2 else (low + high) / 2
+
+        std_dev = 0.0
+        if count > 1:
+            squares = sum(pick * pick * n for pick, n in histogram.items())
+            variance = Fraction(count * squares - total * total, count * (count - 1))
+            std_dev = round(math.sqrt(variance), 1)
+
+        return {
+            'times_drafted': count,
+            # Integral means stay ints, as statistics.mean returns them
+            'average_pick': round(total // count if total % count == 0 else total / count, 1),
+            'median_pick': median_pick,
+            'earliest_pick': picks[0],
+            'latest_pick': picks[-1],
+            'std_dev': std_dev,
+        }
+
+    def results(self) -> Dict[str, Dict]:
+        """ADP entries by player key, in the shape MockDraftTracker.calculate_adp returns."""
+        total_drafts = max(self.draft_count, 1)  # Avoid division by zero
+        adp_data = {}
+        for code, key in enumerate(self._keys):
+            histogram = self._histograms[code]
+            positions = self._positions[code]
+            position = positions.most_common(1)[0][0] if positions else ''
+            player_name = self._names[code] or 'Unknown Player'
+            times_drafted = sum(histogram.values())
+            entry = {
+                'player_name': player_name,
+                'player_id': '' if key.startswith(NAME_KEY_PREFIX) else key,
+                'position': position,
+                'times_drafted': times_drafted,
+                'draft_percentage': (times_drafted / total_drafts) * 100,
+                'average_pick': 0.0,
+                'median_pick': 0.0,
+                'earliest_pick': 0,
+                'latest_pick': 0,
+                'std_dev': 0.0,
+            }
+            try:
+                entry.update(self._player_stats(histogram))
+            except (ArithmeticError, ValueError) as e:
+                # Still include the player with default values
+                print(f"Warning: Error calculating ADP for {player_name}: {e}")
+            entry['all_picks'] = sorted(histogram.elements())
+            adp_data[key] = entry
+        return adp_data
+
+
+ADP_FIELDNAMES = [
+    'rank', 'player_name', 'position', 'times_drafted', 'draft_percentage',
+    'average_pick', 'median_pick', 'earliest_pick', 'latest_pick', 'std_dev', 'player_id'
+]
+
+
+@tracing.traced('tracker.export_adp')
+def export_adp(adp_data: Dict[str, Dict], filename: str = None, draft_count: int = 0) -> str:
+    """Write ADP entries (from calculate_adp or ADPAggregator.results) ranked by average pick."""
+    if filename is None:
+        filename = f"custom_adp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    
+    # Sort by average pick
+    sorted_players = sorted(adp_data.values(), key=lambda x: x['average_pick'])
+    
+    # The CSV keeps its human-readable "12.5%" percentages; other formats stay numeric
+    format_percentage = split_format(filename)[0] == 'csv'
+    
+    def rows():
+        for rank, player_data in enumerate(sorted_players, 1):
+            row = {key: value for key, value in player_data.items() if key != 'all_picks'}
+            row['rank'] = rank
+            if format_percentage:
+                row['draft_percentage'] = f"{row['draft_percentage']:.1f}%"
+            yield row
+    
+    export_rows(rows(), filename, ADP_FIELDNAMES)
+    
+    print(f"ADP data exported to {filename}")
+    print(f"Total players: {len(sorted_players)}")
+    print(f"Based on {draft_count} mock drafts")
+    
+    return filename
+
+
+@tracing.traced('tracker.append_drafts')
+def append_draft_records(data_file: str, records: Iterable[Dict]) -> int:
+    """Append serialized drafts to a tracker data file without loading it.
+
+    records are dicts in the tracker's JSON shape (see
+    MockDraftTracker._mock_draft_to_dict). The closing bracket of the
+    file's JSON array is overwritten in place, so the cost doesn't grow with
+    the number of drafts already stored. Returns the number appended.
+    """
+    chunks = [textwrap.indent(json.dumps(record, indent=2, default=str), '  ') for record in records]
+    if not chunks:
+        return 0
+    body = ',\n'.join(chunks)
+    if not os.path.exists(data_file) or os.path.getsize(data_file) == 0:
+        with open(data_file, 'w') as f:
+            f.write(f"[\n{body}\n]")
+        return len(chunks)
+    
+    with open(data_file, 'r+b') as f:
+        # Find the array's closing bracket and whether anything precedes it
+        f.seek(0, os.SEEK_END)
+        tail_start = max(0, f.tell() - 4096)
+        f.seek(tail_start)
+        tail = f.read()
+        close = tail.rstrip().rfind(b']')
+        if close < 0:
+            raise ValueError(f"{data_file} is not a JSON array of drafts")
+        empty = tail[:close].rstrip().endswith(b'[')
+        f.seek(tail_start + close)
+        f.truncate()
+        f.write(f"{'' if empty else ','}\n{body}\n]".encode('utf-8'))
+    return len(chunks)
+
+
+def iter_draft_records(data_file: str, chunk_size: int = 1 << 20) -> Iterator[Dict]:
+    """Yield the drafts of a tracker data file one at a time.
+
+    The file's JSON array is decoded incrementally, one draft object per
+    raw_decode, so only the current draft and one read chunk are in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(data_file, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size)
+        pos = len(buffer) - len(buffer.lstrip())
+        if buffer[pos:pos + 1] != '[':
+            if not buffer.strip():
+                return
+            raise ValueError(f"{data_file} is not a JSON array of drafts")
+        pos += 1
+        eof = False
+        while True:
+            # Skip the separators between drafts
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                if pos == len(buffer):
+                    raise json.JSONDecodeError('Need more data', buffer, pos)
+                draft, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The draft continues past this chunk: keep the unread tail and read on
+                more = f.read(chunk_size)
+                eof = not more
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            yield draft
+
+
+def load_adp_aggregator(data_file: str) -> Tuple[ADPAggregator, set]:
+    """ADPAggregator and draft ids for a tracker data file, without building MockDraft objects.
+
+    Drafts are streamed from the file (see iter_draft_records), so memory is
+    bounded by the aggregated histograms, not by the number of stored picks.
+    """
+    aggregator = ADPAggregator()
+    draft_ids = set()
+    if not os.path.exists(data_file):
+        return aggregator, draft_ids
+    for draft in iter_draft_records(data_file):
+        draft_ids.add(draft['draft_id'])
+        aggregator.add_draft((pick.get('player_id'), pick['player_name'], pick['position'], pick['overall_pick'])
+                             for pick in draft['picks'])
+    return aggregator, draft_ids
+
 
 class MockDraftTracker:
     """Main class for tracking and analyzing mock drafts."""
     
-    def __init__(self, data_file: str = "mock_drafts.json"):
+    def __init__(self, data_file: str = DEFAULT_DATA_FILE):
         self.data_file = data_file
         self.drafts: List[MockDraft] = []
+        self._name_index: Optional[NameIndex] = None
         self.load_data()
     
+    @tracing.traced('tracker.load')
     def load_data(self) -> None:
         """Load existing mock draft data from file."""
         if os.path.exists(self.data_file):
             try:
-                with open(self.data_file, 'r') as f:
+                with open(self.data_file, 'r') as f, tracing.span('decode json', 'decode', path=self.data_file):
                     data = json.load(f)
                     self.drafts = [self._dict_to_mock_draft(draft_dict) for draft_dict in data]
                 print(f"Loaded {len(self.drafts)} mock drafts from {self.data_file}")
+                unlinked = sum(1 for draft in self.drafts for pick in draft.picks if not pick.player_id)
+                if unlinked:
+                    print(f"{unlinked} picks have no player id; link them with the 'Link player ids' option "
+                          f"so their ADP merges with imported picks.")
             except (json.JSONDecodeError, KeyError) as e:
                 print(f"Error loading data: {e}. Starting with empty dataset.")
                 self.drafts = []
@@ -59,6 +335,7 @@ class MockDraftTracker:
             print(f"No existing data file found. Starting fresh.")
             self.drafts = []
     
+    @tracing.traced('tracker.save')
     def save_data(self) -> None:
         """Save mock draft data to file."""
         data = [self._mock_draft_to_dict(draft) for draft in self.drafts]
@@ -85,6 +362,61 @@ class MockDraftTracker:
         self.save_data()
         print(f"Added mock draft {draft.draft_id} with {len(draft.picks)} picks")
     
+    def add_mock_drafts(self, drafts: List[MockDraft]) -> int:
+        """Add several drafts, skipping ids already tracked, and save once."""
+        known_ids = {draft.draft_id for draft in self.drafts}
+        new_drafts = [draft for draft in drafts if draft.draft_id not in known_ids]
+        if new_drafts:
+            self.drafts.extend(new_drafts)
+            self.save_data()
+        print(f"Added {len(new_drafts)} mock drafts ({len(drafts) - len(new_drafts)} already tracked)")
+        return len(new_drafts)
+    
+    def resolve_player(self, name: str, position: Optional[str] = None) -> Optional[NameMatch]:
+        """Match a typed player name against the player database (None if unknown or unavailable)."""
+        if self._name_index is None:
+            # A running cache daemon resolves names without this process loading the database
+            matches = cache_client.resolve_names([name], position or None)
+            if matches is not cache_client.MISSING:
+                return NameMatch(**matches[0]) if matches[0] else None
+            try:
+                self._name_index = get_player_store().get_name_index()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"Player database unavailable ({e}); names are kept as typed.")
+                self._name_index = NameIndex({})
+        return self._name_index.resolve(name, position or None)
+    
+    @tracing.traced('tracker.link_player_ids')
+    def link_player_ids(self) -> int:
+        """
+        Migrate name-only data: attach player ids to picks and keepers that
+        were recorded by name alone, so ADP keys them by player id. Saves if
+        anything changed and returns the number of picks linked.
+        """
+        linked = unmatched = 0
+        changed = False
+        for draft in self.drafts:
+            for pick in draft.picks:
+                if pick.player_id:
+                    continue
+                match = self.resolve_player(pick.player_name, pick.position)
+                if not match:
+                    unmatched += 1
+                    continue
+                if match.name != pick.player_name:
+                    print(f"  {pick.player_name} -> {match.name} ({match.position})")
+                pick.player_id = match.player_id
+                pick.player_name = match.name
+                linked += 1
+            if len(draft.keeper_ids) != len(draft.keepers):
+                draft.keeper_ids = [match.player_id if match else None
+                                    for match in map(self.resolve_player, draft.keepers)]
+                changed = True
+        if linked or changed:
+            self.save_data()
+        print(f"Linked {linked} picks to player ids ({unmatched} names matched no player)")
+        return linked
+    
     def create_mock_draft_from_input(self) -> MockDraft:
         """Interactive method to create a mock draft from user input."""
         print("\n=== Creating New Mock Draft ===")
@@ -99,11 +431,17 @@ class MockDraftTracker:
         # Get keepers
         print("\nEnter keeper players (one per line, empty line to finish):")
         keepers = []
+        keeper_ids = []
         while True:
             keeper = input("Keeper: ").strip()
             if not keeper:
                 break
+            match = self.resolve_player(keeper)
+            if match:
+                print(f"  -> {match.name} ({match.position})")
+                keeper = match.name
             keepers.append(keeper)
+            keeper_ids.append(match.player_id if match else None)
         
         # Get draft picks
         print(f"\nEnter draft picks (expecting {league_size * rounds} total picks)")
@@ -132,9 +470,16 @@ class MockDraftTracker:
                     team = parts[2].strip()
                     drafted_by_team = parts[4].strip() if len(parts) > 4 else f"Team{pick_in_round}"
                     
+                    # Store the player's canonical name and id, so typos don't split their ADP
+                    match = self.resolve_player(player_name, position.upper())
+                    if match:
+                        if match.distance:
+                            print(f"  -> {match.name} ({match.position})")
+                        player_name = match.name
+                    
                     pick = DraftPick(
                         player_name=player_name,
-                        player_id=None,  # We'll populate this later if needed
+                        player_id=match.player_id if match else None,
                         position=position,
                         team=team,
                         round_num=round_num,
@@ -157,103 +502,52 @@ class MockDraftTracker:
             rounds=rounds,
             keepers=keepers,
             picks=picks,
-            notes=notes
+            notes=notes,
+            keeper_ids=keeper_ids
         )
         
         return mock_draft
     
+    @tracing.traced('tracker.aggregate')
+    def adp_aggregator(self) -> 'ADPAggregator':
+        """ADPAggregator seeded with every tracked draft."""
+        aggregator = ADPAggregator()
+        for draft in self.drafts:
+            aggregator.add_draft((pick.player_id, pick.player_name, pick.position, pick.overall_pick)
+                                 for pick in draft.picks)
+        return aggregator
+    
     def calculate_adp(self, min_drafts: int = 3) -> Dict[str, Dict]:
         """Calculate Average Draft Position for all players."""
         if len(self.drafts) < min_drafts:
             print(f"Warning: Only {len(self.drafts)} drafts available. Recommend at least {min_drafts} for reliable ADP.")
-        
-        player_picks = defaultdict(list)
-        total_drafts = max(len(self.drafts), 1)  # Avoid division by zero
-        
-        # Collect all picks for each player
-        for draft in self.drafts:
-            for pick in draft.picks:
-                # Skip any picks with invalid data
-                if pick.player_name and pick.overall_pick > 0:
-                    player_picks[pick.player_name].append(pick.overall_pick)
-        
-        adp_data = {}
-        for player_name, picks in player_picks.items():
-            # Ensure we have valid picks
-            if player_name and len(picks) >= 1:  # At least one draft
-                try:
-                    # Calculate stats with error handling for each metric
-                    average_pick = round(statistics.mean(picks), 1) if picks else 0.0
-                    median_pick = statistics.median(picks) if picks else 0.0
-                    earliest_pick = min(picks) if picks else 0
-                    latest_pick = max(picks) if picks else 0
-                    std_dev = round(statistics.stdev(picks), 1) if len(picks) > 1 else 0.0
-                    draft_percentage = (len(picks) / total_drafts) * 100
-                    
-                    # Create player entry with all values defaulting to numeric values instead of N/A
-                    adp_data[player_name] = {
-                        'player_name': player_name or 'Unknown Player',
-                        'times_drafted': len(picks),
-                        'draft_percentage': draft_percentage,
-                        'average_pick': average_pick,
-                        'median_pick': median_pick,
-                        'earliest_pick': earliest_pick,
-                        'latest_pick': latest_pick,
-                        'std_dev': std_dev,
-                        'all_picks': sorted(picks)
-                    }
-                except Exception as e:
-                    print(f"Warning: Error calculating ADP for {player_name}: {e}")
-                    # Still include the player with default values
-                    adp_data[player_name] = {
-                        'player_name': player_name or 'Unknown Player',
-                        'times_drafted': len(picks),
-                        'draft_percentage': (len(picks) / total_drafts) * 100,
-                        'average_pick': 0.0,
-                        'median_pick': 0.0,
-                        'earliest_pick': 0,
-                        'latest_pick': 0,
-                        'std_dev': 0.0,
-                        'all_picks': sorted(picks)
-                    }
-        
-        return adp_data
+        aggregator = self.adp_aggregator()
+        with tracing.span('tracker.adp_results', players=len(aggregator)):
+            return aggregator.results()
     
     def export_adp_to_csv(self, filename: str = None) -> str:
-        """Export ADP data to CSV file."""
-        if filename is None:
-            filename = f"custom_adp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        adp_data = self.calculate_adp()
-        
-        # Sort by average pick
-        sorted_players = sorted(adp_data.values(), key=lambda x: x['average_pick'])
-        
-        with open(filename, 'w', newline='') as csvfile:
-            fieldnames = [
-                'rank', 'player_name', 'times_drafted', 'draft_percentage',
-                'average_pick', 'median_pick', 'earliest_pick', 'latest_pick', 'std_dev'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for rank, player_data in enumerate(sorted_players, 1):
-                row = player_data.copy()
-                row['rank'] = rank
-                row['draft_percentage'] = f"{row['draft_percentage']:.1f}%"
-                del row['all_picks']  # Remove detailed picks from CSV
-                writer.writerow(row)
-        
-        print(f"ADP data exported to {filename}")
-        print(f"Total players: {len(sorted_players)}")
-        print(f"Based on {len(self.drafts)} mock drafts")
-        
-        return filename
+        """Export ADP data to a CSV file.
+
+        Rows are streamed to the file as they are formatted. A .jsonl (or
+        .ndjson) or .parquet filename writes that format instead, a .json
+        filename is rejected, and a .gz, .bz2 or .xz suffix compresses the
+        output.
+        """
+        return export_adp(self.calculate_adp(), filename, len(self.drafts))
     
     def get_player_analysis(self, player_name: str) -> Optional[Dict]:
-        """Get detailed analysis for a specific player."""
+        """Get detailed analysis for a specific player, given a player id or name.
+        
+        Names are matched fuzzily against the drafted players ("Ken Walker"
+        finds "Kenneth Walker III").
+        """
         adp_data = self.calculate_adp()
-        return adp_data.get(player_name)
+        if player_name in adp_data:
+            return adp_data[player_name]
+        names = NameIndex({key: {'full_name': entry['player_name'], 'position': entry['position']}
+                           for key, entry in adp_data.items()})
+        match = names.resolve(player_name)
+        return adp_data[match.player_id] if match else None
     
     def print_summary(self) -> None:
         """Print a summary of all tracked drafts."""
@@ -283,9 +577,10 @@ def main():
         print("2. View summary")
         print("3. Export ADP to CSV")
         print("4. Analyze specific player")
-        print("5. Exit")
+        print("5. Link player ids to name-only picks")
+        print("6. Exit")
         
-        choice = input("\nSelect option (1-5): ").strip()
+        choice = input("\nSelect option (1-6): ").strip()
         
         if choice == '1':
             try:
@@ -310,7 +605,7 @@ def main():
             player_name = input("Enter player name: ").strip()
             analysis = tracker.get_player_analysis(player_name)
             if analysis:
-                print(f"\n=== Analysis for {player_name} ===")
+                print(f"\n=== Analysis for {analysis['player_name']} ===")
                 print(f"Times drafted: {analysis['times_drafted']}")
                 print(f"Draft percentage: {analysis['draft_percentage']:.1f}%")
                 print(f"Average pick: {analysis['average_pick']}")
@@ -320,11 +615,14 @@ def main():
                 print(f"No data found for {player_name}")
         
         elif choice == '5':
+            tracker.link_player_ids()
+        
+        elif choice == '6':
             print("Goodbye!")
             break
         
         else:
-            print("Invalid choice. Please select 1-5.")
+            print("Invalid choice. Please select 1-6.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,201 @@
+"""Player Name Index
+
+Resolves typed player names ("Ken Walker", "DJ Moore", "Marvin Harrison")
+to player ids. Names are reduced to a match key: normalized like the ADP
+search (case, accents and punctuation ignored), generational suffixes
+dropped, runs of initials joined ("D. J." -> "dj") and common nicknames
+mapped to the formal first name ("Ken" -> "kenneth").
+
+Exact keys and last names are dictionary lookups. Anything else gathers
+candidates sharing character trigrams with the query and ranks the best of
+them by edit distance, so a resolve over the full player database costs a
+few hundred dict/list operations rather than a scan.
+"""
+
+import heapq
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Iterable, List, Optional
+
+from adp_store import normalize_name
+
+SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+
+# Short and alternate first names -> the form Sleeper usually lists
+NICKNAMES = {
+    'abe': 'abraham', 'alex': 'alexander', 'andy': 'andrew', 'benny': 'benjamin', 'ben': 'benjamin',
+    'bill': 'william', 'billy': 'william', 'bob': 'robert', 'bobby': 'robert', 'cam': 'cameron',
+    'chris': 'christopher', 'dan': 'daniel', 'danny': 'daniel', 'dave': 'david', 'ed': 'edward',
+    'eddie': 'edward', 'gabe': 'gabriel', 'greg': 'gregory', 'jake': 'jacob', 'jim': 'james',
+    'jimmy': 'james', 'joe': 'joseph', 'joey': 'joseph', 'jon': 'jonathan', 'josh': 'joshua',
+    'ken': 'kenneth', 'kenny': 'kenneth', 'matt': 'matthew', 'mike': 'michael', 'mitch': 'mitchell',
+    'nate': 'nathan', 'nick': 'nicholas', 'pat': 'patrick', 'rob': 'robert', 'ron': 'ronald',
+    'sam': 'samuel', 'steve': 'steven', 'tim': 'timothy', 'tom': 'thomas', 'tommy': 'thomas',
+    'tony': 'anthony', 'will': 'william', 'zach': 'zachary', 'zack': 'zachary',
+}
+
+# Candidates re-ranked by edit distance after trigram retrieval
+RERANK_CANDIDATES = 8
+# A trigram found in more than 1/COMMON_GRAM_FRACTION of all names (and at least
+# COMMON_GRAM_MIN of them) is left out of candidate retrieval
+COMMON_GRAM_FRACTION = 20
+COMMON_GRAM_MIN = 200
+
+
+def name_key(name: str) -> str:
+    """Match key for a player name; equal keys are treated as the same name."""
+    tokens = normalize_name(name).split()
+    while len(tokens) > 1 and tokens[-1] in SUFFIXES:
+        tokens.pop()
+    # Join runs of initials: "d j moore" -> "dj moore"
+    joined = []
+    initials = False
+    for token in tokens:
+        if len(token) == 1 and initials:
+            joined[-1] += token
+        else:
+            joined.append(token)
+            initials = len(token) == 1
+    if len(joined) > 1:
+        joined[0] = NICKNAMES.get(joined[0], joined[0])
+    return ' '.join(joined)
+
+
+def _trigrams(key: str) -> set:
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Edit distance between a and b counting a swap of adjacent letters as one edit.
+
+    Returns limit + 1 as soon as the distance must exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+@dataclass
+class NameMatch:
+    """One candidate for a typed name; distance 0 means the match keys are equal."""
+    player_id: str
+    name: str
+    position: str
+    distance: int
+    similarity: float
+
+
+class NameIndex:
+    """Fuzzy name -> player id resolution over a {player_id: player_info} mapping.
+
+    player_info uses Sleeper's fields: full_name or first_name/last_name,
+    position, fantasy_positions and search_rank (lower ranks win ties).
+    """
+
+    def __init__(self, players: Dict[str, dict], version: int = 0):
+        self.version = version
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        self._position: List[str] = []
+        self._positions: List[set] = []
+        self._ranks: List[float] = []
+        self._by_key: Dict[str, List[int]] = {}
+        self._by_last: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+
+        for player_id, info in players.items():
+            name = info.get('full_name') or f"{info.get('first_name', '')} {info.get('last_name', '')}".strip()
+            key = name_key(name)
+            if not key:
+                continue
+            i = len(self._ids)
+            self._ids.append(player_id)
+            self._names.append(name)
+            self._keys.append(key)
+            self._position.append(info.get('position') or '')
+            positions = set(info.get('fantasy_positions') or [])
+            if info.get('position'):
+                positions.add(info['position'])
+            self._positions.append(positions)
+            rank = info.get('search_rank')
+            self._ranks.append(rank if isinstance(rank, (int, float)) else float('inf'))
+            self._by_key.setdefault(key, []).append(i)
+            last_name = name_key(info.get('last_name') or key.split()[-1])
+            self._by_last.setdefault(last_name, []).append(i)
+            grams = _trigrams(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+        for table in (self._by_key, self._by_last):
+            for entries in table.values():
+                entries.sort(key=self._ranks.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _match(self, i: int, distance: int, similarity: float) -> NameMatch:
+        return NameMatch(self._ids[i], self._names[i], self._position[i], distance, similarity)
+
+    def candidates(self, name: str, position: Optional[str] = None, limit: int = 5) -> List[NameMatch]:
+        """Best matches for a typed name, closest first."""
+        key = name_key(name)
+        if not key:
+            return []
+
+        def allowed(i):
+            return position is None or position in self._positions[i]
+
+        exact = [i for i in self._by_key.get(key, ()) if allowed(i)]
+        if ' ' not in key:
+            # A single word is most likely a last name
+            exact += [i for i in self._by_last.get(key, ()) if allowed(i) and i not in exact]
+        if exact:
+            return [self._match(i, 0, 1.0) for i in exact[:limit]]
+
+        query_grams = _trigrams(key)
+        # Trigrams shared by a large share of all names ("son", " ja") say little and cost
+        # the most to count, so candidates come from the rarer ones when there are any
+        common = max(COMMON_GRAM_MIN, len(self._ids) // COMMON_GRAM_FRACTION)
+        rare = [gram for gram in query_grams if len(self._postings.get(gram, ())) <= common]
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in rare or query_grams))
+        if not shared:
+            return []
+        # Dice coefficient of the trigram sets picks the few worth an edit distance
+        scored = heapq.nlargest(RERANK_CANDIDATES,
+                                ((2 * count / (len(query_grams) + self._gram_counts[i]), i)
+                                 for i, count in shared.items() if allowed(i)))
+        limit_distance = max(2, len(key) // 5)
+        ranked = []
+        for similarity, i in scored:
+            distance = edit_distance(key, self._keys[i], limit_distance)
+            if distance <= limit_distance:
+                ranked.append((distance, -similarity, self._ranks[i], i))
+        ranked.sort()
+        return [self._match(i, distance, -neg_similarity)
+                for distance, neg_similarity, _, i in ranked[:limit]]
+
+    def resolve(self, name: str, position: Optional[str] = None) -> Optional[NameMatch]:
+        """The single best match for a typed name, or None if nothing is close enough."""
+        matches = self.candidates(name, position, limit=1)
+        return matches[0] if matches else None
+
+    def resolve_ids(self, names: Iterable[str]) -> List[Optional[str]]:
+        """Player id (or None) for each name, in order."""
+        return [match.player_id if match else None for match in map(self.resolve, names)]
@@ -0,0 +1,190 @@
+"""Player Store
+
+Process-wide cache of the Sleeper NFL player database. The /players/nfl
+dump is several megabytes and Sleeper asks clients to fetch it at most
+once a day, so it is downloaded once and shared by every caller in the
+process until it expires.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import metrics
+import tracing
+from adp_store import normalize_name
+from name_index import NameIndex
+from sleeper_api import get_all_players
+
+# Sleeper updates the player database roughly daily
+DEFAULT_PLAYER_DB_MAX_AGE = 24 * 60 * 60
+
+
+IDP_POSITIONS = ['DL', 'LB', 'DB']
+
+
+def resolve_position(player_info: dict) -> str:
+    """Player position, using the more specific fantasy position for IDP players."""
+    position = player_info.get('position') or 'N/A'
+    if position in IDP_POSITIONS:
+        fantasy_pos = player_info.get('fantasy_positions') or []
+        if fantasy_pos:
+            position = fantasy_pos[0]
+    return position
+
+
+def player_summary(player_id: str, player_info: dict) -> dict:
+    """Compact id/name/position/team record for API responses."""
+    name = player_info.get('full_name')
+    if not name:
+        name = f"{player_info.get('first_name', '')} {player_info.get('last_name', '')}".strip()
+    return {
+        'player_id': player_id,
+        'name': name or 'Unknown Player',
+        'position': resolve_position(player_info),
+        'team': player_info.get('team') or 'FA'
+    }
+
+
+def name_entries(players: Dict[str, dict]) -> List[Tuple[str, str]]:
+    """Sorted (normalized name, player id) pairs holding each player's full and last name."""
+    entries = []
+    for player_id, info in players.items():
+        full_name = normalize_name(info.get('full_name') or
+                                   f"{info.get('first_name', '')} {info.get('last_name', '')}")
+        if not full_name:
+            continue
+        entries.append((full_name, player_id))
+        last_name = normalize_name(info.get('last_name', ''))
+        if last_name and last_name != full_name:
+            entries.append((last_name, player_id))
+    entries.sort()
+    return entries
+
+
+class PlayerIndex:
+    """Id lookups and normalized-name prefix search over one player snapshot.
+
+    The prefix index is the sorted name_entries list, searched with bisect.
+    """
+
+    def __init__(self, players: Dict[str, dict], version: int):
+        self.players = players
+        self.version = version
+        entries = name_entries(players)
+        self._names = [name for name, _ in entries]
+        self._ids = [player_id for _, player_id in entries]
+
+    def lookup(self, player_ids: Iterable[str]) -> Dict[str, dict]:
+        """Summaries for the ids that exist in the snapshot."""
+        players = self.players
+        return {pid: player_summary(pid, players[pid]) for pid in player_ids if pid in players}
+
+    def search_prefix(self, prefix: str, limit: int = 20) -> List[dict]:
+        """Players whose full or last name starts with prefix."""
+        term = normalize_name(prefix)
+        if not term:
+            return []
+        results = []
+        seen = set()
+        i = bisect_left(self._names, term)
+        while i < len(self._names) and self._names[i].startswith(term) and len(results) < limit:
+            player_id = self._ids[i]
+            if player_id not in seen:
+                seen.add(player_id)
+                results.append(player_summary(player_id, self.players[player_id]))
+            i += 1
+        return results
+
+
+class PlayerStore:
+    """Lazily loaded, expiring snapshot of the player database."""
+
+    def __init__(self, fetch: Callable[[], Dict[str, dict]] = get_all_players,
+                 max_age: Optional[float] = None):
+        self.fetch = fetch
+        if max_age is None:
+            max_age = float(os.getenv('PLAYER_DB_MAX_AGE', DEFAULT_PLAYER_DB_MAX_AGE))
+        self.max_age = max_age
+        self._players: Optional[Dict[str, dict]] = None
+        self._loaded_at = 0.0
+        self.version = 0
+        self._index: Optional[PlayerIndex] = None
+        self._name_index: Optional[NameIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._players is not None
+
+    def _expired(self) -> bool:
+        return self._players is None or time.time() - self._loaded_at > self.max_age
+
+    def get_players(self) -> Dict[str, dict]:
+        """Return the player database, downloading it if missing or expired."""
+        if not self._expired():
+            metrics.record_cache('players', 'hit')
+            return self._players
+
+        with self._lock:
+            if self._expired():
+                metrics.record_cache('players', 'miss')
+                print("Loading player database...")
+                with tracing.span('players.load'):
+                    players = self.fetch()
+                if not players:
+                    raise ValueError("Failed to load player database from Sleeper")
+                self._players = players
+                self._loaded_at = time.time()
+                self.version += 1
+                print(f"Loaded {len(players)} players")
+            return self._players
+
+    def get_player(self, player_id: str) -> Optional[dict]:
+        return self.get_players().get(player_id)
+
+    def get_index(self) -> PlayerIndex:
+        """Return the lookup index for the current snapshot, building it once per version."""
+        players = self.get_players()
+        index = self._index
+        if index is None or index.version != self.version:
+            with self._lock:
+                if self._index is None or self._index.version != self.version:
+                    self._index = PlayerIndex(players, self.version)
+                index = self._index
+        return index
+
+    def get_name_index(self) -> NameIndex:
+        """Return the fuzzy name index for the current snapshot, building it once per version."""
+        players = self.get_players()
+        index = self._name_index
+        if index is None or index.version != self.version:
+            with self._lock:
+                if self._name_index is None or self._name_index.version != self.version:
+                    self._name_index = NameIndex(players, self.version)
+                index = self._name_index
+        return index
+
+
+_store: Optional[PlayerStore] = None
+_store_lock = threading.Lock()
+
+
+def get_player_store() -> PlayerStore:
+    """Return the process-wide player store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PlayerStore()
+    return _store
+
+
+def install_player_store(store: PlayerStore) -> PlayerStore:
+    """Replace the process-wide player store, e.g. with one that reads a shared file."""
+    global _store
+    with _store_lock:
+        _store = store
+    return store
@@ -0,0 +1,130 @@
+"""Sleeper Records
+
+Slotted record types for the Sleeper payloads the roster analyzers walk:
+players, draft picks, rosters, users, leagues and drafts. Each raw JSON
+object is decoded once, when a league snapshot is assembled, into a record
+with fixed attributes, so the per-player loops in keeper_tool, the Grundle
+analyzer and roster_viewer read attributes instead of repeating chains of
+dict.get defaults, and each record holds only the fields those tools use.
+
+Defaults applied while decoding are the ones the analyzers always used for
+missing keys (e.g. 'Unknown Player', 'FA'); values Sleeper sends as null
+stay None. __slots__ is spelled out on each dataclass, since
+dataclass(slots=True) needs Python 3.10.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from player_store import resolve_position
+
+
+@dataclass
+class Player:
+    __slots__ = ('player_id', 'full_name', 'position', 'display_position', 'fantasy_positions', 'team')
+
+    player_id: str
+    full_name: str
+    position: Optional[str]
+    # The more specific fantasy position for IDP players (see resolve_position)
+    display_position: str
+    fantasy_positions: Tuple[str, ...]
+    team: Optional[str]
+
+    @classmethod
+    def from_json(cls, player_id: str, data: dict) -> 'Player':
+        return cls(player_id, data.get('full_name', 'Unknown Player'), data.get('position'),
+                   resolve_position(data), tuple(data.get('fantasy_positions') or ()),
+                   data.get('team', 'FA'))
+
+
+@dataclass
+class Pick:
+    __slots__ = ('player_id', 'pick_no', 'round', 'draft_slot', 'roster_id', 'picked_by', 'is_keeper')
+
+    player_id: Optional[str]
+    pick_no: Optional[int]
+    round: Optional[int]
+    draft_slot: Optional[int]
+    roster_id: Optional[int]
+    picked_by: Optional[str]
+    is_keeper: bool
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'Pick':
+        return cls(data.get('player_id'), data.get('pick_no'), data.get('round'), data.get('draft_slot'),
+                   data.get('roster_id'), data.get('picked_by'), bool(data.get('is_keeper')))
+
+
+@dataclass
+class Roster:
+    __slots__ = ('roster_id', 'owner_id', 'players', 'starters')
+
+    roster_id: Optional[int]
+    owner_id: Optional[str]
+    players: Tuple[str, ...]
+    starters: Tuple[str, ...]
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'Roster':
+        return cls(data.get('roster_id'), data.get('owner_id'), tuple(data.get('players') or ()),
+                   tuple(data.get('starters') or ()))
+
+
+@dataclass
+class User:
+    __slots__ = ('user_id', 'display_name', 'team_name')
+
+    user_id: str
+    display_name: Optional[str]
+    team_name: Optional[str]
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'User':
+        return cls(data['user_id'], data.get('display_name', 'Unknown Owner'),
+                   (data.get('metadata') or {}).get('team_name'))
+
+
+@dataclass
+class League:
+    __slots__ = ('league_id', 'name', 'season', 'previous_league_id', 'status')
+
+    league_id: str
+    name: str
+    season: Optional[str]
+    previous_league_id: Optional[str]
+    status: Optional[str]
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'League':
+        return cls(data['league_id'], data.get('name', ''), data.get('season'),
+                   data.get('previous_league_id'), data.get('status'))
+
+
+@dataclass
+class Draft:
+    __slots__ = ('draft_id', 'league_id', 'season', 'status', 'type', 'name', 'last_picked')
+
+    draft_id: str
+    league_id: Optional[str]
+    season: Optional[str]
+    status: Optional[str]
+    type: Optional[str]
+    name: Optional[str]
+    last_picked: Optional[int]
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'Draft':
+        return cls(data['draft_id'], data.get('league_id'), data.get('season'), data.get('status'),
+                   data.get('type'), (data.get('metadata') or {}).get('name'), data.get('last_picked'))
+
+
+def decode_players(players: Dict[str, dict], player_ids: Iterable[str]) -> Dict[str, Player]:
+    """Player records for the ids present in the player database."""
+    decoded = {}
+    for player_id in player_ids:
+        if player_id not in decoded:
+            data = players.get(player_id)
+            if data:
+                decoded[player_id] = Player.from_json(player_id, data)
+    return decoded
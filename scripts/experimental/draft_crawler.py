@@ -0,0 +1,238 @@
+"""Crawl league mates' drafts to build a mock draft corpus
+
+Starting from one league, lists every member's drafts for a season with
+bounded concurrency, deduplicates them by draft_id and classifies each as a
+mock draft or a league draft (see is_mock_draft). Results are kept in a discovery
+index on disk, so a re-crawl only lists members whose listing is older than
+--max-age and reports just the drafts it hasn't seen before.
+
+With --import, completed mock drafts not imported yet are added to the mock
+draft tracker (mock_drafts.json) for the keeper ADP.
+
+Usage:
+    python scripts/experimental/draft_crawler.py [--league-id ID | --league-name NAME]
+        [--season 2025] [--workers 8] [--teams 12] [--import] [--keepers "A,B"]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+from dotenv import load_dotenv
+
+from league_snapshot import find_league
+from sleeper_api import get_all_drafts, get_all_leagues, get_league_users, get_user
+from sleeper_mock_importer import SleeperMockImporter, is_mock_draft
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = 'draft_discovery.json'
+
+
+def classify_draft(draft):
+    """'mock' for mock drafts (by type, metadata, then league_id), else 'league'."""
+    return 'mock' if is_mock_draft(draft) else 'league'
+
+
+def draft_entry(draft, user_id):
+    """Compact index record for one listed draft."""
+    settings = draft.get('settings') or {}
+    return {
+        'draft_id': draft['draft_id'],
+        'kind': classify_draft(draft),
+        'status': draft.get('status', 'unknown'),
+        'type': draft.get('type', 'unknown'),
+        'league_id': draft.get('league_id'),
+        'name': (draft.get('metadata') or {}).get('name'),
+        'created': draft.get('created', 0),
+        'teams': settings.get('teams'),
+        'rounds': settings.get('rounds'),
+        'found_via': [user_id],
+        'imported': False
+    }
+
+
+class DraftIndex:
+    """Discovery index persisted as JSON: drafts by id plus when each member was last listed."""
+
+    def __init__(self, path, season):
+        self.path = path
+        self.season = str(season)
+        self.drafts = {}
+        self.members = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    season_data = data.get('seasons', {}).get(self.season, {})
+                    self.drafts = season_data.get('drafts', {})
+                    self.members = season_data.get('members', {})
+                self._data = data
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Could not read {path} ({e}); starting a new index")
+                self._data = {}
+        else:
+            self._data = {}
+
+    def merge(self, draft, user_id):
+        """Record a listed draft; returns True if it wasn't in the index yet."""
+        entry = self.drafts.get(draft['draft_id'])
+        if entry is None:
+            self.drafts[draft['draft_id']] = draft_entry(draft, user_id)
+            return True
+        # Status changes (e.g. a mock that has since completed) are picked up,
+        # and the kind is re-derived in case the classification rules changed
+        entry['status'] = draft.get('status', entry['status'])
+        entry['kind'] = classify_draft(draft)
+        if user_id not in entry['found_via']:
+            entry['found_via'].append(user_id)
+        return False
+
+    def save(self):
+        data = {'version': INDEX_VERSION, 'seasons': self._data.get('seasons', {})}
+        data['seasons'][self.season] = {'drafts': self.drafts, 'members': self.members}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def resolve_league(username, season, league_id=None, league_name=None):
+    """(league_id, name) of the league to start from."""
+    if league_id:
+        return league_id, league_id
+    user = get_user(username)
+    leagues = get_all_leagues(user['user_id'], season)
+    league = find_league(leagues, league_name or '', fallback_to_first=True)
+    if not league:
+        raise ValueError(f"No leagues found for {username} in {season}")
+    return league['league_id'], league.get('name', league['league_id'])
+
+
+def crawl(league_id, season, index, workers=8, max_age=3600):
+    """List every member's drafts concurrently and merge them into the index.
+
+    Returns (members listed, new draft ids).
+    """
+    members = [u['user_id'] for u in get_league_users(league_id) or []]
+    now = time.time()
+    stale = [m for m in members if now - index.members.get(m, 0) > max_age]
+    print(f"{len(members)} league members; listing drafts for {len(stale)} "
+          f"({len(members) - len(stale)} listed within the last {max_age // 60} min)")
+
+    new_ids = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(get_all_drafts, user_id, season): user_id for user_id in stale}
+        for future in as_completed(futures):
+            user_id = futures[future]
+            try:
+                drafts = future.result() or []
+            except requests.exceptions.RequestException as e:
+                print(f"  Skipping member {user_id}: {e}")
+                continue
+            for draft in drafts:
+                if index.merge(draft, user_id):
+                    new_ids.append(draft['draft_id'])
+            index.members[user_id] = time.time()
+    return len(stale), new_ids
+
+
+def importable_mocks(index, teams=None):
+    """Completed mock drafts not imported yet, optionally only those with a given team count."""
+    return [entry for entry in index.drafts.values()
+            if entry['kind'] == 'mock' and entry['status'] == 'complete' and not entry['imported']
+            and (teams is None or entry.get('teams') == teams)]
+
+
+def import_mocks(entries, keepers, workers=8):
+    """Import drafts into the mock draft tracker, fetching their picks concurrently."""
+    importer = SleeperMockImporter()
+    importer.load_players()
+    known_ids = {draft.draft_id for draft in importer.tracker.drafts}
+
+    def fetch(entry):
+        mock_draft = importer.import_draft_by_id(entry['draft_id'], keepers)
+        if entry.get('created'):
+            mock_draft.draft_date = datetime.fromtimestamp(entry['created'] / 1000)
+        mock_draft.notes = f"Crawled mock draft{' - ' + entry['name'] if entry.get('name') else ''}"
+        return mock_draft
+
+    mock_drafts = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, entry): entry for entry in entries if entry['draft_id'] not in known_ids}
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                mock_drafts.append(future.result())
+            except (ValueError, requests.exceptions.RequestException) as e:
+                print(f"  Could not import {entry['draft_id']}: {e}")
+                continue
+            entry['imported'] = True
+    for entry in entries:
+        if entry['draft_id'] in known_ids:
+            entry['imported'] = True
+
+    importer.tracker.add_mock_drafts(mock_drafts)
+    return importer.tracker
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--username', default=os.getenv('SLEEPER_USERNAME'))
+    parser.add_argument('--league-id', help='league to start from (default: found by --league-name)')
+    parser.add_argument('--league-name', default='', help='substring of the league name (default: first league)')
+    parser.add_argument('--season', default='2025')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent Sleeper requests (default: 8)')
+    parser.add_argument('--max-age', type=int, default=3600,
+                        help='seconds before a member\'s draft listing is fetched again (default: 3600)')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help='discovery index file')
+    parser.add_argument('--teams', type=int, help='only import mocks with this many teams')
+    parser.add_argument('--import', dest='do_import', action='store_true',
+                        help='import completed mock drafts into the mock draft tracker')
+    parser.add_argument('--keepers', default='', help='comma-separated keeper names for imported drafts')
+    args = parser.parse_args()
+
+    if not args.league_id and not args.username:
+        print("Pass --league-id or set SLEEPER_USERNAME")
+        return
+
+    start = time.time()
+    try:
+        league_id, league_name = resolve_league(args.username, args.season, args.league_id, args.league_name)
+    except (ValueError, requests.exceptions.RequestException) as e:
+        print(f"Error: {e}")
+        return
+    print(f"=== Crawling {args.season} drafts of {league_name} members ===")
+
+    index = DraftIndex(args.index, args.season)
+    listed, new_ids = crawl(league_id, args.season, index, args.workers, args.max_age)
+    index.save()
+
+    entries = list(index.drafts.values())
+    mocks = [e for e in entries if e['kind'] == 'mock']
+    complete_mocks = [e for e in mocks if e['status'] == 'complete']
+    new_mocks = [i for i in new_ids if index.drafts[i]['kind'] == 'mock']
+    print(f"\nListed {listed} members in {time.time() - start:.1f}s")
+    print(f"Index: {len(entries)} drafts ({len(mocks)} mock, {len(entries) - len(mocks)} league), "
+          f"{len(complete_mocks)} completed mocks")
+    print(f"New this crawl: {len(new_ids)} drafts ({len(new_mocks)} mock)")
+
+    if args.do_import:
+        pending = importable_mocks(index, args.teams)
+        if not pending:
+            print("No new completed mock drafts to import.")
+            return
+        keepers = [k.strip() for k in args.keepers.split(',') if k.strip()]
+        print(f"\nImporting {len(pending)} completed mock drafts...")
+        tracker = import_mocks(pending, keepers, args.workers)
+        index.save()
+        print(f"Mock draft tracker now holds {len(tracker.drafts)} drafts")
+
+
+if __name__ == '__main__':
+    main()
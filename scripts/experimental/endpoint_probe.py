@@ -0,0 +1,198 @@
+"""Probe a list of API endpoints in parallel
+
+Requests every URL concurrently with a per-request timeout, so one slow or
+hanging endpoint can't stall the run, and prints a table of status, size,
+item count and latency. Outcomes are cached on disk with a TTL; re-running
+within the TTL only requests URLs that haven't been probed yet.
+
+URL templates may use {base_url}, {user_id} and {season}.
+
+Usage:
+    python scripts/experimental/endpoint_probe.py "{base_url}/user/{user_id}/drafts/nfl/{season}" ...
+        [--username NAME] [--season 2025] [--timeout 5] [--ttl 3600] [--refresh]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from sleeper_api import BASE_URL, get_user, timed_get
+
+DEFAULT_CACHE_PATH = '.endpoint_probe_cache.json'
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of requesting one URL."""
+    url: str
+    status: Optional[int] = None
+    size: int = 0
+    items: Optional[int] = None
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+    checked_at: float = 0.0
+    summary: Dict = field(default_factory=dict)
+    cached: bool = False
+    # The parsed body; only available for fresh (uncached) results
+    data: object = None
+
+    @property
+    def found(self) -> bool:
+        return self.status == 200 and bool(self.items)
+
+
+def expand_templates(templates: List[str], **params) -> List[str]:
+    """Fill {base_url}, {user_id}, {season}... into URL templates, dropping duplicates."""
+    params.setdefault('base_url', BASE_URL)
+    urls = []
+    for template in templates:
+        url = template.format(**params)
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+class EndpointProbe:
+    """Concurrent URL prober with a TTL cache of outcomes."""
+
+    def __init__(self, timeout: float = 5.0, workers: int = 16, ttl: float = 3600,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 summarize: Optional[Callable[[object], Dict]] = None):
+        self.timeout = timeout
+        self.workers = workers
+        self.ttl = ttl
+        self.cache_path = cache_path
+        # Extracts extra facts from a response body to keep in the cache
+        self.summarize = summarize
+        self._cache: Dict[str, dict] = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, dict]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._cache, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def _cached(self, url: str) -> Optional[ProbeResult]:
+        entry = self._cache.get(url)
+        if entry is None or time.time() - entry.get('checked_at', 0) > self.ttl:
+            return None
+        # Probed earlier without this probe's summarizer: request it again
+        if self.summarize and entry.get('items') and not entry.get('summary'):
+            return None
+        return ProbeResult(cached=True, **entry)
+
+    def _probe_one(self, url: str) -> ProbeResult:
+        result = ProbeResult(url=url, checked_at=time.time())
+        start = time.perf_counter()
+        try:
+            response = timed_get(url, timeout=self.timeout)
+            result.status = response.status_code
+            result.size = len(response.content)
+            if response.status_code == 200 and response.content:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = None
+                if data is not None:
+                    result.data = data
+                    result.items = len(data) if isinstance(data, (list, dict)) else 1
+                    if self.summarize:
+                        result.summary = self.summarize(data)
+        except requests.exceptions.Timeout:
+            result.error = f"timeout after {self.timeout:g}s"
+        except requests.exceptions.RequestException as e:
+            result.error = str(e)
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    def probe(self, urls: List[str], refresh: bool = False) -> List[ProbeResult]:
+        """Probe urls concurrently (reusing fresh cached outcomes); results keep the input order."""
+        results: Dict[str, ProbeResult] = {}
+        pending = []
+        for url in urls:
+            cached = None if refresh else self._cached(url)
+            if cached:
+                results[url] = cached
+            else:
+                pending.append(url)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                for result in pool.map(self._probe_one, pending):
+                    results[result.url] = result
+                    entry = asdict(result)
+                    for transient in ('cached', 'data'):
+                        entry.pop(transient)
+                    self._cache[result.url] = entry
+            self._save_cache()
+        return [results[url] for url in urls]
+
+
+def print_table(results: List[ProbeResult], base_url: str = BASE_URL):
+    """One row per probed URL."""
+    print(f"{'STATUS':<8} {'ITEMS':>6} {'BYTES':>9} {'MS':>7}  {'':<6} URL")
+    print("-" * 100)
+    for r in results:
+        status = str(r.status) if r.status is not None else 'ERR'
+        items = '' if r.items is None else str(r.items)
+        url = r.url[len(base_url):] if r.url.startswith(base_url) else r.url
+        note = 'cached' if r.cached else ''
+        print(f"{status:<8} {items:>6} {r.size:>9} {r.elapsed_ms:>7.0f}  {note:<6} {url}")
+        if r.error:
+            print(f"{'':<8} {r.error}")
+    found = sum(1 for r in results if r.found)
+    print(f"\n{found} of {len(results)} endpoints returned data "
+          f"({sum(1 for r in results if r.cached)} from cache)")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('templates', nargs='+', help='URL templates to probe')
+    parser.add_argument('--username', default=os.getenv('SLEEPER_USERNAME'),
+                        help='resolves {user_id} (default: SLEEPER_USERNAME)')
+    parser.add_argument('--season', default='2025')
+    parser.add_argument('--timeout', type=float, default=5.0, help='per-request timeout in seconds')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--ttl', type=float, default=3600, help='seconds cached outcomes stay valid')
+    parser.add_argument('--refresh', action='store_true', help='ignore cached outcomes')
+    args = parser.parse_args()
+
+    params = {'season': args.season}
+    if any('{user_id}' in t for t in args.templates):
+        if not args.username:
+            print("Templates use {user_id}: pass --username or set SLEEPER_USERNAME")
+            return
+        user = get_user(args.username)
+        if not user:
+            print(f"Sleeper user '{args.username}' not found: pass --username or set SLEEPER_USERNAME")
+            return
+        params['user_id'] = user['user_id']
+
+    probe = EndpointProbe(timeout=args.timeout, workers=args.workers, ttl=args.ttl)
+    start = time.perf_counter()
+    results = probe.probe(expand_templates(args.templates, **params), refresh=args.refresh)
+    print_table(results)
+    print(f"Finished in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
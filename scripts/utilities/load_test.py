@@ -0,0 +1,388 @@
+"""Load test the Flask API against a local Sleeper stub.
+
+Starts a stub of the Sleeper endpoints used by api.py (with configurable
+injected latency), launches api.py pointed at it, then drives /api/adp and
+/api/keeper-data at the requested concurrency and reports throughput,
+latency percentiles and error rates. Runs entirely offline.
+
+Example:
+    python scripts/utilities/load_test.py --concurrency 16 --duration 20 --latency-ms 150
+
+Exits non-zero when --max-error-rate or --max-p99-ms is exceeded, so it
+can gate changes in CI.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+STUB_USERNAME = 'loadtest'
+STUB_USER_ID = '100000000000000001'
+STUB_LEAGUE_ID = '200000000000000001'
+STUB_DRAFT_ID = '300000000000000001'
+POSITIONS = ['QB', 'RB', 'WR', 'TE', 'K', 'DL', 'LB', 'DB']
+
+
+def build_fixtures(num_players=10000, teams=12, roster_size=25, seed=7):
+    """Synthetic Sleeper payloads shaped like the real API responses."""
+    rng = random.Random(seed)
+    players = {}
+    for i in range(num_players):
+        position = rng.choice(POSITIONS)
+        players[str(1000 + i)] = {
+            'player_id': str(1000 + i),
+            'first_name': f"First{i}",
+            'last_name': f"Last{i}",
+            'full_name': f"First{i} Last{i}",
+            'position': position,
+            'fantasy_positions': [position],
+            'team': rng.choice(['KC', 'BUF', 'CIN', 'PHI', 'SF', None]),
+        }
+
+    player_ids = list(players)
+    rng.shuffle(player_ids)
+    users, rosters = [], []
+    for slot in range(teams):
+        owner_id = str(int(STUB_USER_ID) + slot)
+        users.append({'user_id': owner_id, 'display_name': f"Owner{slot + 1}",
+                      'metadata': {'team_name': f"Team {slot + 1}"}})
+        start = slot * roster_size
+        rosters.append({'roster_id': slot + 1, 'owner_id': owner_id,
+                        'players': player_ids[start:start + roster_size]})
+
+    picks = []
+    for pick_no, player_id in enumerate(player_ids[:teams * 16], 1):
+        picks.append({'player_id': player_id, 'pick_no': pick_no,
+                      'round': (pick_no - 1) // teams + 1,
+                      'draft_slot': (pick_no - 1) % teams + 1,
+                      'picked_by': str(int(STUB_USER_ID) + (pick_no - 1) % teams)})
+
+    league = {'league_id': STUB_LEAGUE_ID, 'name': 'Grundle Load Test League',
+              'season': '2024', 'draft_id': STUB_DRAFT_ID, 'previous_league_id': None}
+    draft = {'draft_id': STUB_DRAFT_ID, 'league_id': STUB_LEAGUE_ID, 'status': 'complete',
+             'type': 'snake', 'season': '2024', 'last_picked': 1, 'created': 1,
+             'metadata': {'name': league['name']}}
+
+    return {'players': players, 'users': users, 'rosters': rosters,
+            'picks': picks, 'league': league, 'draft': draft}
+
+
+class SleeperStub:
+    """Threaded HTTP server answering the Sleeper routes api.py calls."""
+
+    def __init__(self, fixtures, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.hits = {}
+        self._lock = threading.Lock()
+        # Pre-serialize the payloads so the stub itself is never the bottleneck
+        f = fixtures
+        league_drafts = json.dumps([f['draft']]).encode()
+        self.routes = [
+            (re.compile(r'^/v1/user/[^/]+/leagues/nfl/\d+$'), 'leagues', json.dumps([f['league']]).encode()),
+            (re.compile(r'^/v1/user/[^/]+/drafts/nfl/\d+$'), 'user_drafts', league_drafts),
+            (re.compile(r'^/v1/user/[^/]+$'), 'user',
+             json.dumps({'user_id': STUB_USER_ID, 'username': STUB_USERNAME,
+                         'display_name': STUB_USERNAME}).encode()),
+            (re.compile(r'^/v1/league/\d+/rosters$'), 'rosters', json.dumps(f['rosters']).encode()),
+            (re.compile(r'^/v1/league/\d+/users$'), 'league_users', json.dumps(f['users']).encode()),
+            (re.compile(r'^/v1/league/\d+/drafts$'), 'league_drafts', league_drafts),
+            (re.compile(r'^/v1/league/\d+$'), 'league', json.dumps(f['league']).encode()),
+            (re.compile(r'^/v1/draft/\d+/picks$'), 'picks', json.dumps(f['picks']).encode()),
+            (re.compile(r'^/v1/draft/\d+$'), 'draft', json.dumps(f['draft']).encode()),
+            (re.compile(r'^/v1/players/nfl$'), 'players', json.dumps(f['players']).encode()),
+        ]
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                for pattern, name, body in stub.routes:
+                    if pattern.match(path):
+                        break
+                else:
+                    name, body = 'not_found', b'null'
+
+                with stub._lock:
+                    stub.hits[name] = stub.hits.get(name, 0) + 1
+                delay = stub.latency_ms + random.uniform(0, stub.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+
+                status = 200
+                if name == 'not_found':
+                    status = 404
+                elif stub.error_rate and random.random() < stub.error_rate:
+                    status, body = 500, b'{"error": "injected"}'
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def write_adp_csv(path, num_rows=400, seed=11):
+    """Synthetic ADP export in the format MockDraftTracker.export_adp_to_csv writes."""
+    rng = random.Random(seed)
+    fieldnames = ['rank', 'player_name', 'position', 'times_drafted', 'draft_percentage',
+                  'average_pick', 'median_pick', 'earliest_pick', 'latest_pick', 'std_dev', 'player_id']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for rank in range(1, num_rows + 1):
+            writer.writerow({
+                'rank': rank, 'player_name': f"First{rank} Last{rank}",
+                'position': rng.choice(POSITIONS), 'times_drafted': rng.randint(1, 50),
+                'draft_percentage': f"{rng.uniform(10, 100):.1f}%", 'average_pick': rank,
+                'median_pick': rank, 'earliest_pick': max(1, rank - 5),
+                'latest_pick': rank + 5, 'std_dev': round(rng.uniform(0, 6), 1),
+                'player_id': str(1000 + rank)
+            })
+
+
+def start_api(stub, work_dir, adp_path, port, keeper_max_age, log_file):
+    env = dict(os.environ)
+    env.update({
+        'SLEEPER_API_BASE_URL': stub.base_url,
+        'SLEEPER_USERNAME': STUB_USERNAME,
+        'ADP_CSV_PATH': str(adp_path),
+        # Keep the stub league out of the real draft warehouse
+        'DRAFT_WAREHOUSE_PATH': str(Path(work_dir) / 'draft_warehouse.db'),
+        'API_PORT': str(port),
+        'API_DEBUG': '0',
+        'KEEPER_CACHE_MAX_AGE': str(keeper_max_age),
+        'PYTHONUNBUFFERED': '1',
+    })
+    # Log to a file: an unread pipe fills up with access logs and stalls the server
+    return subprocess.Popen([sys.executable, 'api.py'], cwd=REPO_ROOT, env=env,
+                            stdout=log_file, stderr=subprocess.STDOUT, text=True)
+
+
+def wait_until_ready(base_url, process, timeout, log_path):
+    """Poll /api/ready until the startup warm-up has filled every cache."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"api.py exited early:\n{Path(log_path).read_text()}")
+        try:
+            response = requests.get(f"{base_url}/api/ready", timeout=2)
+            if response.status_code == 200:
+                return response.json()
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"api.py not ready after {timeout}s")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def build_targets(include_adp, include_keeper):
+    """(name, path generator) pairs exercising the main API paths."""
+    targets = []
+    if include_adp:
+        sorts = ['average_pick', 'player_name', 'std_dev', 'times_drafted']
+
+        def adp_page():
+            params = f"sort={random.choice(sorts)}&direction={random.choice(['ascending', 'descending'])}"
+            params += f"&offset={random.choice([0, 50, 100])}&limit=50"
+            if random.random() < 0.3:
+                params += f"&q=last{random.randint(1, 40)}"
+            return f"/api/adp?{params}"
+
+        targets.append(('adp_page', adp_page))
+        targets.append(('adp_full', lambda: '/api/adp'))
+    if include_keeper:
+        targets.append(('keeper_data', lambda: '/api/keeper-data'))
+    return targets
+
+
+def run_load(base_url, targets, concurrency, duration, max_requests):
+    results = {name: {'latencies': [], 'errors': 0, 'bytes': 0} for name, _ in targets}
+    lock = threading.Lock()
+    local = threading.local()
+    deadline = time.time() + duration
+    counter = {'sent': 0}
+
+    def worker():
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        while time.time() < deadline:
+            with lock:
+                if max_requests and counter['sent'] >= max_requests:
+                    return
+                counter['sent'] += 1
+            name, path = random.choice(targets)
+            start = time.perf_counter()
+            ok, size = False, 0
+            try:
+                response = session.get(f"{base_url}{path()}", timeout=30,
+                                       headers={'Accept-Encoding': 'gzip'})
+                ok = response.status_code == 200
+                size = len(response.content)
+            except requests.exceptions.RequestException:
+                pass
+            elapsed = time.perf_counter() - start
+            with lock:
+                bucket = results[name]
+                bucket['latencies'].append(elapsed)
+                bucket['bytes'] += size
+                if not ok:
+                    bucket['errors'] += 1
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return results, time.time() - started
+
+
+def summarize(results, wall_time):
+    summary = {}
+    for name, bucket in results.items():
+        latencies = sorted(bucket['latencies'])
+        count = len(latencies)
+        summary[name] = {
+            'requests': count,
+            'errors': bucket['errors'],
+            'error_rate': bucket['errors'] / count if count else 0.0,
+            'throughput_rps': count / wall_time if wall_time else 0.0,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p90_ms': percentile(latencies, 90) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+            'avg_bytes': bucket['bytes'] / count if count else 0,
+        }
+    return summary
+
+
+def print_report(summary, wall_time, stub_hits):
+    print(f"\n{'ENDPOINT':<14} {'REQS':>7} {'RPS':>8} {'ERR%':>6} {'P50ms':>8} {'P90ms':>8} "
+          f"{'P99ms':>8} {'MAXms':>8} {'AVG KB':>8}")
+    print("-" * 84)
+    for name, s in summary.items():
+        print(f"{name:<14} {s['requests']:>7} {s['throughput_rps']:>8.1f} {s['error_rate'] * 100:>6.2f} "
+              f"{s['p50_ms']:>8.1f} {s['p90_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f} "
+              f"{s['avg_bytes'] / 1024:>8.1f}")
+    total = sum(s['requests'] for s in summary.values())
+    print("-" * 84)
+    print(f"Total: {total} requests in {wall_time:.1f}s ({total / wall_time:.1f} req/s)")
+    print(f"Upstream stub hits: {json.dumps(stub_hits, sort_keys=True)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client workers')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to drive load')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0 = no limit)')
+    parser.add_argument('--latency-ms', type=float, default=100.0, help='Injected upstream latency per Sleeper call')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random upstream latency (0..jitter)')
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0, help='Fraction of stub calls returning 500')
+    parser.add_argument('--players', type=int, default=10000, help='Players in the stub player database')
+    parser.add_argument('--keeper-max-age', type=float, default=300.0, help='KEEPER_CACHE_MAX_AGE for api.py')
+    parser.add_argument('--port', type=int, default=5099, help='Port for the api.py under test')
+    parser.add_argument('--only', choices=['adp', 'keeper'], help='Drive only one endpoint family')
+    parser.add_argument('--ready-timeout', type=float, default=60.0)
+    parser.add_argument('--json', dest='json_path', help='Also write the summary as JSON to this file')
+    parser.add_argument('--max-error-rate', type=float, help='Fail if any endpoint exceeds this error rate')
+    parser.add_argument('--max-p99-ms', type=float, help='Fail if any endpoint exceeds this p99 latency')
+    args = parser.parse_args()
+
+    print("Building stub fixtures...")
+    stub = SleeperStub(build_fixtures(num_players=args.players), latency_ms=args.latency_ms,
+                       jitter_ms=args.jitter_ms, error_rate=args.upstream_error_rate).start()
+    print(f"Sleeper stub listening at {stub.base_url} (latency {args.latency_ms}ms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        adp_path = Path(tmp) / 'adp.csv'
+        log_path = Path(tmp) / 'api.log'
+        write_adp_csv(adp_path)
+        log_file = open(log_path, 'w')
+        api = start_api(stub, tmp, adp_path, args.port, args.keeper_max_age, log_file)
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            ready = wait_until_ready(base_url, api, args.ready_timeout, log_path)
+            print(f"api.py ready: {json.dumps(ready.get('warmup', {}))}")
+            targets = build_targets(args.only != 'keeper', args.only != 'adp')
+            print(f"Driving {', '.join(name for name, _ in targets)} with {args.concurrency} workers "
+                  f"for {args.duration}s...")
+            results, wall_time = run_load(base_url, targets, args.concurrency, args.duration, args.requests)
+        finally:
+            api.terminate()
+            try:
+                api.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                api.kill()
+            log_file.close()
+            stub.stop()
+
+    summary = summarize(results, wall_time)
+    print_report(summary, wall_time, stub.hits)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'summary': summary, 'wall_time': wall_time, 'upstream_hits': stub.hits}, f, indent=2)
+
+    failures = []
+    for name, s in summary.items():
+        if args.max_error_rate is not None and s['error_rate'] > args.max_error_rate:
+            failures.append(f"{name}: error rate {s['error_rate']:.2%} > {args.max_error_rate:.2%}")
+        if args.max_p99_ms is not None and s['p99_ms'] > args.max_p99_ms:
+            failures.append(f"{name}: p99 {s['p99_ms']:.1f}ms > {args.max_p99_ms}ms")
+    if failures:
+        print("\nLoad test thresholds exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
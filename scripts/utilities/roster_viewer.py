@@ -2,6 +2,7 @@ import os
 import sys
 from dotenv import load_dotenv
 from sleeper_api import SleeperAPI
+from league_snapshot import find_league, get_user_leagues, load_league_snapshot
 import json
 
 load_dotenv()
@@ -14,18 +15,16 @@ def get_roster_data(user_name, season='2024', verbose=True):
     if verbose:
         print(f"Looking up user: {user_name}")
     
-    api = SleeperAPI(user_name)
-    user = api.get_user(user_name)
-    
-    if not user:
+    try:
+        api = SleeperAPI(user_name)
+    except ValueError:
         print(f"Error: User '{user_name}' not found.")
         return None
 
-    user_id = user['user_id']
     if verbose:
-        print(f"Found user with ID: {user_id}")
+        print(f"Found user with ID: {api.user_id}")
     
-    leagues = api.get_leagues(season)
+    leagues = get_user_leagues(api, season)
     if not leagues:
         print(f"Error: No leagues found for user '{user_name}' in the {season} season.")
         return None
@@ -34,11 +33,7 @@ def get_roster_data(user_name, season='2024', verbose=True):
         print(f"Found {len(leagues)} leagues for {user_name} in {season}")
     
     # Find the Grundle league specifically
-    league = None
-    for l in leagues:
-        if 'grundle' in l['name'].lower():
-            league = l
-            break
+    league = find_league(leagues, 'grundle', fallback_to_first=False)
     
     if not league:
         print("Warning: 'Grundle' league not found. Please specify the league name:")
@@ -61,97 +56,50 @@ def get_roster_data(user_name, season='2024', verbose=True):
     if verbose:
         print(f"Using league: {league['name']} (ID: {league_id})")
     
-    rosters = api.get_rosters(league_id)
-    if verbose:
-        print(f"Found {len(rosters)} rosters in league")
-    
-    users_in_league = api.get_league_users(league_id)
+    # Rosters, users, players and draft picks (current season first, then
+    # the two before it) are assembled once in a shared snapshot
+    print("Loading rosters, player database and draft data...")
+    snapshot = load_league_snapshot(api, league, season)
     if verbose:
-        print(f"Found {len(users_in_league)} users in league")
-    
-    print("Loading player database...")
-    all_players = api.get_players()
-    print(f"Loaded {len(all_players)} players")
-    
-    # Try to find draft data from current season
-    print("Looking for draft data...")
-    draft_picks = []
-    seasons_to_try = [season, str(int(season) - 1), str(int(season) - 2)]
-    
-    for try_season in seasons_to_try:
-        if verbose:
-            print(f"Checking for drafts in {try_season}...")
-        
-        drafts = api.get_all_drafts(league_id, try_season)
-        
-        if drafts:
-            # Use the most recent draft from this season
-            draft = drafts[0]  # Drafts are usually sorted by recency
-            draft_id = draft['draft_id']
-            if verbose:
-                print(f"Found draft with ID: {draft_id}")
-            
-            draft_picks = api.get_draft_picks(draft_id)
-            if draft_picks:
-                print(f"Found {len(draft_picks)} draft picks from {try_season}")
-                break
-            else:
-                print(f"No draft picks found for {try_season}")
+        print(f"Found {len(snapshot.rosters)} rosters in league")
+        print(f"Found {len(snapshot.users)} users in league")
+        print(f"Decoded {len(snapshot.players)} rostered and drafted players")
     
-    if not draft_picks:
+    if snapshot.draft_picks:
+        print(f"Found {len(snapshot.draft_picks)} draft picks from {snapshot.draft_season}")
+    else:
         print("Warning: No draft picks found in any season.")
     
-    # Create a map for user_id to display_name
-    user_map = {u['user_id']: u['display_name'] for u in users_in_league}
-    
-    # Create a map for player_id to player details
-    player_map = {p_id: p_info for p_id, p_info in all_players.items()}
-    
-    # Create a map for player_id to draft pick info
-    draft_pick_map = {}
-    for pick in draft_picks:
-        if pick.get('player_id'):
-            draft_pick_map[pick['player_id']] = {
-                'round': pick.get('round', 'N/A'), 
-                'pick': pick.get('pick_no', pick.get('draft_slot', 'N/A'))
-            }
-    
     teams_data = []
-    for roster in rosters:
-        owner_id = roster.get('owner_id')
-        if not owner_id:
-            continue
-        
-        players_in_roster = roster.get('players', [])
-        if not players_in_roster:
+    for roster in snapshot.rosters:
+        owner_id = roster.owner_id
+        if not owner_id or not roster.players:
             continue
         
         player_details_list = []
-        for player_id in players_in_roster:
-            player_info = player_map.get(player_id)
-            if player_info:
-                draft_info = draft_pick_map.get(player_id, {'round': 'N/A', 'pick': 'N/A'})
-                # Get better position data for IDP players
-                position = player_info.get('position', 'N/A')
-                # For IDP players, try to get more specific position from fantasy_positions if available
-                if position in ['DL', 'LB', 'DB'] and 'fantasy_positions' in player_info:
-                    # Use the first fantasy position if available as it's often more specific
-                    fantasy_pos = player_info.get('fantasy_positions', [])
-                    if fantasy_pos and len(fantasy_pos) > 0:
-                        position = fantasy_pos[0]
+        for player_id in roster.players:
+            player = snapshot.players.get(player_id)
+            if player:
+                pick = snapshot.pick_by_player.get(player_id)
+                if pick:
+                    draft_round = pick.round
+                    draft_pick = pick.pick_no if pick.pick_no is not None else pick.draft_slot
+                else:
+                    draft_round = draft_pick = 'N/A'
                 
                 player_details_list.append({
                     'id': player_id,
-                    'name': player_info.get('full_name', 'Unknown Player'),
-                    'position': position,
-                    'draft_round': draft_info['round'],
-                    'draft_pick': draft_info['pick'],
-                    'team': player_info.get('team', 'FA')  # Add team info to help identify players
+                    'name': player.full_name,
+                    # Uses the more specific fantasy position for IDP players
+                    'position': player.display_position,
+                    'draft_round': draft_round,
+                    'draft_pick': draft_pick,
+                    'team': player.team  # Add team info to help identify players
                 })
         
         teams_data.append({
             'owner_id': owner_id,
-            'owner_name': user_map.get(owner_id, 'Unknown Owner'),
+            'owner_name': snapshot.owner_name(owner_id),
             'players': sorted(player_details_list, key=lambda x: x['position'])
         })
     
@@ -162,88 +110,114 @@ def get_roster_data(user_name, season='2024', verbose=True):
     
     return result
 
-def display_roster_data(data, format_type='simple'):
-    """
-    Display roster data in different formats
+def _draft_info(row):
+    return f"R{row['draft_round']}, P{row['draft_pick']}" if row['draft_round'] != 'N/A' else 'Undrafted'
+
+class RosterTable:
     """
-    if not data:
-        print("No data to display.")
-        return
+    Flattened table of every rostered player in the league, built once.
     
-    print(f"\n=== {data['league_name']} ===\n")
+    Holds one row per player plus precomputed indexes (row positions by
+    owner and position, sorted by name or draft round), so every display
+    format and the draft-board selection reuse the same table. Rendered
+    views are cached as well.
+    """
     
-    if format_type == 'simple':
-        # Simple format with one line per player
-        print("TEAM".ljust(20) + "PLAYER".ljust(30) + "POS".ljust(5) + "TEAM".ljust(5) + "DRAFT")
-        print("-" * 70)
-        
-        all_players = []
+    def __init__(self, data):
+        self.data = data
+        self.league_name = data['league_name']
+        self.rows = []
         for team in data['teams']:
-            owner = team['owner_name']
             for player in team['players']:
-                all_players.append({
-                    'owner': owner,
+                self.rows.append({
+                    'id': player['id'],
+                    'owner_id': team['owner_id'],
+                    'owner': team['owner_name'],
                     'name': player['name'],
                     'position': player['position'],
-                    'team': player['team'],
+                    'team': player['team'] or 'FA',
                     'draft_round': player['draft_round'],
                     'draft_pick': player['draft_pick']
                 })
         
-        # Sort by position, then name
-        all_players.sort(key=lambda x: (x['position'], x['name']))
+        rows = self.rows
+        # All players by position, then name
+        self.by_position_name = sorted(range(len(rows)), key=lambda i: (rows[i]['position'], rows[i]['name']))
         
-        for player in all_players:
-            draft_info = f"R{player['draft_round']}, P{player['draft_pick']}" if player['draft_round'] != 'N/A' else 'Undrafted'
-            print(f"{player['owner'][:19].ljust(20)}{player['name'][:29].ljust(30)}{player['position'].ljust(5)}{player['team'].ljust(5)}{draft_info}")
-    
-    elif format_type == 'by_team':
-        # Group by team
-        for team in data['teams']:
-            print(f"\n--- {team['owner_name']} ---")
-            print("PLAYER".ljust(30) + "POS".ljust(5) + "TEAM".ljust(5) + "DRAFT")
-            print("-" * 60)
-            
-            # Sort players by position
-            sorted_players = sorted(team['players'], key=lambda x: (x['position'], x['name']))
-            for player in sorted_players:
-                draft_info = f"R{player['draft_round']}, P{player['draft_pick']}" if player['draft_round'] != 'N/A' else 'Undrafted'
-                print(f"{player['name'][:29].ljust(30)}{player['position'].ljust(5)}{player['team'].ljust(5)}{draft_info}")
-    
-    elif format_type == 'by_position':
-        # Group by position
-        all_players = []
-        for team in data['teams']:
-            for player in team['players']:
-                all_players.append({
-                    'owner': team['owner_name'],
-                    'name': player['name'],
-                    'position': player['position'],
-                    'team': player['team'],
-                    'draft_round': player['draft_round'],
-                    'draft_pick': player['draft_pick']
-                })
+        # Group-by indexes; filling them in sort order keeps each group sorted
+        # Keyed by owner id: display names aren't unique (e.g. several 'Unknown Owner' teams)
+        self.by_owner = {team['owner_id']: [] for team in data['teams']}
+        self.owner_names = {team['owner_id']: team['owner_name'] for team in data['teams']}
+        self.by_position = {}
+        for i in self.by_position_name:
+            self.by_owner[rows[i]['owner_id']].append(i)
+        for i in sorted(range(len(rows)), key=lambda i: (self._round_key(rows[i]), rows[i]['name'])):
+            self.by_position.setdefault(rows[i]['position'], []).append(i)
+        self.positions = sorted(self.by_position)
+        self._rendered = {}
+    
+    @staticmethod
+    def _round_key(row):
+        # Undrafted players, and picks Sleeper sent without a round, sort last
+        draft_round = row['draft_round']
+        return float('inf') if draft_round in ('N/A', None) else int(draft_round)
+    
+    def select(self, indices):
+        return [self.rows[i] for i in indices]
+    
+    def render(self, format_type='simple'):
+        """Text for one display format, rendered on first use and cached."""
+        text = self._rendered.get(format_type)
+        if text is None:
+            text = '\n'.join(self._render_lines(format_type))
+            self._rendered[format_type] = text
+        return text
+    
+    def _render_lines(self, format_type):
+        yield f"\n=== {self.league_name} ===\n"
+        
+        if format_type == 'simple':
+            # Simple format with one line per player
+            yield "TEAM".ljust(20) + "PLAYER".ljust(30) + "POS".ljust(5) + "TEAM".ljust(5) + "DRAFT"
+            yield "-" * 70
+            for player in self.select(self.by_position_name):
+                yield f"{player['owner'][:19].ljust(20)}{player['name'][:29].ljust(30)}{player['position'].ljust(5)}{player['team'].ljust(5)}{_draft_info(player)}"
+        
+        elif format_type == 'by_team':
+            # Group by team
+            for owner_id, indices in self.by_owner.items():
+                yield f"\n--- {self.owner_names[owner_id]} ---"
+                yield "PLAYER".ljust(30) + "POS".ljust(5) + "TEAM".ljust(5) + "DRAFT"
+                yield "-" * 60
+                for player in self.select(indices):
+                    yield f"{player['name'][:29].ljust(30)}{player['position'].ljust(5)}{player['team'].ljust(5)}{_draft_info(player)}"
+        
+        elif format_type == 'by_position':
+            # Group by position; each group is already sorted by draft round, then name
+            for pos in self.positions:
+                yield f"\n--- {pos} ---"
+                yield "PLAYER".ljust(30) + "TEAM".ljust(5) + "OWNER".ljust(20) + "DRAFT"
+                yield "-" * 70
+                for player in self.select(self.by_position[pos]):
+                    yield f"{player['name'][:29].ljust(30)}{player['team'].ljust(5)}{player['owner'][:19].ljust(20)}{_draft_info(player)}"
         
-        positions = sorted(set(p['position'] for p in all_players))
-        for pos in positions:
-            print(f"\n--- {pos} ---")
-            print("PLAYER".ljust(30) + "TEAM".ljust(5) + "OWNER".ljust(20) + "DRAFT")
-            print("-" * 70)
-            
-            pos_players = [p for p in all_players if p['position'] == pos]
-            # Sort players by draft round, then name
-            pos_players.sort(key=lambda x: (
-                999 if x['draft_round'] == 'N/A' else int(x['draft_round']), 
-                x['name']
-            ))
-            
-            for player in pos_players:
-                draft_info = f"R{player['draft_round']}, P{player['draft_pick']}" if player['draft_round'] != 'N/A' else 'Undrafted'
-                print(f"{player['name'][:29].ljust(30)}{player['team'].ljust(5)}{player['owner'][:19].ljust(20)}{draft_info}")
+        else:
+            # JSON format
+            yield json.dumps(self.data, indent=2)
+
+def display_roster_data(data, format_type='simple'):
+    """
+    Display roster data in different formats
     
-    else:
-        # JSON format
-        print(json.dumps(data, indent=2))
+    data may be the dict from get_roster_data or a RosterTable built from it;
+    pass the table when showing several views so it is only built once.
+    """
+    if not data:
+        print("No data to display.")
+        return
+    
+    table = data if isinstance(data, RosterTable) else RosterTable(data)
+    print(table.render(format_type))
 
 def save_draftable_players(data, filename="draftable_players.txt"):
     """
@@ -253,24 +227,9 @@ def save_draftable_players(data, filename="draftable_players.txt"):
         print("No data to save.")
         return
     
-    all_players = []
-    for team in data['teams']:
-        for player in team['players']:
-            # Create player entry
-            player_entry = {
-                'id': player['id'],
-                'name': player['name'],
-                'position': player['position'],
-                'team': player['team'],
-                'owner': team['owner_name'],
-                'draft_round': player['draft_round'],
-                'draft_pick': player['draft_pick'],
-                'include_in_draft': False  # Default to False
-            }
-            all_players.append(player_entry)
-    
-    # Sort by position, then name for easy reading
-    all_players.sort(key=lambda x: (x['position'], x['name']))
+    table = data if isinstance(data, RosterTable) else RosterTable(data)
+    # Sorted by position, then name for easy reading
+    all_players = table.select(table.by_position_name)
     
     print("\n=== Player Selection ===")
     print("For each player, indicate if they should be included in your draft board (y/n):")
@@ -278,11 +237,9 @@ def save_draftable_players(data, filename="draftable_players.txt"):
     
     selected_players = []
     for idx, player in enumerate(all_players):
-        draft_info = f"R{player['draft_round']}, P{player['draft_pick']}" if player['draft_round'] != 'N/A' else 'Undrafted'
-        choice = input(f"{player['position']} {player['name']} ({player['team']}) - Owner: {player['owner']} - {draft_info}: ")
+        choice = input(f"{player['position']} {player['name']} ({player['team']}) - Owner: {player['owner']} - {_draft_info(player)}: ")
         
         if choice.lower() == 'y':
-            player['include_in_draft'] = True
             selected_players.append(player)
         
         # Display progress
@@ -291,7 +248,7 @@ def save_draftable_players(data, filename="draftable_players.txt"):
     
     # Save to file
     with open(filename, 'w') as f:
-        f.write(f"# Draftable Players from {data['league_name']}\n")
+        f.write(f"# Draftable Players from {table.league_name}\n")
         f.write("# Format: position,name,team,draft_round,draft_pick\n\n")
         
         for player in selected_players:
@@ -318,6 +275,9 @@ def main():
         print("Failed to retrieve roster data.")
         return
     
+    # Flatten and index the rosters once; every view below reuses the table
+    roster_table = RosterTable(roster_data)
+    
     # Menu for different views
     while True:
         print("\n=== Roster Viewer Menu ===")
@@ -330,13 +290,13 @@ def main():
         choice = input("\nSelect an option (1-5): ")
         
         if choice == '1':
-            display_roster_data(roster_data, 'simple')
+            display_roster_data(roster_table, 'simple')
         elif choice == '2':
-            display_roster_data(roster_data, 'by_team')
+            display_roster_data(roster_table, 'by_team')
         elif choice == '3':
-            display_roster_data(roster_data, 'by_position')
+            display_roster_data(roster_table, 'by_position')
         elif choice == '4':
-            save_draftable_players(roster_data)
+            save_draftable_players(roster_table)
         elif choice == '5':
             break
         else:
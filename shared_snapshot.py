@@ -0,0 +1,443 @@
+"""Shared Snapshots
+
+Lets every worker process of a multi-worker API deployment read one copy of
+the player database and ADP dataset instead of each holding its own. The
+first worker that needs a dataset (or finds it expired) builds it and
+publishes it as a snapshot file; every worker mmaps that file read-only, so
+the data lives once in the page cache however many workers there are, and
+records are decoded only when a request touches them.
+
+A snapshot file is a small JSON header followed by aligned sections:
+
+- record tables: concatenated encoded records plus a uint64 offset array
+- string tables: UTF-8 strings sorted by their bytes, their offsets and the
+  record slot each one points at, searched by bisection
+- uint32 arrays, e.g. precomputed sort orders
+
+Snapshots are immutable. A new one is written to a temporary file and
+swapped in with os.replace; readers notice the new file on their next check
+and re-map it, while requests still holding the old mapping finish with it.
+A lock file next to the snapshot makes sure only one worker rebuilds it.
+
+Enable with SHARED_SNAPSHOT_DIR (e.g. /dev/shm/sleeper-tools).
+"""
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import metrics
+from adp_store import (
+    SORTABLE_FIELDS, ADPDataset, adp_csv_path, file_version, load_adp_rows, normalize_name
+)
+from player_store import PlayerStore, name_entries, player_summary
+from sleeper_api import get_all_players
+
+MAGIC = b'SLSNAP01'
+_HEADER_LENGTH = struct.Struct('<I')
+_ALIGNMENT = 8
+
+# Seconds between checks for a newer snapshot file
+DEFAULT_CHECK_INTERVAL = 1.0
+
+PLAYERS_FILENAME = 'players.snapshot'
+ADP_FILENAME = 'adp.snapshot'
+
+
+def shared_snapshot_dir() -> Optional[str]:
+    """Directory holding the shared snapshots (SHARED_SNAPSHOT_DIR), or None when sharing is off."""
+    return os.getenv('SHARED_SNAPSHOT_DIR') or None
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _encode_json(value) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+class SnapshotWriter:
+    """Builds one snapshot file and swaps it into place on commit()."""
+
+    def __init__(self, path: str, meta: dict):
+        self.path = path
+        self.meta = meta
+        self._sections: List[Tuple[str, str, bytes]] = []
+
+    def add_array(self, name: str, typecode: str, values: Iterable[int]) -> None:
+        self._sections.append((name, typecode, array(typecode, values).tobytes()))
+
+    def add_records(self, name: str, records: List[bytes]) -> None:
+        """A table of encoded records, addressed by position."""
+        offsets = [0]
+        for record in records:
+            offsets.append(offsets[-1] + len(record))
+        self._sections.append((f"{name}.data", 'B', b''.join(records)))
+        self.add_array(f"{name}.offsets", 'Q', offsets)
+
+    def add_strings(self, name: str, entries: Iterable[Tuple[str, int]]) -> None:
+        """A sorted table of (string, record slot) pairs for exact and prefix search."""
+        encoded = sorted((value.encode('utf-8'), slot) for value, slot in entries)
+        self.add_records(name, [value for value, _ in encoded])
+        self.add_array(f"{name}.slots", 'I', (slot for _, slot in encoded))
+
+    def commit(self) -> None:
+        sections = {}
+        offset = 0
+        for name, typecode, data in self._sections:
+            offset = _aligned(offset)
+            sections[name] = [offset, len(data), typecode]
+            offset += len(data)
+        header = _encode_json({'meta': self.meta, 'sections': sections})
+        data_start = _aligned(len(MAGIC) + _HEADER_LENGTH.size + len(header))
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+            for name, _, data in self._sections:
+                f.seek(data_start + sections[name][0])
+                f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class RecordTable(Sequence):
+    """Read-only view of a record table; records are decoded on each access."""
+
+    def __init__(self, data: memoryview, offsets: memoryview, decode: Callable[[bytes], object]):
+        self._data = data
+        self._offsets = offsets
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def raw(self, i: int) -> bytes:
+        return bytes(self._data[self._offsets[i]:self._offsets[i + 1]])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._decode(self.raw(i))
+
+
+class StringTable:
+    """Sorted strings with the record slot each points at."""
+
+    def __init__(self, strings: RecordTable, slots: memoryview):
+        self._strings = strings
+        self._slots = slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def string(self, i: int) -> str:
+        return self._strings.raw(i).decode('utf-8')
+
+    def slot(self, i: int) -> int:
+        return self._slots[i]
+
+    def _bisect_left(self, value: bytes) -> int:
+        lo, hi = 0, len(self._slots)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._strings.raw(mid) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, value: str) -> Optional[int]:
+        """Slot of the first entry equal to value, or None."""
+        key = value.encode('utf-8')
+        i = self._bisect_left(key)
+        if i < len(self._slots) and self._strings.raw(i) == key:
+            return self._slots[i]
+        return None
+
+    def prefix(self, prefix: str):
+        """Yield (string, slot) for the entries starting with prefix, in order."""
+        key = prefix.encode('utf-8')
+        i = self._bisect_left(key)
+        while i < len(self._slots):
+            value = self._strings.raw(i)
+            if not value.startswith(key):
+                return
+            yield value.decode('utf-8'), self._slots[i]
+            i += 1
+
+
+class Snapshot:
+    """One snapshot file, mapped read-only."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        header_length, = _HEADER_LENGTH.unpack_from(view, len(MAGIC))
+        header = json.loads(bytes(view[header_start:header_start + header_length]))
+        self.meta: dict = header['meta']
+        self._sections: Dict[str, list] = header['sections']
+        self._data = view[_aligned(header_start + header_length):]
+
+    def section(self, name: str) -> memoryview:
+        offset, length, typecode = self._sections[name]
+        data = self._data[offset:offset + length]
+        return data if typecode == 'B' else data.cast(typecode)
+
+    def records(self, name: str, decode: Callable[[bytes], object] = json.loads) -> RecordTable:
+        return RecordTable(self.section(f"{name}.data"), self.section(f"{name}.offsets"), decode)
+
+    def strings(self, name: str) -> StringTable:
+        return StringTable(self.records(name, bytes.decode), self.section(f"{name}.slots"))
+
+
+class SnapshotHandle:
+    """The latest snapshot at a path, re-mapped when a newer file is swapped in."""
+
+    def __init__(self, path: str, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self, refresh: bool = False) -> Optional[Snapshot]:
+        """The mapped snapshot (None if none was published yet), checking the file at most once per interval."""
+        snapshot = self._snapshot
+        if not refresh and snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.identity != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+                # The previous mapping stays valid for whoever still holds it
+                self._snapshot = Snapshot(self.path)
+            return self._snapshot
+
+    @contextmanager
+    def publishing(self):
+        """Hold the cross-process lock for (re)building this snapshot."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def publish_players(path: str, players: Dict[str, dict], loaded_at: float) -> None:
+    """Write a player database snapshot: records by id plus the name prefix index."""
+    ids = sorted(players, key=lambda pid: pid.encode('utf-8'))
+    slots = {pid: i for i, pid in enumerate(ids)}
+    writer = SnapshotWriter(path, {
+        'kind': 'players', 'loaded_at': loaded_at, 'generation': time.time_ns(), 'count': len(ids)
+    })
+    writer.add_records('players', [_encode_json(players[pid]) for pid in ids])
+    writer.add_strings('ids', ((pid, i) for i, pid in enumerate(ids)))
+    writer.add_strings('names', ((name, slots[pid]) for name, pid in name_entries(players)))
+    writer.commit()
+
+
+class SharedPlayers(Mapping):
+    """{player_id: player_info} over a player snapshot, decoding players as they are read."""
+
+    def __init__(self, snapshot: Snapshot):
+        self._records = snapshot.records('players')
+        self._ids = snapshot.strings('ids')
+
+    def __getitem__(self, player_id: str) -> dict:
+        slot = self._ids.find(player_id) if isinstance(player_id, str) else None
+        if slot is None:
+            raise KeyError(player_id)
+        return self._records[slot]
+
+    def __contains__(self, player_id) -> bool:
+        return isinstance(player_id, str) and self._ids.find(player_id) is not None
+
+    def __iter__(self):
+        return (self._ids.string(i) for i in range(len(self._ids)))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class SharedPlayerIndex:
+    """PlayerIndex (lookup and prefix search) answered straight from a player snapshot."""
+
+    def __init__(self, snapshot: Snapshot, version: int):
+        self.snapshot = snapshot
+        self.players = SharedPlayers(snapshot)
+        self.version = version
+        self._records = snapshot.records('players')
+        self._ids = snapshot.strings('ids')
+        self._names = snapshot.strings('names')
+
+    def lookup(self, player_ids: Iterable[str]) -> Dict[str, dict]:
+        """Summaries for the ids that exist in the snapshot."""
+        players = self.players
+        found = {}
+        for pid in player_ids:
+            info = players.get(pid)
+            if info is not None:
+                found[pid] = player_summary(pid, info)
+        return found
+
+    def search_prefix(self, prefix: str, limit: int = 20) -> List[dict]:
+        """Players whose full or last name starts with prefix."""
+        term = normalize_name(prefix)
+        if not term:
+            return []
+        results = []
+        seen = set()
+        for _, slot in self._names.prefix(term):
+            if len(results) >= limit:
+                break
+            if slot not in seen:
+                seen.add(slot)
+                results.append(player_summary(self._ids.string(slot), self._records[slot]))
+        return results
+
+
+class SharedPlayerStore(PlayerStore):
+    """PlayerStore whose snapshot lives in a shared file instead of this process's memory.
+
+    Whichever process finds the file missing or older than max_age downloads
+    the database and publishes a new snapshot; the others just map it.
+    """
+
+    def __init__(self, path: str, fetch: Callable[[], Dict[str, dict]] = get_all_players,
+                 max_age: Optional[float] = None):
+        super().__init__(fetch, max_age)
+        self.handle = SnapshotHandle(path)
+        self._snapshot: Optional[Snapshot] = None
+
+    def _stale(self, snapshot: Optional[Snapshot]) -> bool:
+        return snapshot is None or time.time() - snapshot.meta['loaded_at'] > self.max_age
+
+    def _attach(self, snapshot: Snapshot) -> None:
+        if snapshot is not self._snapshot:
+            self._players = SharedPlayers(snapshot)
+            self._loaded_at = snapshot.meta['loaded_at']
+            self.version = snapshot.meta['generation']
+            self._snapshot = snapshot
+
+    def get_players(self) -> Dict[str, dict]:
+        """Return the shared player database, publishing a new snapshot if missing or expired."""
+        snapshot = self.handle.current()
+        if not self._stale(snapshot):
+            metrics.record_cache('players', 'hit')
+            self._attach(snapshot)
+            return self._players
+
+        with self._lock, self.handle.publishing():
+            # Another worker may have published while we waited for the lock
+            snapshot = self.handle.current(refresh=True)
+            if self._stale(snapshot):
+                metrics.record_cache('players', 'miss')
+                print("Loading player database...")
+                players = self.fetch()
+                if not players:
+                    raise ValueError("Failed to load player database from Sleeper")
+                publish_players(self.handle.path, players, time.time())
+                print(f"Published {len(players)} players to {self.handle.path}")
+                snapshot = self.handle.current(refresh=True)
+            self._attach(snapshot)
+            return self._players
+
+    def get_index(self) -> SharedPlayerIndex:
+        """Return the lookup index for the current snapshot."""
+        self.get_players()
+        index = self._index
+        if index is None or index.snapshot is not self._snapshot:
+            with self._lock:
+                if self._index is None or self._index.snapshot is not self._snapshot:
+                    self._index = SharedPlayerIndex(self._snapshot, self.version)
+                index = self._index
+        return index
+
+
+def publish_adp(path: str, dataset: ADPDataset) -> None:
+    """Write an ADP snapshot: rows, search keys, positions and the sort orders."""
+    writer = SnapshotWriter(path, {
+        'kind': 'adp', 'version': dataset.version, 'positions': dataset.positions, 'count': len(dataset.rows)
+    })
+    writer.add_records('rows', [_encode_json(row) for row in dataset.rows])
+    writer.add_records('search_keys', [key.encode('utf-8') for key in dataset.search_keys])
+    for field in SORTABLE_FIELDS:
+        writer.add_array(f"order.{field}", 'I', dataset.sort_orders[field])
+    writer.commit()
+
+
+class SharedADPDataset(ADPDataset):
+    """ADPDataset over an ADP snapshot; rows are decoded only for the page being served."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self.rows = snapshot.records('rows')
+        self.version = snapshot.meta['version']
+        self.search_keys = snapshot.records('search_keys', bytes.decode)
+        self.positions = snapshot.meta['positions']
+        self.sort_orders = {field: snapshot.section(f"order.{field}") for field in SORTABLE_FIELDS}
+        self._search_cache: Dict[str, frozenset] = {}
+        self._lock = threading.Lock()
+
+
+class SharedADPSource:
+    """get_adp_dataset / is_adp_dataset_loaded backed by a shared ADP snapshot.
+
+    The snapshot is rebuilt (by one process) whenever the CSV's file version
+    no longer matches the one it was built from.
+    """
+
+    def __init__(self, path: str):
+        self.handle = SnapshotHandle(path)
+        self._dataset: Optional[SharedADPDataset] = None
+        self._lock = threading.Lock()
+
+    def is_loaded(self) -> bool:
+        return self._dataset is not None
+
+    def get(self, path: Optional[str] = None) -> ADPDataset:
+        path = path or adp_csv_path()
+        version = file_version(path) or 'missing'
+        snapshot = self.handle.current()
+        if snapshot is None or snapshot.meta['version'] != version:
+            with self._lock, self.handle.publishing():
+                snapshot = self.handle.current(refresh=True)
+                if snapshot is None or snapshot.meta['version'] != version:
+                    try:
+                        rows = load_adp_rows(path) if version != 'missing' else []
+                    except FileNotFoundError:
+                        rows, version = [], 'missing'
+                    if version == 'missing':
+                        print("ADP data file not found.")
+                    publish_adp(self.handle.path, ADPDataset(rows, version))
+                    snapshot = self.handle.current(refresh=True)
+
+        dataset = self._dataset
+        if dataset is None or dataset.snapshot is not snapshot:
+            dataset = self._dataset = SharedADPDataset(snapshot)
+        return dataset
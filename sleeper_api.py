@@ -1,53 +1,93 @@
 import os
+import time
 import requests
 from dotenv import load_dotenv
-
-# Base URL for Sleeper API
-BASE_URL = "https://api.sleeper.app/v1"
+import cache_client
+import metrics
+import tracing
+
+# Base URL for Sleeper API (overridable, e.g. to point at a local stub for load tests)
+BASE_URL = os.getenv('SLEEPER_API_BASE_URL', "https://api.sleeper.app/v1")
+
+def endpoint_label(url):
+    """Collapse a request URL into an endpoint template for metrics, e.g. /league/:id/rosters."""
+    path = url[len(BASE_URL):] if url.startswith(BASE_URL) else url
+    labels = []
+    previous = ''
+    for segment in path.split('?')[0].strip('/').split('/'):
+        if previous == 'user':
+            labels.append(':user')
+        elif segment.isdigit():
+            labels.append(':season' if len(segment) == 4 else ':id')
+        else:
+            labels.append(segment)
+        previous = segment
+    return '/' + '/'.join(labels)
+
+def timed_get(url, **kwargs):
+    """requests.get that records upstream latency and status per endpoint."""
+    endpoint = endpoint_label(url)
+    status = 'error'
+    start = time.perf_counter()
+    try:
+        with tracing.span(f"GET {endpoint}", 'network', url=url) as span:
+            response = requests.get(url, **kwargs)
+            span.annotate(status=response.status_code, bytes=len(response.content))
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+        metrics.UPSTREAM_REQUESTS.inc(endpoint=endpoint, status=status)
+
+def get_json(url):
+    """GET a Sleeper URL and decode it; raises on HTTP errors.
+
+    When the local cache daemon (cache_daemon.py) is running it answers from
+    memory; otherwise, or if it can't, the URL is fetched directly.
+    """
+    data = cache_client.get_json(url)
+    if data is not cache_client.MISSING:
+        return data
+    response = timed_get(url)
+    response.raise_for_status()
+    with tracing.span('decode json', 'decode', url=url):
+        return response.json()
 
 # Standalone utility functions for backward compatibility
 def get_user(username):
     """Fetches a user by username."""
-    response = requests.get(f"{BASE_URL}/user/{username}")
-    response.raise_for_status()
-    return response.json()
+    return get_json(f"{BASE_URL}/user/{username}")
 
 def get_all_leagues(user_id, season):
     """Fetches all leagues for a user for a given season."""
-    response = requests.get(f"{BASE_URL}/user/{user_id}/leagues/nfl/{season}")
-    response.raise_for_status()
-    return response.json()
+    return get_json(f"{BASE_URL}/user/{user_id}/leagues/nfl/{season}")
 
 def get_all_drafts(user_id, season):
     """Fetches all drafts for a user for a given season."""
-    response = requests.get(f"{BASE_URL}/user/{user_id}/drafts/nfl/{season}")
-    response.raise_for_status()
-    return response.json()
+    return get_json(f"{BASE_URL}/user/{user_id}/drafts/nfl/{season}")
 
 def get_draft_picks(draft_id):
     """Fetches all picks for a given draft."""
-    response = requests.get(f"{BASE_URL}/draft/{draft_id}/picks")
-    response.raise_for_status()
-    return response.json()
+    return get_json(f"{BASE_URL}/draft/{draft_id}/picks")
+
+def get_league_users(league_id):
+    """Fetches all users in a league."""
+    return get_json(f"{BASE_URL}/league/{league_id}/users")
 
 def get_all_players():
     """Fetches all players."""
-    response = requests.get(f"{BASE_URL}/players/nfl")
-    response.raise_for_status()
-    return response.json()
+    return get_json(f"{BASE_URL}/players/nfl")
 
 class SleeperAPI:
     def __init__(self, username):
-        self.base_url = "https://api.sleeper.app/v1"
+        self.base_url = BASE_URL
         self.username = username
         self.user_id = None
         self._get_user_id()
 
     def _make_request(self, url):
         try:
-            response = requests.get(url)
-            response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
-            return response.json()
+            return get_json(url)  # Raises for bad status codes (4xx or 5xx)
         except requests.exceptions.RequestException as e:
             print(f"Error making request to {url}: {e}")
             return None
@@ -101,6 +141,16 @@ class SleeperAPI:
         url = f"{self.base_url}/draft/{draft_id}/picks"
         return self._make_request(url)
 
+    def get_league(self, league_id):
+        """Get a league by id (used to follow previous_league_id links)."""
+        url = f"{self.base_url}/league/{league_id}"
+        return self._make_request(url)
+
+    def get_league_drafts(self, league_id):
+        """Get all drafts held by a specific league."""
+        url = f"{self.base_url}/league/{league_id}/drafts"
+        return self._make_request(url)
+
     def get_league_users(self, league_id):
         """Get all users in a specific league."""
         url = f"{self.base_url}/league/{league_id}/users"
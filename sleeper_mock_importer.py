@@ -5,23 +5,100 @@ Since Sleeper API can't start mocks automatically, this helps you quickly import
 the results after you manually run mock drafts.
 """
 
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional
-from mock_draft_tracker import MockDraft, DraftPick, MockDraftTracker
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from dotenv import load_dotenv
+
+from adp_store import adp_csv_path
+from mock_draft_tracker import (DEFAULT_DATA_FILE, ADPAggregator, DraftPick, MockDraft, MockDraftTracker,
+                                append_draft_records, export_adp, load_adp_aggregator)
+from league_snapshot import get_drafts_for_user
+from name_index import NameIndex
+import tracing
 from sleeper_api import get_draft_picks, get_all_players, get_user, get_all_drafts
 
+# Words in a draft's name that mark it as a mock, as used by the experimental finders
+MOCK_NAME_KEYWORDS = ('mock', 'practice')
+
+def is_mock_draft(draft: dict) -> bool:
+    """Whether a listed Sleeper draft is a mock draft.
+
+    The draft's own fields decide first: a 'mock' type, a mock flag in its
+    metadata, or a metadata name like "Mock Draft". Only when none of them
+    says so does a missing league_id mark it as a mock.
+    """
+    metadata = draft.get('metadata') or {}
+    if str(draft.get('type') or '').lower() == 'mock':
+        return True
+    if str(metadata.get('is_mock') or '').lower() in ('1', 'true'):
+        return True
+    name = str(metadata.get('name') or '').lower()
+    if any(keyword in name for keyword in MOCK_NAME_KEYWORDS):
+        return True
+    league_id = draft.get('league_id')
+    return not league_id or league_id in ('null', '0')
+
+# Drafts appended to the data file at a time by stream_import
+STORE_BATCH_SIZE = 50
+
+def iter_draft_picks(draft_ids: Iterable[str], workers: int = 4) -> Iterator[Tuple[str, List[dict]]]:
+    """
+    Yield (draft_id, raw Sleeper pick records) for each draft, in order.
+    
+    Picks are fetched up to workers drafts ahead of the consumer, so only
+    that many drafts' picks are held at once. Drafts whose picks can't be
+    fetched are reported and skipped.
+    """
+    draft_ids = iter(draft_ids)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for draft_id in draft_ids:
+            pending.append((draft_id, pool.submit(get_draft_picks, draft_id)))
+            if len(pending) >= workers:
+                break
+        while pending:
+            draft_id, future = pending.popleft()
+            next_id = next(draft_ids, None)
+            if next_id is not None:
+                pending.append((next_id, pool.submit(get_draft_picks, next_id)))
+            try:
+                picks = future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"Could not fetch picks for {draft_id}: {e}")
+                continue
+            yield draft_id, picks or []
+
 class SleeperMockImporter:
     """Import mock drafts from Sleeper API."""
     
     def __init__(self):
         self.all_players = None
-        self.tracker = MockDraftTracker()
+        self.data_file = DEFAULT_DATA_FILE
+        self._tracker = None
+        self._name_index = None
+    
+    @property
+    def tracker(self) -> MockDraftTracker:
+        """The mock draft tracker, loaded on first use (streaming imports don't need it)."""
+        if self._tracker is None:
+            self._tracker = MockDraftTracker(self.data_file)
+        return self._tracker
     
     def load_players(self):
         """Load all NFL players from Sleeper API."""
         if self.all_players is None:
             print("Loading NFL players from Sleeper API...")
-            self.all_players = get_all_players()
+            with tracing.span('importer.load_players'):
+                self.all_players = get_all_players()
             print(f"Loaded {len(self.all_players)} players")
     
     def get_player_name(self, player_id: str) -> str:
@@ -36,6 +113,49 @@ class SleeperMockImporter:
             return f"{first_name} {last_name}".strip()
         return f"Unknown Player ({player_id})"
     
+    def player_details(self, player_id: str) -> Tuple[str, str, str]:
+        """(name, position, team) of a player as recorded in imported picks."""
+        player_name = self.get_player_name(player_id)
+        
+        # Get player info for position and team
+        player_info = self.all_players.get(player_id, {})
+        position = player_info.get('position', 'UNK')
+        team = player_info.get('team', 'FA')
+        
+        # Handle IDP player positions more accurately
+        if position in ['DL', 'LB', 'DB'] and 'fantasy_positions' in player_info:
+            # Use the first fantasy position if available for more specific defensive position
+            fantasy_pos = player_info.get('fantasy_positions', [])
+            if fantasy_pos and len(fantasy_pos) > 0:
+                position = fantasy_pos[0]
+        return player_name, position, team
+    
+    def keeper_ids(self, keepers: List[str]) -> List[Optional[str]]:
+        """Player ids for typed keeper names (None for names that match no player)."""
+        if not keepers:
+            return []
+        self.load_players()
+        if self._name_index is None:
+            with tracing.span('importer.name_index'):
+                self._name_index = NameIndex(self.all_players)
+        return self._name_index.resolve_ids(keepers)
+    
+    def pick_fields(self, pick_data: dict) -> Dict:
+        """DraftPick fields for a raw Sleeper pick record (which must have a player_id)."""
+        player_id = pick_data['player_id']
+        player_name, position, team = self.player_details(player_id)
+        return {
+            'player_name': player_name,
+            'player_id': player_id,
+            'position': position,
+            'team': team,
+            'round_num': pick_data.get('round', 0),
+            'pick_num': pick_data.get('pick_no', 0),
+            'overall_pick': pick_data.get('pick_no', 0),
+            'drafted_by_team': f"Team{pick_data.get('draft_slot', 0)}"
+        }
+    
+    @tracing.traced('importer.import_draft')
     def import_draft_by_id(self, draft_id: str, keepers: List[str] = None) -> MockDraft:
         """Import a draft by its Sleeper draft ID."""
         print(f"Importing draft {draft_id}...")
@@ -51,36 +171,13 @@ class SleeperMockImporter:
         
         # Process picks
         picks = []
-        for pick_data in draft_picks_raw:
-            player_id = pick_data.get('player_id')
-            if not player_id:
-                continue  # Skip empty picks
-            
-            player_name = self.get_player_name(player_id)
-            
-            # Get player info for position and team
-            player_info = self.all_players.get(player_id, {})
-            position = player_info.get('position', 'UNK')
-            team = player_info.get('team', 'FA')
-            
-            # Handle IDP player positions more accurately
-            if position in ['DL', 'LB', 'DB'] and 'fantasy_positions' in player_info:
-                # Use the first fantasy position if available for more specific defensive position
-                fantasy_pos = player_info.get('fantasy_positions', [])
-                if fantasy_pos and len(fantasy_pos) > 0:
-                    position = fantasy_pos[0]
-            
-            pick = DraftPick(
-                player_name=player_name,
-                player_id=player_id,
-                position=position,
-                team=team,
-                round_num=pick_data.get('round', 0),
-                pick_num=pick_data.get('pick_no', 0),
-                overall_pick=pick_data.get('pick_no', 0),
-                drafted_by_team=f"Team{pick_data.get('draft_slot', 0)}"
-            )
-            picks.append(pick)
+        with tracing.span('importer.map_picks', draft_id=draft_id, picks=len(draft_picks_raw)):
+            for pick_data in draft_picks_raw:
+                player_id = pick_data.get('player_id')
+                if not player_id:
+                    continue  # Skip empty picks
+                
+                picks.append(DraftPick(**self.pick_fields(pick_data)))
         
         # Determine league size and rounds from picks
         if picks:
@@ -97,11 +194,77 @@ class SleeperMockImporter:
             rounds=max_round,
             keepers=keepers or [],
             picks=picks,
-            notes=f"Imported from Sleeper draft {draft_id}"
+            notes=f"Imported from Sleeper draft {draft_id}",
+            keeper_ids=self.keeper_ids(keepers)
         )
         
         return mock_draft
     
+    @tracing.traced('importer.stream_import')
+    def stream_import(self, drafts: Iterable, aggregator: ADPAggregator, store: bool = False,
+                      keepers: List[str] = None, notes: str = None, workers: int = 4) -> List[str]:
+        """
+        Import drafts straight into an ADP aggregator, without MockDraft objects.
+        
+        drafts are draft ids or listing entries from get_all_drafts (whose
+        'created' time becomes the draft date). Raw pick records flow from
+        iter_draft_picks into the aggregator one draft at a time, so memory
+        stays bounded however many drafts are imported. With store=True each
+        draft is also appended to the tracker's data file, in batches,
+        without loading it. Returns the ids of the drafts imported.
+        """
+        self.load_players()
+        listings = {}
+        
+        def draft_ids():
+            for draft in drafts:
+                if isinstance(draft, dict):
+                    listings[draft['draft_id']] = draft
+                    yield draft['draft_id']
+                else:
+                    yield draft
+        
+        keeper_ids = self.keeper_ids(keepers) if store else []
+        imported = []
+        records = []
+        for draft_id, raw_picks in iter_draft_picks(draft_ids(), workers):
+            listing = listings.pop(draft_id, {})
+            if not raw_picks:
+                print(f"No picks found for draft {draft_id}")
+                continue
+            with tracing.span('importer.map_picks', draft_id=draft_id, picks=len(raw_picks)):
+                picks = (self.pick_fields(pick_data) for pick_data in raw_picks if pick_data.get('player_id'))
+                if store:
+                    picks = list(picks)
+                aggregator.add_draft((pick['player_id'], pick['player_name'], pick['position'],
+                                      pick['overall_pick']) for pick in picks)
+            imported.append(draft_id)
+            
+            if store:
+                created = listing.get('created')
+                draft_date = datetime.fromtimestamp(created / 1000) if created else datetime.now()
+                records.append({
+                    'draft_id': draft_id,
+                    'draft_date': draft_date.isoformat(),
+                    'league_size': len({pick['drafted_by_team'] for pick in picks}) or 12,
+                    'rounds': max((pick['round_num'] for pick in picks), default=16),
+                    'keepers': keepers or [],
+                    'picks': picks,
+                    'notes': notes or f"Imported from Sleeper draft {draft_id}",
+                    'keeper_ids': keeper_ids
+                })
+                if len(records) >= STORE_BATCH_SIZE:
+                    append_draft_records(self.data_file, records)
+                    records = []
+        
+        if records:
+            append_draft_records(self.data_file, records)
+        if store and imported:
+            # The loaded tracker no longer matches the file
+            self._tracker = None
+        print(f"Imported {len(imported)} drafts; ADP now based on {aggregator.draft_count} drafts")
+        return imported
+    
     def find_recent_drafts(self, username: str, season: int = 2024) -> List[dict]:
         """Find recent drafts for a user."""
         print(f"Finding recent drafts for {username} in {season}...")
@@ -137,6 +300,115 @@ class SleeperMockImporter:
             print(f"Error finding drafts: {e}")
             return []
     
+    def _load_watch_state(self, state_path: str, season) -> dict:
+        try:
+            with open(state_path, 'r') as f:
+                state = json.load(f)
+            if state.get('season') == str(season):
+                return state
+        except (OSError, json.JSONDecodeError):
+            pass
+        return {'season': str(season), 'statuses': {}, 'imported': []}
+    
+    def _save_watch_state(self, state_path: str, state: dict) -> None:
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, state_path)
+    
+    @tracing.traced('importer.export_adp')
+    def export_adp_atomically(self, path: str, aggregator: Optional[ADPAggregator] = None) -> str:
+        """
+        Rewrite the ADP export via a temp file so readers (e.g. api.py) never
+        see a partial file. ADP comes from aggregator if given, else from the
+        tracker's drafts.
+        """
+        root, ext = os.path.splitext(path)
+        tmp_path = f"{root}.tmp{ext}"
+        if aggregator is not None:
+            export_adp(aggregator.results(), tmp_path, aggregator.draft_count)
+        else:
+            self.tracker.export_adp_to_csv(tmp_path)
+        os.replace(tmp_path, path)
+        return path
+    
+    @tracing.traced('importer.check_for_new_drafts')
+    def check_for_new_drafts(self, user_id: str, season, state: dict, known_ids: set,
+                             include_league_drafts: bool = False, max_age: Optional[float] = None) -> List[dict]:
+        """List the user's drafts once; returns completed ones not in known_ids.
+
+        The listing goes through the memoized draft listing (and so the cache
+        daemon, when one is running), reused for at most max_age seconds.
+        """
+        drafts = get_drafts_for_user(user_id, season, max_age) or []
+        
+        new_drafts = []
+        for draft in drafts:
+            draft_id = draft['draft_id']
+            previous_status = state['statuses'].get(draft_id)
+            status = draft.get('status', 'unknown')
+            state['statuses'][draft_id] = status
+            if status != 'complete' or draft_id in known_ids:
+                continue
+            if not include_league_drafts and not is_mock_draft(draft):
+                continue
+            if previous_status and previous_status != 'complete':
+                print(f"Draft {draft_id} finished ({previous_status} -> complete)")
+            new_drafts.append(draft)
+        return new_drafts
+    
+    def watch(self, username: str, season: int = 2025, interval: float = 300, export_path: str = None,
+              keepers: List[str] = None, state_path: str = "mock_watch_state.json",
+              include_league_drafts: bool = False, max_checks: Optional[int] = None) -> None:
+        """
+        Poll the user's drafts every interval seconds, import newly completed
+        mock drafts and rewrite the ADP export whenever something new came in.
+        
+        Draft statuses and imported ids are kept in state_path, so a restarted
+        watcher only imports drafts it hasn't seen complete before. ADP is
+        kept in an ADPAggregator seeded once from the data file; new drafts
+        are streamed into it and appended to the file, so each update costs
+        only the new drafts.
+        """
+        export_path = export_path or adp_csv_path()
+        user_id = get_user(username)['user_id']
+        state = self._load_watch_state(state_path, season)
+        aggregator, known_ids = load_adp_aggregator(self.data_file)
+        known_ids.update(state['imported'])
+        print(f"Watching {username}'s {season} drafts every {interval:g}s "
+              f"(ADP export: {export_path}, {aggregator.draft_count} drafts so far). Press Ctrl+C to stop.")
+        
+        checks = 0
+        try:
+            while max_checks is None or checks < max_checks:
+                checks += 1
+                stamp = datetime.now().strftime('%H:%M:%S')
+                try:
+                    new_drafts = self.check_for_new_drafts(user_id, season, state, known_ids, include_league_drafts,
+                                                           max_age=interval)
+                except requests.exceptions.RequestException as e:
+                    print(f"[{stamp}] Could not list drafts: {e}")
+                    new_drafts = []
+                
+                imported = []
+                if new_drafts:
+                    imported = self.stream_import(new_drafts, aggregator, store=True, keepers=keepers,
+                                                  notes="Auto-imported by watch mode")
+                if imported:
+                    state['imported'].extend(imported)
+                    known_ids.update(imported)
+                    self.export_adp_atomically(export_path, aggregator)
+                    print(f"[{stamp}] Imported {len(imported)} new drafts; ADP now based on "
+                          f"{aggregator.draft_count} drafts")
+                else:
+                    print(f"[{stamp}] No newly completed drafts")
+                self._save_watch_state(state_path, state)
+                
+                if max_checks is None or checks < max_checks:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+    
     def interactive_import(self):
         """Interactive method to import drafts."""
         print("\n=== Sleeper Mock Draft Importer ===")
@@ -205,7 +477,44 @@ class SleeperMockImporter:
 
 def main():
     """Main function for the importer."""
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Import Sleeper mock drafts into the mock draft tracker.")
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running, importing newly completed mock drafts and updating the ADP export')
+    parser.add_argument('--username', default=os.getenv('SLEEPER_USERNAME'))
+    parser.add_argument('--season', type=int, default=2025)
+    parser.add_argument('--interval', type=float, default=300, help='seconds between checks (default: 300)')
+    parser.add_argument('--export', help='ADP CSV to keep updated (default: ADP_CSV_PATH or the API\'s CSV)')
+    parser.add_argument('--keepers', default='', help='comma-separated keeper names for imported drafts')
+    parser.add_argument('--include-league-drafts', action='store_true',
+                        help='also import completed league (non-mock) drafts')
+    parser.add_argument('--stream', nargs='+', metavar='DRAFT_ID',
+                        help='stream these drafts (- reads ids from stdin) straight into an ADP export')
+    parser.add_argument('--store', action='store_true',
+                        help='with --stream, also append the drafts to mock_drafts.json and include its drafts in the ADP')
+    args = parser.parse_args()
+    
     importer = SleeperMockImporter()
+    keepers = [k.strip() for k in args.keepers.split(',') if k.strip()]
+    
+    if args.stream:
+        if args.stream == ['-']:
+            draft_ids = (line.strip() for line in sys.stdin if line.strip())
+        else:
+            draft_ids = iter(args.stream)
+        aggregator, known_ids = load_adp_aggregator(importer.data_file) if args.store else (ADPAggregator(), set())
+        importer.stream_import((d for d in draft_ids if d not in known_ids), aggregator,
+                               store=args.store, keepers=keepers)
+        export_adp(aggregator.results(), args.export, aggregator.draft_count)
+        return
+    
+    if args.watch:
+        if not args.username:
+            print("Pass --username or set SLEEPER_USERNAME to watch drafts.")
+            return
+        importer.watch(args.username, args.season, args.interval, args.export, keepers,
+                       include_league_drafts=args.include_league_drafts)
+        return
     
     while True:
         print("\n=== Sleeper Mock Draft Importer ===")
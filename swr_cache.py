@@ -0,0 +1,114 @@
+"""Stale-While-Revalidate Cache
+
+Keeps the last computed value for each key in memory and serves it
+immediately. Values older than max_age are refreshed by a background
+worker while callers keep getting the stale copy, so request latency is
+bounded by a dictionary lookup once a key has been computed.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import metrics
+
+# Cache status values reported to callers
+HIT = 'hit'        # fresh value served from memory
+STALE = 'stale'    # old value served while a refresh runs in the background
+MISS = 'miss'      # nothing cached yet, value computed inside the request
+
+# Refresh status values
+IDLE = 'idle'
+REFRESHING = 'refreshing'
+FAILED = 'failed'
+
+
+@dataclass
+class CacheEntry:
+    """A cached value and when it was computed."""
+    value: Any
+    computed_at: float
+    version: int
+
+
+class StaleWhileRevalidateCache:
+    """Serve cached values, refreshing them in the background once stale."""
+
+    def __init__(self, loader: Callable[[Hashable], Any], max_age: float, name: str = 'cache'):
+        self.loader = loader
+        self.max_age = max_age
+        self.name = name
+        self._entries: Dict[Hashable, CacheEntry] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._errors: Dict[Hashable, str] = {}
+        self._versions = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"{name}-refresh")
+
+    def _load(self, key: Hashable) -> CacheEntry:
+        try:
+            value = self.loader(key)
+        except Exception as e:
+            with self._lock:
+                self._errors[key] = str(e)
+                self._inflight.pop(key, None)
+            print(f"[{self.name}] refresh failed for {key}: {e}")
+            raise
+
+        with self._lock:
+            self._versions += 1
+            entry = CacheEntry(value=value, computed_at=time.time(), version=self._versions)
+            self._entries[key] = entry
+            self._errors.pop(key, None)
+            self._inflight.pop(key, None)
+        return entry
+
+    def _start_refresh(self, key: Hashable) -> Future:
+        """Submit a refresh for key unless one is already running. Caller holds the lock."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._executor.submit(self._load, key)
+            self._inflight[key] = future
+        return future
+
+    def get(self, key: Hashable) -> Tuple[CacheEntry, str]:
+        """Return (entry, cache status), computing synchronously only on a cold miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                future = self._start_refresh(key)
+            elif time.time() - entry.computed_at <= self.max_age:
+                metrics.record_cache(self.name, HIT)
+                return entry, HIT
+            else:
+                self._start_refresh(key)
+                metrics.record_cache(self.name, STALE)
+                return entry, STALE
+
+        # Concurrent cold requests share the same in-flight load
+        metrics.record_cache(self.name, MISS)
+        return future.result(), MISS
+
+    def refresh(self, key: Hashable, wait: bool = False) -> Optional[CacheEntry]:
+        """Trigger a refresh now, optionally waiting for it to finish."""
+        with self._lock:
+            future = self._start_refresh(key)
+        return future.result() if wait else None
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the cached entry without triggering any refresh."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def refresh_status(self, key: Hashable) -> str:
+        with self._lock:
+            if key in self._inflight:
+                return REFRESHING
+            if key in self._errors:
+                return FAILED
+            return IDLE
+
+    def age(self, entry: CacheEntry) -> int:
+        return int(time.time() - entry.computed_at)
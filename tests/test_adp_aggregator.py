@@ -0,0 +1,104 @@
+import json
+import random
+import statistics
+
+import pytest
+
+from mock_draft_tracker import ADPAggregator, append_draft_records, iter_draft_records, load_adp_aggregator
+
+
+def aggregate(picks_by_draft):
+    aggregator = ADPAggregator()
+    for picks in picks_by_draft:
+        aggregator.add_draft(picks)
+    return aggregator
+
+
+@pytest.mark.parametrize('picks', [
+    [5],
+    [3, 7],
+    [1, 2, 2, 9],
+    [4, 4, 4],
+    [10, 1, 7, 3, 12],
+])
+def test_stats_match_the_statistics_module(picks):
+    stats = aggregate([[('100', 'Player', 'RB', pick)] for pick in picks]).results()['100']
+    assert stats['times_drafted'] == len(picks)
+    assert stats['average_pick'] == round(statistics.mean(picks), 1)
+    assert stats['median_pick'] == statistics.median(picks)
+    assert stats['earliest_pick'] == min(picks)
+    assert stats['latest_pick'] == max(picks)
+    expected_std = round(statistics.stdev(picks), 1) if len(picks) > 1 else 0.0
+    assert stats['std_dev'] == expected_std
+    assert stats['all_picks'] == sorted(picks)
+
+
+def test_stats_match_on_random_histograms():
+    rng = random.Random(7)
+    for _ in range(50):
+        picks = [rng.randint(1, 40) for _ in range(rng.randint(2, 30))]
+        stats = aggregate([[('1', 'P', 'WR', pick)] for pick in picks]).results()['1']
+        assert stats['median_pick'] == statistics.median(picks)
+        assert stats['std_dev'] == round(statistics.stdev(picks), 1)
+        assert stats['average_pick'] == round(statistics.mean(picks), 1)
+
+
+def test_integral_means_stay_ints():
+    stats = aggregate([[('1', 'P', 'QB', 2)], [('1', 'P', 'QB', 4)]]).results()['1']
+    assert stats['average_pick'] == 3
+    assert isinstance(stats['average_pick'], int)
+
+
+def test_invalid_picks_are_skipped():
+    aggregator = ADPAggregator()
+    counted = aggregator.add_draft([('1', 'P', 'RB', 0), ('1', 'P', 'RB', -3), (None, '', 'RB', 5),
+                                    ('1', 'P', 'RB', 8)])
+    assert counted == 1
+    assert aggregator.results()['1']['all_picks'] == [8]
+
+
+def test_draft_percentage_and_majority_position():
+    aggregator = aggregate([
+        [('1', 'Old Name', 'WR', 3), ('2', 'Other', 'TE', 9)],
+        [('1', 'New Name', 'RB', 4)],
+        [('1', 'New Name', 'RB', 5)],
+        [],
+    ])
+    results = aggregator.results()
+    assert aggregator.draft_count == 4
+    assert results['1']['draft_percentage'] == 75.0
+    assert results['1']['position'] == 'RB'
+    assert results['1']['player_name'] == 'New Name'
+    assert results['2']['draft_percentage'] == 25.0
+
+
+def test_picks_without_ids_are_keyed_by_name():
+    results = aggregate([[(None, 'Ken Walker', 'RB', 10)], [(None, 'Kenneth Walker III', 'RB', 12)]]).results()
+    assert list(results) == ['name:kenneth walker']
+    entry = results['name:kenneth walker']
+    assert entry['player_id'] == ''
+    assert entry['times_drafted'] == 2
+
+
+def test_load_adp_aggregator_streams_the_data_file(tmp_path):
+    path = str(tmp_path / 'mock_drafts.json')
+    drafts = [{'draft_id': str(i), 'picks': [
+        {'player_id': str(p), 'player_name': f"P{p}", 'position': 'WR', 'overall_pick': (p + i) % 20 + 1}
+        for p in range(20)]} for i in range(5)]
+    with open(path, 'w') as f:
+        json.dump(drafts[:3], f, indent=2)
+    append_draft_records(path, drafts[3:])
+
+    assert list(iter_draft_records(path, chunk_size=64)) == drafts
+    aggregator, draft_ids = load_adp_aggregator(path)
+    assert draft_ids == {str(i) for i in range(5)}
+    expected = aggregate([[(p['player_id'], p['player_name'], p['position'], p['overall_pick'])
+                           for p in draft['picks']] for draft in drafts])
+    assert aggregator.results() == expected.results()
+
+
+def test_iter_draft_records_rejects_truncated_files(tmp_path):
+    path = tmp_path / 'mock_drafts.json'
+    path.write_text('[{"draft_id": "1", "picks": []}, {"draft_id": ')
+    with pytest.raises(ValueError):
+        list(iter_draft_records(str(path), chunk_size=8))
@@ -0,0 +1,103 @@
+import pytest
+
+from adp_store import ADPDataset, normalize_name, parse_adp_row
+
+
+def make_dataset():
+    names = ['Ja\'Marr Chase', 'Bijan Robinson', 'Justin Jefferson', 'Jahmyr Gibbs',
+             'Jalen Hurts', 'Josh Allen', 'Javonte Williams']
+    positions = ['WR', 'RB', 'WR', 'RB', 'QB', 'QB', 'RB']
+    rows = [parse_adp_row({
+        'rank': str(i + 1), 'player_name': name, 'position': position.lower(),
+        'times_drafted': str(10 - i), 'draft_percentage': f"{90 - i}%",
+        'average_pick': str(i + 1.5), 'median_pick': str(i + 1), 'earliest_pick': '1',
+        'latest_pick': str(i + 3), 'std_dev': 'N/A', 'player_id': str(100 + i),
+    }) for i, (name, position) in enumerate(zip(names, positions))]
+    return ADPDataset(rows, 'v1')
+
+
+def names(rows):
+    return [row['player_name'] for row in rows]
+
+
+def test_normalize_name_ignores_case_accents_and_punctuation():
+    assert normalize_name("Ja'Marr  Chase") == 'jamarr chase'
+    assert normalize_name('Amon-Ra St. Brown') == 'amon ra st brown'
+    assert normalize_name('Étienne') == 'etienne'
+    assert normalize_name('') == ''
+
+
+def test_parse_adp_row_types_and_defaults():
+    row = parse_adp_row({'rank': '3', 'times_drafted': '', 'average_pick': 'x',
+                         'draft_percentage': '42.5%', 'position': 'rb'})
+    assert row['rank'] == 3
+    assert row['times_drafted'] == 0
+    assert row['average_pick'] == 0.0
+    assert row['draft_percentage'] == 42.5
+    assert row['position'] == 'RB'
+    assert row['player_name'] == 'Unknown Player'
+    assert row['player_id'] == ''
+
+
+def test_query_pages_in_sort_order():
+    dataset = make_dataset()
+    total, page = dataset.query(sort_key='average_pick', offset=2, limit=2)
+    assert total == 7
+    assert names(page) == ['Justin Jefferson', 'Jahmyr Gibbs']
+
+    total, page = dataset.query(sort_key='average_pick', direction='descending', limit=2)
+    assert total == 7
+    assert names(page) == ['Javonte Williams', 'Josh Allen']
+
+
+def test_query_past_the_end_returns_an_empty_page():
+    total, page = make_dataset().query(offset=50, limit=10)
+    assert total == 7
+    assert page == []
+
+
+def test_query_sorts_strings_case_insensitively_with_name_ties():
+    total, page = make_dataset().query(sort_key='position')
+    assert [row['position'] for row in page] == ['QB', 'QB', 'RB', 'RB', 'RB', 'WR', 'WR']
+    # Ties are broken by normalized name
+    assert names(page[:2]) == ['Jalen Hurts', 'Josh Allen']
+
+
+def test_query_search_and_position_filters_count_all_matches():
+    dataset = make_dataset()
+    # Substring match: "bijan" contains "ja" too
+    total, page = dataset.query(search='ja', limit=2)
+    assert total == 5
+    assert names(page) == ["Ja'Marr Chase", 'Bijan Robinson']
+
+    total, page = dataset.query(search='ja', position='rb', offset=1, limit=1)
+    assert total == 3
+    assert names(page) == ['Jahmyr Gibbs']
+
+
+def test_query_search_ignores_punctuation():
+    total, page = make_dataset().query(search="JAMARR")
+    assert total == 1
+    assert names(page) == ["Ja'Marr Chase"]
+
+
+def test_query_rejects_unknown_sort_key():
+    with pytest.raises(ValueError):
+        make_dataset().query(sort_key='player_id')
+
+
+def test_search_narrows_from_cached_prefix():
+    dataset = make_dataset()
+    dataset.query(search='ja')
+    # A cached prefix is only narrowed, so rows outside it can't come back
+    dataset._search_cache['ja'] = frozenset({0})
+    total, page = dataset.query(search='jam')
+    assert total == 1
+    assert names(page) == ["Ja'Marr Chase"]
+
+
+def test_search_results_are_cached_per_term():
+    dataset = make_dataset()
+    dataset.query(search='Josh')
+    assert dataset._search_cache['josh'] == frozenset({5})
+    assert dataset.query(search='  ')[0] == 7
@@ -0,0 +1,110 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+import http_cache
+from http_cache import BodyCache, EncodedBody, cached_json_response, serialize_json
+
+app = Flask(__name__)
+
+LARGE_PAYLOAD = [{'player_name': f"Player {i}", 'rank': i} for i in range(200)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_body_cache(monkeypatch):
+    monkeypatch.setattr(http_cache, 'body_cache', BodyCache())
+    # Keep encoding negotiation independent of whether brotli is installed
+    monkeypatch.setattr(http_cache, 'brotli', None)
+
+
+def respond(payload, cache_key=None, **headers):
+    with app.test_request_context('/', headers=headers):
+        return cached_json_response(lambda: payload, cache_key)
+
+
+def test_serialize_json_is_compact_and_deterministic():
+    assert serialize_json({'a': [1, 2], 'b': 'é'}) == '{"a":[1,2],"b":"é"}'.encode('utf-8')
+
+
+def test_encoded_body_tags_each_encoding():
+    body = EncodedBody(b'{"a":1}')
+    assert body.tag_for('identity') == body.etag
+    assert body.tag_for('gzip') == f"{body.etag}-gzip"
+    assert len(set(body.all_tags())) == 3
+    assert EncodedBody(b'{"a":1}').etag == body.etag
+    assert EncodedBody(b'{"a":2}').etag != body.etag
+
+
+def test_encoded_body_compresses_once():
+    body = EncodedBody(serialize_json(LARGE_PAYLOAD))
+    compressed = body.encoded('gzip')
+    assert body.encoded('gzip') is compressed
+    assert gzip.decompress(compressed) == body.identity
+    assert body.encoded('identity') is body.identity
+
+
+def test_small_bodies_are_not_compressed():
+    response = respond({'a': 1}, **{'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert json.loads(response.get_data()) == {'a': 1}
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+
+def test_gzip_is_negotiated_for_large_bodies():
+    response = respond(LARGE_PAYLOAD, **{'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.get_data())) == LARGE_PAYLOAD
+    assert response.headers['ETag'].strip('"').endswith('-gzip')
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+
+def test_identity_without_accept_encoding():
+    response = respond(LARGE_PAYLOAD)
+    assert 'Content-Encoding' not in response.headers
+    assert json.loads(response.get_data()) == LARGE_PAYLOAD
+
+
+@pytest.mark.parametrize('encoding', ['identity', 'gzip'])
+def test_matching_if_none_match_gets_304(encoding):
+    first = respond(LARGE_PAYLOAD, **{'Accept-Encoding': encoding})
+    etag = first.headers['ETag']
+    # Any representation's tag revalidates, whatever the client now accepts
+    response = respond(LARGE_PAYLOAD, **{'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'].strip('"').endswith('-gzip')
+
+
+def test_stale_if_none_match_gets_the_body():
+    etag = respond({'a': 1}).headers['ETag']
+    response = respond({'a': 2}, **{'If-None-Match': etag})
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == {'a': 2}
+
+
+def test_cache_key_skips_rebuilding_the_payload():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {'a': 1}
+
+    for _ in range(3):
+        with app.test_request_context('/'):
+            cached_json_response(build, ('adp', 'v1'))
+    assert len(calls) == 1
+
+
+def test_body_cache_evicts_least_recently_used():
+    cache = BodyCache(max_entries=2)
+    a, b, c = (EncodedBody(x) for x in (b'1', b'2', b'3'))
+    cache.put('a', a)
+    cache.put('b', b)
+    assert cache.get('a') is a
+    cache.put('c', c)
+    assert cache.get('b') is None
+    assert cache.get('a') is a
+    assert cache.get('c') is c
@@ -0,0 +1,96 @@
+import pytest
+
+from name_index import NameIndex, edit_distance, name_key
+
+PLAYERS = {
+    '1': {'full_name': 'Kenneth Walker III', 'last_name': 'Walker', 'position': 'RB', 'search_rank': 20},
+    '2': {'full_name': 'D.J. Moore', 'last_name': 'Moore', 'position': 'WR', 'search_rank': 30},
+    '3': {'full_name': 'Marvin Harrison Jr.', 'last_name': 'Harrison', 'position': 'WR', 'search_rank': 15},
+    '4': {'full_name': 'Marvin Harrison', 'last_name': 'Harrison', 'position': 'WR', 'search_rank': 900},
+    '5': {'first_name': "Ja'Marr", 'last_name': 'Chase', 'position': 'WR', 'search_rank': 1},
+    '6': {'full_name': 'Josh Allen', 'last_name': 'Allen', 'position': 'QB', 'search_rank': 5},
+    '7': {'full_name': 'Josh Allen', 'last_name': 'Allen', 'position': 'LB',
+          'fantasy_positions': ['LB', 'DL'], 'search_rank': 400},
+    '8': {'full_name': 'Christian McCaffrey', 'last_name': 'McCaffrey', 'position': 'RB', 'search_rank': 2},
+    '9': {'full_name': '', 'position': 'K'},
+}
+
+
+@pytest.fixture(scope='module')
+def index():
+    return NameIndex(PLAYERS)
+
+
+@pytest.mark.parametrize('name, key', [
+    ('Kenneth Walker III', 'kenneth walker'),
+    ('Ken Walker', 'kenneth walker'),
+    ('D. J. Moore', 'dj moore'),
+    ('DJ Moore', 'dj moore'),
+    ('Marvin Harrison Jr.', 'marvin harrison'),
+    ('Jr', 'jr'),
+    ('Ken', 'ken'),
+])
+def test_name_key(name, key):
+    assert name_key(name) == key
+
+
+@pytest.mark.parametrize('a, b, distance', [
+    ('mccaffrey', 'mccaffrey', 0),
+    ('mccafrey', 'mccaffrey', 1),
+    ('mcacffrey', 'mccaffrey', 1),  # adjacent swap counts once
+    ('kitten', 'sitting', 3),
+    ('', 'abc', 3),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b, limit=5) == distance
+
+
+def test_edit_distance_stops_past_the_limit():
+    assert edit_distance('kitten', 'sitting', limit=1) == 2
+    assert edit_distance('a', 'abcdef', limit=2) == 3
+
+
+def test_players_without_a_name_are_skipped(index):
+    assert len(index) == 8
+
+
+def test_exact_keys_resolve_with_nicknames_and_initials(index):
+    assert index.resolve('Ken Walker').player_id == '1'
+    assert index.resolve('DJ Moore').player_id == '2'
+    assert index.resolve('jamarr chase').player_id == '5'
+    match = index.resolve('Kenneth Walker')
+    assert (match.distance, match.similarity) == (0, 1.0)
+
+
+def test_ties_go_to_the_lower_search_rank(index):
+    assert index.resolve('Marvin Harrison').player_id == '3'
+    assert [m.player_id for m in index.candidates('Marvin Harrison')] == ['3', '4']
+
+
+def test_position_filter_uses_fantasy_positions(index):
+    assert index.resolve('Josh Allen').player_id == '6'
+    assert index.resolve('Josh Allen', position='DL').player_id == '7'
+    assert index.resolve('Josh Allen', position='TE') is None
+
+
+def test_single_word_matches_last_names(index):
+    assert index.resolve('McCaffrey').player_id == '8'
+    assert [m.player_id for m in index.candidates('Allen')] == ['6', '7']
+
+
+def test_typos_resolve_within_the_distance_limit(index):
+    match = index.resolve('Christian McCafrey')
+    assert match.player_id == '8'
+    assert match.distance == 1
+    assert 0 < match.similarity < 1
+
+
+def test_names_too_far_away_do_not_resolve(index):
+    # "christian mcc" is 6 edits from the key; the limit for its length is 2
+    assert index.resolve('Christian Mcc') is None
+    assert index.resolve('Zzyzx Qwerty') is None
+    assert index.resolve('') is None
+
+
+def test_resolve_ids_keeps_order(index):
+    assert index.resolve_ids(['Josh Allen', 'Nobody Atall', 'DJ Moore']) == ['6', None, '2']
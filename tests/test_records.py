@@ -0,0 +1,71 @@
+from records import Draft, League, Pick, Player, Roster, User, decode_players
+
+
+def test_player_defaults_and_idp_position():
+    player = Player.from_json('42', {'position': 'LB', 'fantasy_positions': ['LB', 'DL']})
+    assert player.full_name == 'Unknown Player'
+    assert player.team == 'FA'
+    assert player.position == 'LB'
+    assert player.display_position == 'LB'
+    assert player.fantasy_positions == ('LB', 'DL')
+
+    idp = Player.from_json('43', {'full_name': 'Edge Rusher', 'position': 'DL', 'fantasy_positions': ['DE'],
+                                  'team': None})
+    assert idp.display_position == 'DE'
+    # A null team from Sleeper stays None
+    assert idp.team is None
+
+
+def test_player_without_position():
+    player = Player.from_json('1', {'full_name': 'Someone', 'fantasy_positions': None})
+    assert player.position is None
+    assert player.display_position == 'N/A'
+    assert player.fantasy_positions == ()
+
+
+def test_pick_from_json():
+    pick = Pick.from_json({'player_id': '7', 'pick_no': 13, 'round': 2, 'draft_slot': 1,
+                           'roster_id': 4, 'picked_by': 'u1', 'is_keeper': None})
+    assert (pick.player_id, pick.pick_no, pick.round, pick.draft_slot) == ('7', 13, 2, 1)
+    assert (pick.roster_id, pick.picked_by) == (4, 'u1')
+    assert pick.is_keeper is False
+    assert Pick.from_json({'is_keeper': True}).is_keeper is True
+    assert Pick.from_json({}).round is None
+
+
+def test_roster_from_json_turns_null_lists_into_tuples():
+    roster = Roster.from_json({'roster_id': 1, 'owner_id': 'u1', 'players': ['1', '2'], 'starters': None})
+    assert roster.players == ('1', '2')
+    assert roster.starters == ()
+    assert Roster.from_json({}).owner_id is None
+
+
+def test_user_from_json():
+    user = User.from_json({'user_id': 'u1', 'display_name': 'Alice', 'metadata': {'team_name': 'Team A'}})
+    assert (user.user_id, user.display_name, user.team_name) == ('u1', 'Alice', 'Team A')
+    bare = User.from_json({'user_id': 'u2', 'metadata': None})
+    assert (bare.display_name, bare.team_name) == ('Unknown Owner', None)
+
+
+def test_league_and_draft_from_json():
+    league = League.from_json({'league_id': 'L1', 'season': '2025', 'previous_league_id': 'L0'})
+    assert (league.name, league.season, league.previous_league_id, league.status) == ('', '2025', 'L0', None)
+
+    draft = Draft.from_json({'draft_id': 'D1', 'league_id': 'L1', 'status': 'complete', 'type': 'snake',
+                             'metadata': {'name': 'Grundle'}, 'last_picked': 5})
+    assert (draft.name, draft.type, draft.last_picked) == ('Grundle', 'snake', 5)
+    assert Draft.from_json({'draft_id': 'D2'}).name is None
+
+
+def test_records_are_slotted():
+    for record in (Player.from_json('1', {}), Pick.from_json({}), Roster.from_json({}),
+                   User.from_json({'user_id': 'u'}), League.from_json({'league_id': 'l'}),
+                   Draft.from_json({'draft_id': 'd'})):
+        assert not hasattr(record, '__dict__')
+
+
+def test_decode_players_skips_unknown_and_duplicate_ids():
+    players = {'1': {'full_name': 'A'}, '2': {'full_name': 'B'}, '3': {}}
+    decoded = decode_players(players, ['1', '1', '9', '2', '3'])
+    assert list(decoded) == ['1', '2']
+    assert decoded['2'] == Player.from_json('2', {'full_name': 'B'})
@@ -0,0 +1,121 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from swr_cache import FAILED, HIT, IDLE, MISS, REFRESHING, STALE, StaleWhileRevalidateCache
+
+
+class Loader:
+    """Loader returning "<key>:<call number>", optionally failing or blocking."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.gate = None
+
+    def __call__(self, key):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError('upstream down')
+        return f"{key}:{self.calls}"
+
+
+def make_cache(loader, max_age=60):
+    return StaleWhileRevalidateCache(loader, max_age=max_age, name='test_swr')
+
+
+def age(cache, key, seconds=120):
+    cache.peek(key).computed_at -= seconds
+
+
+def test_cold_miss_computes_then_hits():
+    loader = Loader()
+    cache = make_cache(loader)
+    entry, status = cache.get('a')
+    assert (entry.value, status) == ('a:1', MISS)
+    entry, status = cache.get('a')
+    assert (entry.value, status) == ('a:1', HIT)
+    assert loader.calls == 1
+
+
+def test_stale_entry_is_served_while_refreshing():
+    loader = Loader()
+    cache = make_cache(loader)
+    cache.get('a')
+    age(cache, 'a')
+
+    loader.gate = threading.Event()
+    entry, status = cache.get('a')
+    assert (entry.value, status) == ('a:1', STALE)
+    assert cache.refresh_status('a') == REFRESHING
+    loader.gate.set()
+
+    refreshed = cache.refresh('a', wait=True)
+    assert refreshed.value == 'a:2'
+    assert refreshed.version > entry.version
+    assert cache.get('a') == (refreshed, HIT)
+    assert cache.refresh_status('a') == IDLE
+
+
+def test_concurrent_cold_requests_share_one_load():
+    loader = Loader()
+    loader.gate = threading.Event()
+    cache = make_cache(loader)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get, 'a') for _ in range(4)]
+        loader.gate.set()
+        results = [future.result() for future in futures]
+    assert loader.calls == 1
+    assert {entry.value for entry, _ in results} == {'a:1'}
+
+
+def test_failed_refresh_keeps_the_stale_value():
+    loader = Loader()
+    cache = make_cache(loader)
+    cache.get('a')
+    age(cache, 'a')
+
+    loader.fail = True
+    with pytest.raises(RuntimeError):
+        cache.refresh('a', wait=True)
+    assert cache.refresh_status('a') == FAILED
+    assert cache.peek('a').value == 'a:1'
+    entry, status = cache.get('a')
+    assert (entry.value, status) == ('a:1', STALE)
+
+
+def test_successful_refresh_clears_the_failure():
+    loader = Loader()
+    cache = make_cache(loader)
+    cache.get('a')
+    loader.fail = True
+    with pytest.raises(RuntimeError):
+        cache.refresh('a', wait=True)
+    loader.fail = False
+    assert cache.refresh('a', wait=True).value == 'a:3'
+    assert cache.refresh_status('a') == IDLE
+
+
+def test_cold_failure_reaches_the_caller_and_is_retried():
+    loader = Loader()
+    loader.fail = True
+    cache = make_cache(loader)
+    with pytest.raises(RuntimeError):
+        cache.get('a')
+    assert cache.peek('a') is None
+    assert cache.refresh_status('a') == FAILED
+
+    loader.fail = False
+    entry, status = cache.get('a')
+    assert (entry.value, status) == ('a:2', MISS)
+
+
+def test_keys_are_cached_independently():
+    loader = Loader()
+    cache = make_cache(loader)
+    assert cache.get('a')[0].value == 'a:1'
+    assert cache.get('b')[0].value == 'b:2'
+    assert cache.get('a')[1] == HIT
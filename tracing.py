@@ -0,0 +1,160 @@
+"""Tracing
+
+Opt-in stage-level spans exported as Chrome trace-event JSON, viewable in
+chrome://tracing or https://ui.perfetto.dev. Set SLEEPER_TRACE to an output
+path (a "{pid}" in it is replaced with the process id) and every span the
+process records is written there when it exits, one track per thread:
+
+    with tracing.span('grundle.rosters', teams=12):
+        ...
+
+    @tracing.traced('tracker.load')
+    def load_data(self): ...
+
+Spans are tagged with a category - 'stage' for pipeline stages, 'network'
+for Sleeper requests, 'decode' for JSON decoding - so a slow run shows
+where its time went. With SLEEPER_TRACE unset, span() hands back one shared
+no-op span, so instrumented code pays a function call per span.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class _NullSpan:
+    """What span() returns while tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def annotate(self, **args) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, end, self.args)
+        return False
+
+    def annotate(self, **args) -> None:
+        """Attach results learned inside the span (counts, sizes) to its event."""
+        self.args.update(args)
+
+
+class Tracer:
+    """Buffers complete ("X") trace events and writes them as one JSON document."""
+
+    def __init__(self, path: str):
+        self.pid = os.getpid()
+        self.path = path.replace('{pid}', str(self.pid))
+        self._events: List[dict] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int, args: dict) -> None:
+        tid = threading.get_ident()
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': start_ns / 1000,
+                 'dur': (end_ns - start_ns) / 1000, 'pid': self.pid, 'tid': tid}
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._events.append(event)
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+
+    def write(self) -> Optional[str]:
+        """Write every event recorded so far; returns the path (None if there was nothing)."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        if not events:
+            return None
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid,
+                     'args': {'name': os.path.basename(sys.argv[0]) or 'python'}}]
+        metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+                     for tid, name in threads.items()]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f, default=str)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+_tracer: Optional[Tracer] = None
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def _configure() -> Optional[Tracer]:
+    # Read on first use rather than import, so a SLEEPER_TRACE from .env is seen
+    global _tracer, _configured
+    with _configure_lock:
+        if not _configured:
+            path = os.getenv('SLEEPER_TRACE')
+            if path:
+                _tracer = Tracer(path)
+                atexit.register(_write_at_exit)
+            _configured = True
+    return _tracer
+
+
+def _write_at_exit() -> None:
+    path = _tracer.write() if _tracer else None
+    if path:
+        print(f"Trace written to {path}", file=sys.stderr)
+
+
+def enabled() -> bool:
+    return (_tracer if _configured else _configure()) is not None
+
+
+def span(name: str, category: str = 'stage', **args):
+    """Context manager timing one span; a shared no-op when tracing is off."""
+    tracer = _tracer if _configured else _configure()
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, category, args)
+
+
+def traced(name: str, category: str = 'stage'):
+    """Decorator recording every call of the function as a span."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def flush() -> Optional[str]:
+    """Write the trace now (long-running processes); it is rewritten in full at exit."""
+    return _tracer.write() if _tracer else None